@@ -0,0 +1,93 @@
+"""
+Benchmark for adaptive quizzes: picking the next question and calibrating items.
+
+Times one adaptive step on item pools of --pool-sizes synthetic questions:
+estimating the learner's ability from --quiz-size answers and picking the
+most informative question not asked yet. Then simulates a response history
+of --learners learners answering --quiz-size random questions each from a
+bank of --items questions with known 2PL parameters, and times calibrate_items
+on it and reports how well it recovers the parameters (correlation with the
+true values). Requires NumPy; no database is needed.
+
+Usage:
+    python benchmarks/bench_adaptive.py [--pool-sizes 1000 10000 100000]
+                                        [--learners 20000] [--items 500]
+                                        [--quiz-size 20] [--repeat 50]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from domain.adaptive import ItemPool, calibrate_items, estimate_ability  # noqa: E402
+from bench_question_loading import best_of  # noqa: E402
+
+
+def random_parameters(rng, size):
+    """Discriminations and difficulties of `size` synthetic questions."""
+    return np.exp(rng.normal(0, 0.3, size)), rng.normal(0, 1, size)
+
+
+def adaptive_step(pool, answers, asked):
+    """Estimate the ability from the answers so far and pick the next question."""
+    theta, _ = estimate_ability(answers)
+    return pool.most_informative(theta, asked)
+
+
+def simulate_history(rng, discrimination, difficulty, learners, quiz_size):
+    """Responses of learners answering quiz_size random questions each."""
+    items = len(discrimination)
+    ability = rng.normal(0, 1, learners)
+    person_index = np.repeat(np.arange(learners), quiz_size)
+    item_index = np.argsort(rng.random((learners, items)), axis=1)[:, :quiz_size].ravel()
+    p = 1 / (1 + np.exp(-discrimination[item_index]
+                        * (ability[person_index] - difficulty[item_index])))
+    return person_index, item_index, rng.random(len(p)) < p
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--learners', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--quiz-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'pool size':>10} {'ability (ms)':>13} {'pick (ms)':>10} {'step (ms)':>10}")
+    for size in args.pool_sizes:
+        discrimination, difficulty = random_parameters(rng, size)
+        pool = ItemPool(np.arange(1, size + 1), discrimination, difficulty)
+        asked = list(range(1, args.quiz_size + 1))
+        answers = [(float(discrimination[i]), float(difficulty[i]), bool(i % 2))
+                   for i in range(args.quiz_size)]
+
+        ability_ms = best_of(args.repeat, estimate_ability, answers)
+        pick_ms = best_of(args.repeat, pool.most_informative, 0.5, asked)
+        step_ms = best_of(args.repeat, adaptive_step, pool, answers, asked)
+        print(f"{size:>10,} {ability_ms:>13.3f} {pick_ms:>10.3f} {step_ms:>10.3f}")
+
+    discrimination, difficulty = random_parameters(rng, args.items)
+    person_index, item_index, correct = simulate_history(
+        rng, discrimination, difficulty, args.learners, args.quiz_size)
+
+    start = time.perf_counter()
+    estimated_a, estimated_b, _ = calibrate_items(person_index, item_index, correct,
+                                                  args.learners, args.items)
+    seconds = time.perf_counter() - start
+    print(f"\nCalibrated {args.items:,} items from {len(correct):,} responses in {seconds:.2f}s")
+    print(f"  correlation with the true discrimination: "
+          f"{np.corrcoef(estimated_a, discrimination)[0, 1]:.3f}")
+    print(f"  correlation with the true difficulty:     "
+          f"{np.corrcoef(estimated_b, difficulty)[0, 1]:.3f}")
+
+
+if __name__ == "__main__":
+    main()
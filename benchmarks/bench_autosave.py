@@ -0,0 +1,88 @@
+"""
+Benchmark for the autosave journal: cost of a saved answer and of resuming.
+
+Journals a quiz of --questions questions in a temporary directory. Every
+round answers all of them and moves from question to question, as fast as
+possible, and reports the time record() takes per change (what a click
+costs the quiz window) next to the time of one synchronous write and fsync
+on the same disk, and how many writes the journal needed. Then times load()
+on the journal, which replays the start of the quiz and every change since.
+No database is needed.
+
+Usage:
+    python benchmarks/bench_autosave.py [--questions 70] [--rounds 5]
+                                        [--delay-ms 500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quiz_autosave import AutosaveJournal  # noqa: E402
+
+
+def quiz_state(questions):
+    """State of a new quiz, as QuizEngine.get_state returns it."""
+    return {"subject_id": 1, "subject_name": "Benchmark", "mode": "random",
+            "user_name": None, "question_ids": list(range(1, questions + 1)),
+            "answers": [0] * questions, "index": 0}
+
+
+def fsync_ms(path, repeat=20):
+    """Median time of appending one line and fsyncing it, in milliseconds."""
+    times = []
+    with open(path, "a") as f:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            f.write('{"move":0}\n')
+            f.flush()
+            os.fsync(f.fileno())
+            times.append(time.perf_counter() - start)
+    os.remove(path)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--questions', type=int, default=70)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--delay-ms', type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "autosave.jsonl")
+        print(f"write + fsync of one change: {fsync_ms(path):.3f} ms")
+
+        journal = AutosaveJournal(path, delay=args.delay_ms / 1000)
+        journal.start()
+        journal.begin(quiz_state(args.questions))
+        times = []
+        for round_number in range(args.rounds):
+            for index in range(args.questions):
+                start = time.perf_counter()
+                journal.record("answer", [index, 1 << (round_number % 4)])
+                journal.record("move", (index + 1) % args.questions)
+                times.append(time.perf_counter() - start)
+        journal.close()
+
+        times.sort()
+        changes = 2 * len(times)
+        print(f"record(), per change: p50 {times[len(times) // 2] / 2 * 1e6:.1f} us, "
+              f"p99 {times[int(len(times) * 0.99)] / 2 * 1e6:.1f} us")
+        print(f"{changes:,} changes written with {journal.writes} write(s) and fsync(s)")
+
+        start = time.perf_counter()
+        state = journal.load()
+        seconds = time.perf_counter() - start
+        with open(path) as f:
+            lines = sum(1 for _ in f)
+        print(f"load(): {seconds * 1000:.2f} ms for {lines:,} journal lines "
+              f"({sum(1 for mask in state['answers'] if mask)} answers)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for grading a cohort of quiz submissions.
+
+Grades random submissions of a synthetic question set once with the
+per-question Python grading used by QuizSession/QuizEngine (correctness and
+partial credit for every answer) and once with domain.grade_batch on the
+answer bitmask matrix, and reports submissions graded per second. Encoding
+the answer lists as bitmasks is timed separately, as stored answers can be
+kept encoded. Requires NumPy; no database is needed.
+
+Usage:
+    python benchmarks/bench_batch_grading.py [--submissions 1000 10000]
+                                             [--questions 100]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from domain import Question, answer_key_masks, encode_answers, grade_batch  # noqa: E402
+
+
+def make_questions(count):
+    """Four-option questions, every fifth one with two correct answers."""
+    return [Question(
+        question_text=f"Benchmark question {i}",
+        question_type="multiple_choice",
+        options={key: f"Option {key}" for key in "ABCD"},
+        correct_answers=["A", "C"] if i % 5 == 0 else [random.choice("ABCD")]
+    ) for i in range(count)]
+
+
+def make_submissions(questions, count):
+    """Random answers: mostly one key, some two, some unanswered."""
+    choices = [None, ["A"], ["B"], ["C"], ["D"], ["A", "C"], ["B", "D"]]
+    return [[random.choice(choices) for _ in questions] for _ in range(count)]
+
+
+def grade_python(questions, submissions):
+    """Per-question grading, as QuizEngine.calculate_results does it."""
+    scores = []
+    for submission in submissions:
+        score = 0
+        for question, answer in zip(questions, submission):
+            if question.is_answer_correct(answer or []):
+                score += 1
+            question.partial_credit(answer or [])
+        scores.append(score)
+    return scores
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--submissions', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--questions', type=int, default=100)
+    args = parser.parse_args()
+
+    random.seed(0)
+    questions = make_questions(args.questions)
+    keys = answer_key_masks(questions)
+
+    print(f"{'submissions':>12} {'python (sub/s)':>15} {'encode (s)':>11} "
+          f"{'batch (sub/s)':>14} {'speedup':>8}")
+    for count in args.submissions:
+        submissions = make_submissions(questions, count)
+
+        python_scores, python_seconds = timed(grade_python, questions, submissions)
+        answers, encode_seconds = timed(encode_answers, questions, submissions)
+        result, batch_seconds = timed(grade_batch, answers, keys)
+
+        if list(result.scores) != python_scores:
+            sys.exit("Batch scores differ from per-question grading")
+
+        print(f"{count:>12} {count / python_seconds:>15,.0f} {encode_seconds:>11.2f} "
+              f"{count / batch_seconds:>14,.0f} {python_seconds / batch_seconds:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Benchmark for navigating between quiz questions.
+
+Flips through a synthetic quiz in which every fifth question is
+multi-select and the rest single-select, and reports navigations per second for the original pattern, which builds
+a new layout, button and label (with a new QFont) per option and deletes
+them all on every navigation, against the pooled OptionPanel used by the
+quiz window. Pending events are processed after every navigation, so the
+deferred deletions and relayouts are part of the measurement.
+
+Runs on the offscreen Qt platform unless QT_QPA_PLATFORM is set.
+
+Usage:
+    python benchmarks/bench_option_rows.py [--navigations 500] [--options 2 4 6]
+                                           [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,  # noqa: E402
+                             QLabel, QRadioButton, QCheckBox, QButtonGroup)
+from PyQt6.QtCore import QCoreApplication, QEvent  # noqa: E402
+from PyQt6.QtGui import QFont  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from ui.option_rows import OptionPanel  # noqa: E402
+
+
+def make_quiz(size, option_count):
+    """Build `size` questions, every fifth one multi-select."""
+    keys = [chr(ord('A') + i) for i in range(option_count)]
+    return [{
+        "options": {key: f"Option {key} of benchmark question {i}, long enough to wrap "
+                         f"onto a second line in a narrow window" for key in keys},
+        "multi_select": i % 5 == 4,
+        "selected": keys[:2] if i % 5 == 4 else keys[:1]
+    } for i in range(size)]
+
+
+class RebuildingOptions(QWidget):
+    """The original option display: new widgets for every question."""
+
+    def __init__(self):
+        super().__init__()
+        self.options_layout = QVBoxLayout(self)
+        self.options_layout.setSpacing(10)
+        self.radio_group = QButtonGroup()
+
+    def show_options(self, question):
+        self.clear_options()
+        for key in sorted(question["options"]):
+            option_layout = QHBoxLayout()
+            if question["multi_select"]:
+                button = QCheckBox(f"{key}.")
+            else:
+                button = QRadioButton(f"{key}.")
+                self.radio_group.addButton(button)
+            label = QLabel(question["options"][key])
+            label.setWordWrap(True)
+            label.setFont(QFont("Arial", 16))
+            option_layout.addWidget(button)
+            option_layout.addWidget(label, 1)
+            self.options_layout.addLayout(option_layout)
+            if key in question["selected"]:
+                button.setChecked(True)
+
+    def clear_options(self):
+        for button in self.radio_group.buttons():
+            self.radio_group.removeButton(button)
+            button.deleteLater()
+        while self.options_layout.count():
+            item = self.options_layout.takeAt(0)
+            if item.widget():
+                item.widget().deleteLater()
+            elif item.layout():
+                while item.layout().count():
+                    child_item = item.layout().takeAt(0)
+                    if child_item.widget():
+                        child_item.widget().deleteLater()
+                item.layout().deleteLater()
+
+
+def show_pooled(panel, question):
+    panel.show_options(question["options"], question["multi_select"], question["selected"])
+
+
+def navigations_per_second(app, show, widget, quiz, navigations, repeat):
+    """Best rate over `repeat` runs of `navigations` question changes."""
+    widget.resize(600, 400)
+    widget.show()
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for i in range(navigations):
+            show(quiz[i % len(quiz)])
+            app.processEvents()
+            # deleteLater() is only honoured by a running event loop
+            QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+        best = max(best, navigations / (time.perf_counter() - start))
+    widget.close()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--navigations', type=int, default=500)
+    parser.add_argument('--options', type=int, nargs='+', default=[2, 4, 6])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+
+    print(f"{'options':>8} {'rebuild (nav/s)':>16} {'pooled (nav/s)':>15} {'speedup':>8}")
+    for option_count in args.options:
+        quiz = make_quiz(50, option_count)
+
+        rebuilding = RebuildingOptions()
+        rebuild_rate = navigations_per_second(app, rebuilding.show_options, rebuilding,
+                                              quiz, args.navigations, args.repeat)
+
+        panel = OptionPanel()
+        pooled_rate = navigations_per_second(app, lambda q: show_pooled(panel, q), panel,
+                                             quiz, args.navigations, args.repeat)
+
+        print(f"{option_count:>8} {rebuild_rate:>16,.0f} {pooled_rate:>15,.0f} "
+              f"{pooled_rate / rebuild_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
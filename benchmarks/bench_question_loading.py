@@ -0,0 +1,142 @@
+"""
+Benchmark for loading a subject's questions from PostgreSQL.
+
+Creates a scratch subject for each bank size, then compares the original
+per-question (N+1) loading pattern against the single aggregated query used
+by QuizDatabase.get_questions_by_subject for the whole bank, and against a
+sampled quiz of --quiz-size questions. The scratch subjects are deleted
+afterwards.
+
+Usage:
+    python benchmarks/bench_question_loading.py [--sizes 10 100 500] [--repeat 5]
+                                                [--quiz-size 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from psycopg2.extras import RealDictCursor, execute_values
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quiz_db import QuizDatabase  # noqa: E402
+
+
+def create_scratch_subject(db, size):
+    """Insert a subject with `size` four-option questions and return its id."""
+    with db.connection() as conn:
+        return _insert_scratch_subject(conn.cursor(), size)
+
+
+def _insert_scratch_subject(cursor, size):
+    cursor.execute("""
+        INSERT INTO subjects (name, description)
+        VALUES (%s, 'benchmark scratch data')
+        RETURNING id
+    """, (f"__bench_{size}_{time.time_ns()}",))
+    subject_id = cursor.fetchone()[0]
+
+    question_ids = execute_values(cursor, """
+        INSERT INTO questions (subject_id, question_text, question_type)
+        VALUES %s
+        RETURNING id
+    """, [(subject_id, f"Benchmark question {i}", 'multiple_choice')
+          for i in range(size)], fetch=True)
+
+    execute_values(cursor, """
+        INSERT INTO options (question_id, option_key, option_text)
+        VALUES %s
+    """, [(qid, key, f"Option {key}") for (qid,) in question_ids for key in "ABCD"])
+    execute_values(cursor, """
+        INSERT INTO correct_answers (question_id, answer_key)
+        VALUES %s
+    """, [(qid, 'A') for (qid,) in question_ids])
+    return subject_id
+
+
+def load_n_plus_one(db, subject_id):
+    """The original loader: one query for questions, two more per question."""
+    with db.connection() as conn:
+        return _load_n_plus_one(conn.cursor(cursor_factory=RealDictCursor), subject_id)
+
+
+def _load_n_plus_one(cursor, subject_id):
+    cursor.execute("""
+        SELECT id, question_text, question_type
+        FROM questions
+        WHERE subject_id = %s
+        ORDER BY id
+    """, (subject_id,))
+
+    quiz_data = []
+    for question in cursor.fetchall():
+        cursor.execute("""
+            SELECT option_key, option_text
+            FROM options
+            WHERE question_id = %s
+            ORDER BY option_key
+        """, (question['id'],))
+        options = {row['option_key']: row['option_text'] for row in cursor.fetchall()}
+
+        cursor.execute("""
+            SELECT answer_key
+            FROM correct_answers
+            WHERE question_id = %s
+            ORDER BY answer_key
+        """, (question['id'],))
+        correct_answers = [row['answer_key'] for row in cursor.fetchall()]
+
+        quiz_data.append({
+            "question": question['question_text'],
+            "type": question['question_type'],
+            "options": options,
+            "correct_answer": correct_answers
+        })
+
+    return quiz_data
+
+
+def best_of(repeat, func, *args):
+    """Return the fastest wall-clock time in milliseconds over `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 500, 1000, 5000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quiz-size', type=int, default=10)
+    args = parser.parse_args()
+
+    db = QuizDatabase()
+    if not db.connect():
+        sys.exit(1)
+
+    print(f"{'questions':>10} {'n+1 (ms)':>12} {'aggregated (ms)':>16} {'speedup':>8} "
+          f"{'sampled (ms)':>13}")
+    try:
+        for size in args.sizes:
+            subject_id = create_scratch_subject(db, size)
+            try:
+                legacy_ms = best_of(args.repeat, load_n_plus_one, db, subject_id)
+                aggregated_ms = best_of(args.repeat, db.get_questions_by_subject,
+                                        subject_id, False, None, size)
+                sampled_ms = best_of(args.repeat, db.get_questions_by_subject,
+                                     subject_id, True, None, args.quiz_size)
+            finally:
+                db.delete_subject(subject_id)
+            print(f"{size:>10} {legacy_ms:>12.2f} {aggregated_ms:>16.2f} "
+                  f"{legacy_ms / aggregated_ms:>7.1f}x {sampled_ms:>13.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark for the memory used by a resident question bank.
+
+Builds the same synthetic bank of four-option questions, shaped like the
+rows QuizDatabase returns, as the original plain Question dataclasses, as
+the current (slotted, interned) Question objects and as a columnar
+QuestionBank. For each it reports the memory still allocated once the
+source rows have been dropped, measured with tracemalloc, and the build
+time. No database is needed.
+
+Usage:
+    python benchmarks/bench_question_memory.py [--sizes 10000 200000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from domain import Question, QuestionBank, QuestionType  # noqa: E402
+
+
+@dataclass
+class LegacyQuestion:
+    """The original Question: a plain dataclass with a __dict__."""
+    question_text: str
+    question_type: QuestionType
+    options: Dict[str, str]
+    correct_answers: List[str]
+    subject_id: Optional[int] = None
+    id: Optional[int] = None
+    subject_name: Optional[str] = None
+
+    def __post_init__(self):
+        if isinstance(self.question_type, str):
+            self.question_type = QuestionType(self.question_type)
+        if not isinstance(self.correct_answers, list):
+            self.correct_answers = [self.correct_answers]
+        self.correct_answers = sorted(self.correct_answers)
+
+
+def make_rows(size, subjects=20):
+    """Rows as returned by QuizDatabase.get_questions_by_ids.
+
+    Every row gets its own subject name string, as a database driver
+    returns a new string per row.
+    """
+    return [{
+        "id": i + 1,
+        "subject_id": i % subjects + 1,
+        "subject_name": "".join(("Subject number ", str(i % subjects + 1))),
+        "question_text": f"Benchmark question {i}: which of the following statements "
+                         f"about the topic is correct?",
+        "question_type": "multiple_choice",
+        "options": {key: f"Option {key} of benchmark question {i}" for key in "ABCD"},
+        "correct_answers": ["A", "C"] if i % 5 == 0 else ["B"]
+    } for i in range(size)]
+
+
+def from_rows(cls):
+    def build(rows):
+        return [cls(
+            id=row['id'], subject_id=row['subject_id'], subject_name=row['subject_name'],
+            question_text=row['question_text'], question_type=row['question_type'],
+            options=row['options'], correct_answers=row['correct_answers']
+        ) for row in rows]
+    return build
+
+
+def resident_bytes(size, build):
+    """Memory held by `build(rows)` after the rows are released, and build time."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+
+    rows = make_rows(size)
+    start = time.perf_counter()
+    bank = build(rows)
+    seconds = time.perf_counter() - start
+    del rows
+    gc.collect()
+
+    resident = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del bank
+    return resident, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 200000])
+    args = parser.parse_args()
+
+    layouts = [
+        ("legacy dataclass", from_rows(LegacyQuestion)),
+        ("Question", from_rows(Question)),
+        ("QuestionBank", QuestionBank.from_db_rows),
+    ]
+
+    print(f"{'questions':>10} {'layout':>17} {'MB':>9} {'bytes/question':>15} {'build (s)':>10}")
+    for size in args.sizes:
+        for name, build in layouts:
+            resident, seconds = resident_bytes(size, build)
+            print(f"{size:>10} {name:>17} {resident / 2**20:>9.1f} "
+                  f"{resident / size:>15,.0f} {seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Load test for the HTTP quiz service (quiz_server.py).
+
+Creates a scratch subject with --questions questions, starts quiz_server.py
+in a subprocess (or uses the running server at --url, which must serve the
+same database) and simulates each of --learners concurrent learners for
+--duration seconds. Every learner keeps one connection open and takes quiz
+after quiz: start a session, answer every question and move to the next,
+submit and end the session. Reports requests per second, quizzes per second
+and the p50/p99 latency of each kind of request. The scratch subject and the
+attempts recorded for it are deleted afterwards. With --workers N the server
+runs N worker processes; a learner's connection lands on any of them, so most
+requests are forwarded to the worker owning the session.
+
+The client runs on the same machine as the server, so on a small machine the
+figures include the load generator's own CPU use.
+
+Usage:
+    python benchmarks/bench_quiz_server.py [--learners 10 100 300]
+                                           [--duration 10] [--questions 1000]
+                                           [--workers 1]
+                                           [--url http://127.0.0.1:8080]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quiz_db import QuizDatabase  # noqa: E402
+from bench_question_loading import create_scratch_subject  # noqa: E402
+
+REQUESTS = ["start", "answer", "next", "submit", "end"]
+
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 JSON client on one connection."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+
+    async def request(self, method, path, payload=None):
+        """Send one request and return (status, decoded JSON body)."""
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\n"
+                          f"Host: {self.host}\r\n"
+                          f"Content-Type: application/json\r\n"
+                          f"Content-Length: {len(body)}\r\n"
+                          f"\r\n".encode() + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length))
+
+
+async def take_quizzes(client, subject_id, deadline, latencies, counts):
+    """Take quizzes one after another until the deadline."""
+
+    async def timed(kind, method, path, payload=None):
+        start = time.perf_counter()
+        status, response = await client.request(method, path, payload)
+        latencies[kind].append(time.perf_counter() - start)
+        if status >= 400:
+            counts["errors"] += 1
+        return status, response
+
+    while time.perf_counter() < deadline:
+        status, view = await timed("start", "POST", "/sessions", {"subject_id": subject_id})
+        if status != 201:
+            continue
+        session = f"/sessions/{view['session_id']}"
+        while True:
+            first_key = min(view["question"]["options"])
+            _, view = await timed("answer", "PUT", f"{session}/answer", {"answer": [first_key]})
+            if view["is_last"]:
+                break
+            _, view = await timed("next", "POST", f"{session}/next")
+        await timed("submit", "POST", f"{session}/submit")
+        await timed("end", "DELETE", session)
+        counts["quizzes"] += 1
+
+
+async def run_load(host, port, subject_id, learners, duration):
+    """Simulate concurrent learners; return (latencies by request, counts, seconds)."""
+    latencies = {kind: [] for kind in REQUESTS}
+    counts = {"quizzes": 0, "errors": 0}
+    clients = [Client(host, port) for _ in range(learners)]
+    await asyncio.gather(*(client.connect() for client in clients))
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(take_quizzes(client, subject_id, start + duration,
+                                            latencies, counts) for client in clients))
+    finally:
+        for client in clients:
+            client.close()
+    return latencies, counts, time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    """Value below which `fraction` of the sorted values fall."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def start_server(port, workers=1):
+    """Start quiz_server.py on a port and wait until it accepts connections."""
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), '..', 'quiz_server.py'),
+         '--port', str(port), '--workers', str(workers)], stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            if server.poll() is not None:
+                break
+            time.sleep(0.1)
+    server.kill()
+    sys.exit("quiz_server.py did not start")
+
+
+def free_port():
+    """Pick a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--learners', type=int, nargs='+', default=[10, 100, 300])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--questions', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes of the server started")
+    parser.add_argument('--url', help="use this running server instead of starting one")
+    args = parser.parse_args()
+
+    db = QuizDatabase()
+    if not db.connect():
+        sys.exit(1)
+
+    subject_id = create_scratch_subject(db, args.questions)
+    server = None
+    try:
+        if args.url:
+            url = urlsplit(args.url)
+            host, port = url.hostname, url.port or 80
+        else:
+            host, port = "127.0.0.1", free_port()
+            server = start_server(port, args.workers)
+
+        print(f"{'learners':>8} {'requests/s':>11} {'quizzes/s':>10} {'errors':>7}  "
+              + "  ".join(f"{kind + ' p50/p99 (ms)':>22}" for kind in REQUESTS + ['all']))
+        for learners in args.learners:
+            latencies, counts, seconds = asyncio.run(
+                run_load(host, port, subject_id, learners, args.duration))
+            latencies['all'] = [t for kind in REQUESTS for t in latencies[kind]]
+            columns = []
+            for kind in REQUESTS + ['all']:
+                values = sorted(latencies[kind])
+                columns.append(f"{percentile(values, 0.5) * 1000:>10.2f} /"
+                               f"{percentile(values, 0.99) * 1000:>10.2f}")
+            print(f"{learners:>8} {len(latencies['all']) / seconds:>11,.0f} "
+                  f"{counts['quizzes'] / seconds:>10,.1f} {counts['errors']:>7}  "
+                  + "  ".join(columns))
+    finally:
+        if server:
+            # Let the server write the recorded attempts before they are deleted
+            server.send_signal(signal.SIGINT)
+            server.wait(60)
+        db.delete_subject(subject_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
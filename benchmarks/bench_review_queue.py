@@ -0,0 +1,87 @@
+"""
+Benchmark for picking a spaced repetition quiz from a large review history.
+
+Creates a scratch subject with --questions questions and a review schedule
+for each of --users users (users x questions review_items rows, with due
+times spread over two months around now), then times picking the next
+--quiz-size due questions of one user: the due lookup alone (served by
+idx_review_items_due) and the full QuizDatabase.get_due_questions call,
+which also hydrates the picked questions. The scratch subject and its
+review rows are deleted afterwards.
+
+Usage:
+    python benchmarks/bench_review_queue.py [--questions 20000] [--users 1 10 25]
+                                            [--quiz-size 10] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quiz_db import QuizDatabase  # noqa: E402
+from bench_question_loading import create_scratch_subject, best_of  # noqa: E402
+
+
+def add_review_users(db, subject_id, first_user, count):
+    """Give users bench_<first_user>..bench_<first_user+count-1> a schedule for every question."""
+    with db.connection() as conn:
+        conn.cursor().execute("""
+            INSERT INTO review_items (user_name, question_id, subject_id, ease,
+                                      interval_days, repetitions, due_at, reviewed_at)
+            SELECT 'bench_' || u, q.id, q.subject_id, 2.5, 6, 2,
+                   now() - interval '30 days' + random() * interval '60 days', now()
+            FROM questions q, generate_series(%s, %s) AS u
+            WHERE q.subject_id = %s
+        """, (first_user, first_user + count - 1, subject_id))
+        conn.cursor().execute("ANALYZE questions, review_items")
+
+
+def pick_due_ids(db, user_name, subject_id, limit):
+    """The due lookup of get_due_questions on its own."""
+    with db.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT question_id
+            FROM review_items
+            WHERE user_name = %s AND subject_id = %s AND due_at <= now()
+            ORDER BY due_at
+            LIMIT %s
+        """, (user_name, subject_id, limit))
+        return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--questions', type=int, default=20000)
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 10, 25])
+    parser.add_argument('--quiz-size', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db = QuizDatabase()
+    if not db.connect():
+        sys.exit(1)
+
+    print(f"{'review rows':>12} {'due lookup (ms)':>16} {'get_due_questions (ms)':>23}")
+    subject_id = create_scratch_subject(db, args.questions)
+    try:
+        users = 0
+        for target in sorted(args.users):
+            add_review_users(db, subject_id, users, target - users)
+            users = target
+
+            lookup_ms = best_of(args.repeat, pick_due_ids, db, 'bench_0', subject_id,
+                                args.quiz_size)
+            quiz_ms = best_of(args.repeat, db.get_due_questions, 'bench_0', subject_id,
+                              args.quiz_size)
+            print(f"{users * args.questions:>12,} {lookup_ms:>16.2f} {quiz_ms:>23.2f}")
+    finally:
+        db.delete_subject(subject_id)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
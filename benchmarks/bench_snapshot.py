@@ -0,0 +1,101 @@
+"""
+Benchmark for the offline question bank snapshot: startup from SQLite vs PostgreSQL.
+
+Copies the whole bank of the configured database into a snapshot in a
+temporary directory and reports how long the sync takes, then how long a
+delta sync takes with nothing changed, after adding a scratch subject of
+--changed questions and after deleting it again. Then times what the
+quiz window does on a cold start, --repeat times each way: connecting,
+listing the subjects and sampling a quiz of --quiz-size questions from the
+largest subject, once from PostgreSQL (a new connection each time) and once
+from the snapshot (opening the file each time).
+
+Usage:
+    python benchmarks/bench_snapshot.py [--quiz-size 70] [--repeat 5]
+                                        [--changed 100]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quiz_snapshot import SnapshotQuizDatabase  # noqa: E402
+from quiz_db import QuizDatabase  # noqa: E402
+from bench_question_loading import create_scratch_subject  # noqa: E402
+
+
+def cold_start(open_db, subject_id, quiz_size):
+    """Open a database, list subjects and sample a quiz; return milliseconds."""
+    start = time.perf_counter()
+    db = open_db()
+    try:
+        db.get_all_subjects()
+        questions = db.get_questions_by_subject(subject_id, limit=quiz_size)
+        assert questions
+        return (time.perf_counter() - start) * 1000
+    finally:
+        db.close()
+
+
+def timed_sync(db):
+    """Sync the snapshot; return seconds."""
+    start = time.perf_counter()
+    if not db.sync_snapshot():
+        sys.exit(1)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quiz-size', type=int, default=70)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--changed', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bank.sqlite3")
+
+        db = SnapshotQuizDatabase(snapshot_path=path)
+        if not db.connect():
+            sys.exit(1)
+        seconds = timed_sync(db)
+        sizes = {s['id']: len(db.snapshot.get_question_ids_by_subject(s['id']))
+                 for s in db.snapshot.get_all_subjects()}
+        questions = sum(sizes.values())
+        largest = max(sizes, key=sizes.get)
+        print(f"Synced {questions:,} questions in {seconds:.2f}s "
+              f"({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+        print(f"{'delta sync':>24} {'ms':>8}")
+        print(f"{'nothing changed':>24} {timed_sync(db) * 1000:>8.1f}")
+        subject_id = create_scratch_subject(db, args.changed)
+        try:
+            print(f"{f'{args.changed} questions added':>24} {timed_sync(db) * 1000:>8.1f}")
+        finally:
+            db.delete_subject(subject_id)
+        print(f"{f'{args.changed} questions deleted':>24} {timed_sync(db) * 1000:>8.1f}")
+        db.close()
+
+        def open_postgres():
+            database = QuizDatabase(min_connections=1, max_connections=1)
+            if not database.connect():
+                sys.exit(1)
+            return database
+
+        def open_snapshot():
+            # Never connects: every read is served by the snapshot
+            return SnapshotQuizDatabase(snapshot_path=path)
+
+        print(f"{'source':>10} {'best (ms)':>10} {'median (ms)':>12}")
+        for name, open_db in (("postgres", open_postgres), ("snapshot", open_snapshot)):
+            times = sorted(cold_start(open_db, largest, args.quiz_size)
+                           for _ in range(args.repeat))
+            print(f"{name:>10} {times[0]:>10.1f} {times[len(times) // 2]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,28 @@
 -- Initialize the Quiz Database Schema
 
 -- Drop existing tables
+DROP TABLE IF EXISTS bank_tombstones CASCADE;
+DROP TABLE IF EXISTS served_sessions CASCADE;
+DROP TABLE IF EXISTS item_parameters CASCADE;
+DROP TABLE IF EXISTS review_items CASCADE;
+DROP TABLE IF EXISTS option_stats CASCADE;
+DROP TABLE IF EXISTS question_stats CASCADE;
+DROP TABLE IF EXISTS responses CASCADE;
+DROP TABLE IF EXISTS attempts CASCADE;
 DROP TABLE IF EXISTS correct_answers CASCADE;
 DROP TABLE IF EXISTS options CASCADE;
 DROP TABLE IF EXISTS questions CASCADE;
 DROP TABLE IF EXISTS subjects CASCADE;
 
--- Create subjects table
+-- Create subjects table (version is the id of the transaction that last
+-- changed the row, see touch_bank_row)
 CREATE TABLE IF NOT EXISTS subjects (
     id SERIAL PRIMARY KEY,
     name VARCHAR(100) NOT NULL UNIQUE,
     description TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint
 );
 
 -- Create questions table
@@ -20,7 +31,9 @@ CREATE TABLE IF NOT EXISTS questions (
     subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
     question_text TEXT NOT NULL,
     question_type VARCHAR(50) NOT NULL CHECK (question_type IN ('multiple_choice', 'multi_select')),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    version BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint
 );
 
 -- Create options table (for answer choices)
@@ -40,10 +53,367 @@ CREATE TABLE IF NOT EXISTS correct_answers (
     UNIQUE(question_id, answer_key)
 );
 
+-- Create attempts table (one row per submitted quiz)
+CREATE TABLE IF NOT EXISTS attempts (
+    id SERIAL PRIMARY KEY,
+    subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+    user_name VARCHAR(100),
+    total_questions INTEGER NOT NULL,
+    correct_answers INTEGER NOT NULL,
+    percentage REAL NOT NULL,
+    completed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create responses table (the answer given to each question of an attempt);
+-- responses outlive deleted questions so attempt scores stay consistent
+CREATE TABLE IF NOT EXISTS responses (
+    attempt_id INTEGER NOT NULL REFERENCES attempts(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question_id INTEGER REFERENCES questions(id) ON DELETE SET NULL,
+    answer VARCHAR(10)[],
+    is_correct BOOLEAN NOT NULL,
+    PRIMARY KEY (attempt_id, position)
+);
+
+-- Create review_items table (spaced repetition schedule of each question a
+-- user has reviewed; subject_id is copied from the question so that the due
+-- questions of a subject are one index range)
+CREATE TABLE IF NOT EXISTS review_items (
+    user_name VARCHAR(100) NOT NULL,
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    subject_id INTEGER NOT NULL REFERENCES subjects(id) ON DELETE CASCADE,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    due_at TIMESTAMP NOT NULL,
+    reviewed_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (user_name, question_id)
+);
+
+-- Create question_stats table (answer statistics per question, maintained
+-- from responses by update_question_stats)
+CREATE TABLE IF NOT EXISTS question_stats (
+    question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0
+);
+
+-- Create option_stats table (how often each option key was chosen)
+CREATE TABLE IF NOT EXISTS option_stats (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    option_key VARCHAR(10) NOT NULL,
+    selections INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (question_id, option_key)
+);
+
+-- Create item_parameters table (2PL item response theory parameters of each
+-- question for adaptive quizzes, written by quiz_calibrate.py)
+CREATE TABLE IF NOT EXISTS item_parameters (
+    question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+    discrimination REAL NOT NULL,
+    difficulty REAL NOT NULL,
+    responses INTEGER NOT NULL,
+    calibrated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create served_sessions table (quiz sessions of quiz_server.py moved out of
+-- memory; state is the packed session, see quiz_sessions.pack_session)
+CREATE TABLE IF NOT EXISTS served_sessions (
+    session_id VARCHAR(64) PRIMARY KEY,
+    state TEXT NOT NULL,
+    spilled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Create bank_tombstones table (deleted subjects and questions, with the id
+-- of the deleting transaction, so delta syncs can delete them too)
+CREATE TABLE IF NOT EXISTS bank_tombstones (
+    table_name VARCHAR(20) NOT NULL CHECK (table_name IN ('subjects', 'questions')),
+    row_id INTEGER NOT NULL,
+    version BIGINT NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (table_name, row_id)
+);
+
 -- Create indexes for better performance
-CREATE INDEX idx_questions_subject_id ON questions(subject_id);
+-- (subject_id, id) also serves keyset pagination and per-subject id lookups
+CREATE INDEX idx_questions_subject_id ON questions(subject_id, id);
 CREATE INDEX idx_options_question_id ON options(question_id);
 CREATE INDEX idx_correct_answers_question_id ON correct_answers(question_id);
+CREATE INDEX idx_attempts_subject_id ON attempts(subject_id, completed_at);
+CREATE INDEX idx_responses_question_id ON responses(question_id);
+-- Most overdue questions first (QuizDatabase.get_due_questions)
+CREATE INDEX idx_review_items_due ON review_items(user_name, subject_id, due_at);
+CREATE INDEX idx_review_items_question_id ON review_items(question_id);
+CREATE INDEX idx_served_sessions_spilled_at ON served_sessions(spilled_at);
+-- Rows changed since a version (QuizDatabase.iter_bank_changes)
+CREATE INDEX idx_subjects_version ON subjects(version);
+CREATE INDEX idx_questions_version ON questions(version);
+CREATE INDEX idx_bank_tombstones_version ON bank_tombstones(version);
+
+-- Full-text search over question and option text (QuizDatabase.search_questions).
+-- Expression indexes need no extra columns or triggers; queries must use the
+-- same to_tsvector('english', ...) expressions to be served by them.
+CREATE INDEX idx_questions_search ON questions
+    USING GIN (to_tsvector('english', question_text));
+CREATE INDEX idx_options_search ON options
+    USING GIN (to_tsvector('english', option_text));
+
+-- Notify listeners (other app instances caching the question bank) about
+-- changes, once per statement. Payloads list the ids of the affected
+-- subjects and/or questions so caches can evict just those entries. A
+-- statement changing more than 100 rows (an import, a cascading delete)
+-- sends a flush instead, so it costs one notification rather than one per
+-- row. Identical payloads raised within one transaction are delivered once.
+CREATE OR REPLACE FUNCTION notify_quiz_change() RETURNS trigger AS $$
+DECLARE
+    row_count INTEGER;
+    payload JSON;
+BEGIN
+    SELECT count(*) INTO row_count FROM (SELECT 1 FROM changed_rows LIMIT 101) limited;
+
+    IF row_count = 0 THEN
+        RETURN NULL;
+    ELSIF row_count > 100 THEN
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'flush', true);
+    ELSIF TG_TABLE_NAME = 'subjects' THEN
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                     'subject_ids', (SELECT json_agg(id) FROM changed_rows));
+    ELSIF TG_TABLE_NAME = 'questions' AND TG_OP = 'UPDATE' THEN
+        -- old_subject_ids lists the subjects questions were moved out of
+        -- (null if none was moved)
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                     'question_ids', (SELECT json_agg(id) FROM changed_rows),
+                                     'subject_ids', (SELECT json_agg(DISTINCT subject_id)
+                                                     FROM changed_rows),
+                                     'old_subject_ids', (SELECT json_agg(DISTINCT o.subject_id)
+                                                         FROM old_rows o
+                                                         JOIN changed_rows n ON n.id = o.id
+                                                         WHERE n.subject_id <> o.subject_id));
+    ELSIF TG_TABLE_NAME = 'questions' THEN
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                     'question_ids', (SELECT json_agg(id) FROM changed_rows),
+                                     'subject_ids', (SELECT json_agg(DISTINCT subject_id)
+                                                     FROM changed_rows));
+    ELSE
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP,
+                                     'question_ids', (SELECT json_agg(DISTINCT question_id)
+                                                      FROM changed_rows));
+    END IF;
+
+    PERFORM pg_notify('quiz_changes', payload::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER subjects_notify_insert
+    AFTER INSERT ON subjects
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER subjects_notify_update
+    AFTER UPDATE ON subjects
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER subjects_notify_delete
+    AFTER DELETE ON subjects
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER questions_notify_insert
+    AFTER INSERT ON questions
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER questions_notify_update
+    AFTER UPDATE ON questions
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER questions_notify_delete
+    AFTER DELETE ON questions
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER options_notify_insert
+    AFTER INSERT ON options
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER options_notify_update
+    AFTER UPDATE ON options
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER options_notify_delete
+    AFTER DELETE ON options
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER correct_answers_notify_insert
+    AFTER INSERT ON correct_answers
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER correct_answers_notify_update
+    AFTER UPDATE ON correct_answers
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+CREATE TRIGGER correct_answers_notify_delete
+    AFTER DELETE ON correct_answers
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_quiz_change();
+
+-- Row versions for delta syncs of the question bank. A row's version is the
+-- id of the transaction that last changed it: set by the column default on
+-- insert and by touch_bank_row on update. Changing a question's options or
+-- correct answers touches the question, once per statement and only if the
+-- transaction has not changed it already (as an import or an edit has), and
+-- deleting subjects or questions leaves tombstones. Transaction ids are
+-- assigned in start order, not commit order, so readers sync from the xmin
+-- of their previous snapshot rather than from the largest version seen.
+CREATE OR REPLACE FUNCTION touch_bank_row() RETURNS trigger AS $$
+BEGIN
+    NEW.version := pg_current_xact_id()::text::bigint;
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER subjects_touch
+    BEFORE UPDATE ON subjects
+    FOR EACH ROW EXECUTE FUNCTION touch_bank_row();
+
+CREATE TRIGGER questions_touch
+    BEFORE UPDATE ON questions
+    FOR EACH ROW EXECUTE FUNCTION touch_bank_row();
+
+CREATE OR REPLACE FUNCTION touch_answer_questions() RETURNS trigger AS $$
+BEGIN
+    UPDATE questions
+    SET updated_at = CURRENT_TIMESTAMP
+    WHERE id IN (SELECT question_id FROM changed_rows)
+      AND version <> pg_current_xact_id()::text::bigint;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER options_insert_touch
+    AFTER INSERT ON options
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE TRIGGER options_update_touch
+    AFTER UPDATE ON options
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE TRIGGER options_delete_touch
+    AFTER DELETE ON options
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE TRIGGER correct_answers_insert_touch
+    AFTER INSERT ON correct_answers
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE TRIGGER correct_answers_update_touch
+    AFTER UPDATE ON correct_answers
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE TRIGGER correct_answers_delete_touch
+    AFTER DELETE ON correct_answers
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION touch_answer_questions();
+
+CREATE OR REPLACE FUNCTION record_bank_tombstones() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO bank_tombstones (table_name, row_id, version)
+    SELECT TG_TABLE_NAME, id, pg_current_xact_id()::text::bigint
+    FROM deleted_rows
+    ORDER BY id
+    ON CONFLICT (table_name, row_id) DO UPDATE
+    SET version = EXCLUDED.version,
+        deleted_at = CURRENT_TIMESTAMP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER subjects_tombstones
+    AFTER DELETE ON subjects
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_bank_tombstones();
+
+CREATE TRIGGER questions_tombstones
+    AFTER DELETE ON questions
+    REFERENCING OLD TABLE AS deleted_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_bank_tombstones();
+
+-- Keep the subject of review items in step with their question
+CREATE OR REPLACE FUNCTION move_review_items() RETURNS trigger AS $$
+BEGIN
+    UPDATE review_items SET subject_id = NEW.subject_id WHERE question_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER questions_move_review_items
+    AFTER UPDATE OF subject_id ON questions
+    FOR EACH ROW WHEN (OLD.subject_id IS DISTINCT FROM NEW.subject_id)
+    EXECUTE FUNCTION move_review_items();
+
+-- Keep question_stats and option_stats up to date as responses are written
+-- or deleted (with their attempt), so reading a question's statistics never
+-- scans the response history. The triggers run once per statement and see
+-- all of its rows, so a batch from the attempt recorder adds its counts to
+-- each affected question with one upsert. Rows are upserted in key order so
+-- concurrent batches lock shared statistics rows in the same order.
+-- Responses are never updated, except for question_id being cleared when a
+-- question is deleted, which deletes its statistics anyway.
+CREATE OR REPLACE FUNCTION update_question_stats() RETURNS trigger AS $$
+DECLARE
+    direction INTEGER := CASE WHEN TG_OP = 'INSERT' THEN 1 ELSE -1 END;
+BEGIN
+    INSERT INTO question_stats AS s (question_id, attempts, correct, skipped)
+    SELECT question_id,
+           direction * COUNT(*),
+           direction * COUNT(*) FILTER (WHERE is_correct),
+           direction * COUNT(*) FILTER (WHERE answer IS NULL)
+    FROM changed_responses
+    WHERE question_id IS NOT NULL
+    GROUP BY question_id
+    ORDER BY question_id
+    ON CONFLICT (question_id) DO UPDATE
+    SET attempts = s.attempts + EXCLUDED.attempts,
+        correct = s.correct + EXCLUDED.correct,
+        skipped = s.skipped + EXCLUDED.skipped;
+
+    INSERT INTO option_stats AS s (question_id, option_key, selections)
+    SELECT r.question_id, k.option_key, direction * COUNT(*)
+    FROM changed_responses r, unnest(r.answer) AS k(option_key)
+    WHERE r.question_id IS NOT NULL
+    GROUP BY r.question_id, k.option_key
+    ORDER BY r.question_id, k.option_key
+    ON CONFLICT (question_id, option_key) DO UPDATE
+    SET selections = s.selections + EXCLUDED.selections;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER responses_insert_stats
+    AFTER INSERT ON responses
+    REFERENCING NEW TABLE AS changed_responses
+    FOR EACH STATEMENT EXECUTE FUNCTION update_question_stats();
+
+CREATE TRIGGER responses_delete_stats
+    AFTER DELETE ON responses
+    REFERENCING OLD TABLE AS changed_responses
+    FOR EACH STATEMENT EXECUTE FUNCTION update_question_stats();
 
 -- Optional: Create a view for easier querying
 CREATE OR REPLACE VIEW quiz_view AS
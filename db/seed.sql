@@ -622,7 +622,7 @@ INSERT INTO correct_answers (question_id, answer_key) VALUES
 
 -- Question 47
 INSERT INTO questions (subject_id, question_text, question_type) VALUES
-(1, 'Sasha, a network administrator for Kelly''s Technical Innovations, has just recently installed a NGFW on her company’s network to replace the previous traditional stateful firewall they were using. This change was made to keep up with shortcomings that were with the previous firewall. Which of the following improvements does this NGFW provide that were not available previously? (Select all that apply.)', 'multiple_choice');
+(1, 'Sasha, a network administrator for Kelly''s Technical Innovations, has just recently installed a NGFW on her company’s network to replace the previous traditional stateful firewall they were using. This change was made to keep up with shortcomings that were with the previous firewall. Which of the following improvements does this NGFW provide that were not available previously? (Select all that apply.)', 'multi_select');
 
 INSERT INTO options (question_id, option_key, option_text) VALUES
 (47, 'A', 'Can be integrated with various other security products'),
@@ -795,7 +795,7 @@ INSERT INTO correct_answers (question_id, answer_key) VALUES
 
 -- Question 60
 INSERT INTO questions (subject_id, question_text, question_type) VALUES
-(1, 'A security officer at Kelly Innovations LLC is reviewing recent security incidents to assess potential threats within the organization. Two patterns of behavior have raised concerns about a possible insider threat. Which of the following are signs of potential insider threat? (Select TWO.)', 'multiple_choice');
+(1, 'A security officer at Kelly Innovations LLC is reviewing recent security incidents to assess potential threats within the organization. Two patterns of behavior have raised concerns about a possible insider threat. Which of the following are signs of potential insider threat? (Select TWO.)', 'multi_select');
 
 INSERT INTO options (question_id, option_key, option_text) VALUES
 (60, 'A', 'Policy advocacy'),
@@ -1192,7 +1192,7 @@ INSERT INTO correct_answers (question_id, answer_key) VALUES
 
 -- Question 1
 INSERT INTO questions (subject_id, question_text, question_type) VALUES
-(2, 'A company has moved its business critical data to Amazon Elastic File System (Amazon EFS) which will be accessed by multiple Amazon EC2 instances.As an AWS Certified Solutions Architect - Associate, which of the following would you recommend to exercise access control such that only the permitted Amazon EC2 instances can read from the Amazon EFS file system? (Select two)', 'multiple_choice');
+(2, 'A company has moved its business critical data to Amazon Elastic File System (Amazon EFS) which will be accessed by multiple Amazon EC2 instances.As an AWS Certified Solutions Architect - Associate, which of the following would you recommend to exercise access control such that only the permitted Amazon EC2 instances can read from the Amazon EFS file system? (Select two)', 'multi_select');
 
 INSERT INTO options (question_id, option_key, option_text) VALUES
 (91, 'A', 'Set up the IAM policy root credentials to control and configure the clients accessing the Amazon EFS file system'),
@@ -1207,7 +1207,7 @@ INSERT INTO correct_answers (question_id, answer_key) VALUES
 
 -- Question 2
 INSERT INTO questions (subject_id, question_text, question_type) VALUES
-(2, 'A digital event-ticketing platform hosts its core transaction-processing service on AWS. The service runs on Amazon EC2 instances and stores finalized transactions in an Amazon Aurora PostgreSQL database. During periods of high user activity - such as flash ticket sales or holiday promotions - the application begins timing out, causing failed or delayed purchases. A solutions architect has been asked to redesign the backend for scalability and cost-efficiency, without reengineering the database layer. Which combination of actions will meet these goals in the most cost-effective and scalable manner? (Select two)', 'multiple_choice');
+(2, 'A digital event-ticketing platform hosts its core transaction-processing service on AWS. The service runs on Amazon EC2 instances and stores finalized transactions in an Amazon Aurora PostgreSQL database. During periods of high user activity - such as flash ticket sales or holiday promotions - the application begins timing out, causing failed or delayed purchases. A solutions architect has been asked to redesign the backend for scalability and cost-efficiency, without reengineering the database layer. Which combination of actions will meet these goals in the most cost-effective and scalable manner? (Select two)', 'multi_select');
 
 INSERT INTO options (question_id, option_key, option_text) VALUES
 (92, 'A', 'Deploy read replicas for the Aurora database in another Region and configure EC2 instances to read and write from the nearest replica based on latency'),
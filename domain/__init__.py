@@ -8,16 +8,34 @@ from .models import (
     Subject,
     Question,
     QuestionType,
+    QuizMode,
     QuizSession,
     QuizResult
 )
+from .question_bank import QuestionBank, QuestionView
+from .batch_grading import BatchResult, answer_key_masks, encode_answers, grade_batch
+from .spaced_repetition import ReviewState, review_quality, schedule_review
+from .adaptive import ItemPool, calibrate_items, estimate_ability
 from .quiz_engine import QuizEngine
 
 __all__ = [
     'Subject',
     'Question',
     'QuestionType',
+    'QuizMode',
     'QuizSession',
     'QuizResult',
+    'QuestionBank',
+    'QuestionView',
+    'BatchResult',
+    'answer_key_masks',
+    'encode_answers',
+    'grade_batch',
+    'ReviewState',
+    'review_quality',
+    'schedule_review',
+    'ItemPool',
+    'calibrate_items',
+    'estimate_ability',
     'QuizEngine'
 ]
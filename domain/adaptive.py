@@ -0,0 +1,235 @@
+"""Adaptive testing with item response theory for the Quiz Application.
+
+Questions are described by the two-parameter logistic (2PL) model: a
+learner of ability theta answers question i correctly with probability
+
+    P_i(theta) = 1 / (1 + exp(-a_i * (theta - b_i)))
+
+where b_i is the question's difficulty and a_i its discrimination. An
+adaptive quiz estimates the learner's ability after every answer and asks
+the question that is most informative at that estimate, the one with the
+largest Fisher information a_i^2 * P_i * (1 - P_i).
+
+Item parameters are calibrated offline from the attempt history with
+calibrate_items (see quiz_calibrate.py), which requires NumPy. Ability
+estimation is plain Python, and ItemPool uses NumPy when it is installed
+and falls back to a (slower) Python loop otherwise.
+"""
+
+import math
+from array import array
+from typing import Iterable, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only calibration needs it
+    np = None
+
+
+# Parameters of questions that have not been calibrated yet
+DEFAULT_DISCRIMINATION = 1.0
+DEFAULT_DIFFICULTY = 0.0
+
+# Quadrature grid for ability estimates (standard normal prior)
+_GRID = [i / 10 for i in range(-40, 41)]
+_PRIOR = [math.exp(-theta * theta / 2) for theta in _GRID]
+
+
+def probability(theta: float, discrimination: float, difficulty: float) -> float:
+    """Probability of a correct answer under the 2PL model."""
+    z = discrimination * (theta - difficulty)
+    if z < -35:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def estimate_ability(responses: Iterable[Tuple[float, float, bool]]) -> Tuple[float, float]:
+    """Estimate a learner's ability from their answers.
+    
+    Uses the expected a posteriori (EAP) estimate with a standard normal
+    prior, which stays finite when every answer is right (or wrong).
+    
+    Args:
+        responses: (discrimination, difficulty, is_correct) of each answered
+            question
+    
+    Returns:
+        Tuple of (ability, standard error); (0.0, 1.0) without answers
+    """
+    posterior = list(_PRIOR)
+    for discrimination, difficulty, is_correct in responses:
+        for k, theta in enumerate(_GRID):
+            p = probability(theta, discrimination, difficulty)
+            posterior[k] *= p if is_correct else 1.0 - p
+    
+    total = sum(posterior)
+    if total <= 0:
+        return 0.0, 1.0
+    mean = sum(w * theta for w, theta in zip(posterior, _GRID)) / total
+    variance = sum(w * (theta - mean) ** 2 for w, theta in zip(posterior, _GRID)) / total
+    return mean, math.sqrt(variance)
+
+
+class ItemPool:
+    """Item parameters of the questions an adaptive quiz can pick from.
+    
+    Attributes:
+        question_ids: Question id of each item
+        discrimination: 2PL discrimination (a) of each item
+        difficulty: 2PL difficulty (b) of each item
+    """
+    
+    def __init__(self, question_ids: Sequence[int], discrimination: Sequence[float],
+                 difficulty: Sequence[float]):
+        """Initialize the pool from parallel sequences."""
+        if np is not None:
+            self.question_ids = np.asarray(question_ids, dtype=np.int64)
+            self.discrimination = np.asarray(discrimination, dtype=np.float64)
+            self.difficulty = np.asarray(difficulty, dtype=np.float64)
+        else:
+            self.question_ids = array('q', question_ids)
+            self.discrimination = array('d', discrimination)
+            self.difficulty = array('d', difficulty)
+        self._index = {int(question_id): i for i, question_id in enumerate(question_ids)}
+    
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, Optional[float], Optional[float]]]) -> 'ItemPool':
+        """Build a pool from (question_id, discrimination, difficulty) rows.
+        
+        Missing parameters (questions not calibrated yet) get
+        DEFAULT_DISCRIMINATION and DEFAULT_DIFFICULTY.
+        """
+        question_ids, discrimination, difficulty = [], [], []
+        for question_id, a, b in rows:
+            question_ids.append(question_id)
+            discrimination.append(DEFAULT_DISCRIMINATION if a is None else a)
+            difficulty.append(DEFAULT_DIFFICULTY if b is None else b)
+        return cls(question_ids, discrimination, difficulty)
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def parameters(self, question_id: int) -> Tuple[float, float]:
+        """Get (discrimination, difficulty) of a question in the pool."""
+        i = self._index[question_id]
+        return float(self.discrimination[i]), float(self.difficulty[i])
+    
+    def most_informative(self, theta: float, exclude: Iterable[int] = ()) -> Optional[int]:
+        """Pick the question with the most information at an ability.
+        
+        Args:
+            theta: Current ability estimate
+            exclude: IDs of questions that must not be picked (already asked)
+        
+        Returns:
+            Question id, or None if every question is excluded
+        """
+        excluded = [self._index[q] for q in exclude if q in self._index]
+        if len(excluded) >= len(self):
+            return None
+        
+        if np is not None:
+            with np.errstate(over="ignore"):
+                p = 1.0 / (1.0 + np.exp(-self.discrimination * (theta - self.difficulty)))
+            information = self.discrimination * self.discrimination * p * (1.0 - p)
+            information[excluded] = -1.0
+            return int(self.question_ids[int(np.argmax(information))])
+        
+        skip = set(excluded)
+        best, best_information = None, -1.0
+        for i, (a, b) in enumerate(zip(self.discrimination, self.difficulty)):
+            if i in skip:
+                continue
+            p = probability(theta, a, b)
+            information = a * a * p * (1.0 - p)
+            if information > best_information:
+                best, best_information = i, information
+        return self.question_ids[best]
+
+
+def calibrate_items(person_index, item_index, correct, n_persons: int, n_items: int,
+                    iterations: int = 100, tolerance: float = 1e-4):
+    """Calibrate 2PL item parameters from a response history.
+    
+    Abilities and item parameters are estimated jointly (maximum a
+    posteriori) by alternating Newton steps over all responses at once:
+    one step for every learner's ability, then one for every item's slope
+    and intercept (z = a * theta + c, so b = -c / a), which is a concave
+    logistic regression per item. Abilities are standardized after each
+    round to fix the scale. Weak priors, N(0, 1) on abilities, N(1, 1) on
+    discriminations and N(0, 3^2) on intercepts, keep estimates finite for
+    items and learners with few or uniform responses.
+    
+    Args:
+        person_index: Integer array, the learner (e.g. attempt) of each
+            response, from 0 to n_persons - 1
+        item_index: Integer array, the item of each response, from 0 to
+            n_items - 1
+        correct: Boolean array, whether each response was correct
+        n_persons: Number of learners
+        n_items: Number of items
+        iterations: Maximum number of Newton rounds
+        tolerance: Stop once no parameter moves by more than this
+    
+    Returns:
+        Tuple of arrays (discrimination, difficulty, ability)
+    
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    if np is None:
+        raise ImportError("Item calibration requires NumPy (pip install numpy)")
+    
+    person_index = np.asarray(person_index, dtype=np.int64)
+    item_index = np.asarray(item_index, dtype=np.int64)
+    y = np.asarray(correct, dtype=np.float64)
+    
+    theta = np.zeros(n_persons)
+    slope = np.ones(n_items)
+    intercept = np.zeros(n_items)
+    
+    def residuals():
+        z = slope[item_index] * theta[person_index] + intercept[item_index]
+        p = 1.0 / (1.0 + np.exp(-np.clip(z, -35, 35)))
+        return y - p, p * (1.0 - p)
+    
+    for _ in range(iterations):
+        # Abilities, items fixed
+        e, w = residuals()
+        a = slope[item_index]
+        step_theta = np.clip((np.bincount(person_index, a * e, n_persons) - theta)
+                             / (np.bincount(person_index, a * a * w, n_persons) + 1.0),
+                             -1.0, 1.0)
+        theta += step_theta
+        
+        # Fix the scale to standardized abilities; otherwise abilities and
+        # discriminations drift in opposite directions
+        mean, sd = theta.mean(), theta.std()
+        if sd > 0:
+            theta = (theta - mean) / sd
+            intercept += slope * mean
+            slope *= sd
+        
+        # Slope and intercept of every item, abilities fixed
+        e, w = residuals()
+        t = theta[person_index]
+        g_slope = np.bincount(item_index, e * t, n_items) - (slope - 1.0)
+        g_intercept = np.bincount(item_index, e, n_items) - intercept / 9.0
+        h_ss = np.bincount(item_index, w * t * t, n_items) + 1.0
+        h_si = np.bincount(item_index, w * t, n_items)
+        h_ii = np.bincount(item_index, w, n_items) + 1 / 9.0
+        det = h_ss * h_ii - h_si * h_si
+        step_slope = np.clip((h_ii * g_slope - h_si * g_intercept) / det, -1.0, 1.0)
+        step_intercept = np.clip((h_ss * g_intercept - h_si * g_slope) / det, -1.0, 1.0)
+        # Keep discriminations positive: a wrong-way item is not usable
+        new_slope = np.maximum(slope + step_slope, 0.05)
+        step_slope = new_slope - slope
+        slope = new_slope
+        intercept += step_intercept
+        
+        largest = max(np.abs(step_theta).max(initial=0), np.abs(step_slope).max(initial=0),
+                      np.abs(step_intercept).max(initial=0))
+        if largest < tolerance:
+            break
+    
+    return slope, -intercept / slope, theta
@@ -0,0 +1,161 @@
+"""Vectorized batch grading for the Quiz Application.
+
+This module grades many submissions of the same questions at once with
+NumPy array operations, e.g. a whole cohort's exams, or the history of a
+question set again after an answer key was corrected. Answers and answer
+keys use the bitmask encoding of Question (one bit per option key), so a
+cohort is a single (submissions x questions) integer matrix.
+
+NumPy is an optional dependency: the rest of the domain package works
+without it, and the functions here raise ImportError when it is missing.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only batch grading needs it
+    np = None
+
+from .models import Question, QuizResult, Subject, performance_rating
+
+
+def _require_numpy() -> None:
+    """Raise a helpful error when NumPy is not installed."""
+    if np is None:
+        raise ImportError("Batch grading requires NumPy (pip install numpy)")
+
+
+def _popcount(masks):
+    """Count the set bits of every element of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(masks)
+    # NumPy < 2.0: count per byte with a lookup table
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = masks.reshape(masks.shape + (1,)).view(np.uint8)
+    return table[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+
+def answer_key_masks(questions: Sequence[Question]):
+    """Get the answer keys of a question set as a uint64 array.
+    
+    Args:
+        questions: Questions (or QuestionBank views), or a QuestionBank
+    
+    Returns:
+        Array with the correct answer bitmask of each question
+    """
+    _require_numpy()
+    if hasattr(questions, "correct_masks"):
+        # A QuestionBank already stores its keys as a uint64 column
+        return np.frombuffer(questions.correct_masks(), dtype=np.uint64)
+    return np.array([q.correct_mask for q in questions], dtype=np.uint64)
+
+
+def encode_answers(questions: Sequence[Question], submissions: Sequence[Sequence[Optional[List[str]]]]):
+    """Encode submitted answer lists as a bitmask matrix.
+    
+    Args:
+        questions: The questions, in the order of each submission's answers
+        submissions: One list of answers per submission; each answer is a
+            list of answer keys, or None/empty when unanswered
+    
+    Returns:
+        uint64 array of shape (submissions, questions); 0 means unanswered
+    """
+    _require_numpy()
+    answers = np.zeros((len(submissions), len(questions)), dtype=np.uint64)
+    for row, submission in enumerate(submissions):
+        answers[row] = [q.answer_mask(answer) for q, answer in zip(questions, submission)]
+    return answers
+
+
+@dataclass
+class BatchResult:
+    """Results of grading a batch of submissions.
+    
+    Attributes:
+        correct: Boolean array (submissions x questions), True where fully correct
+        partial_credit: Float array (submissions x questions) of credit from
+            0.0 to 1.0, as computed by Question.partial_credit
+        scores: Number of correct answers per submission
+        percentages: Percentage score per submission
+    """
+    correct: "np.ndarray"
+    partial_credit: "np.ndarray"
+    scores: "np.ndarray"
+    percentages: "np.ndarray"
+    
+    @property
+    def question_success_rates(self):
+        """Fraction of submissions that answered each question correctly."""
+        if not len(self.correct):
+            return np.zeros(self.correct.shape[1])
+        return self.correct.mean(axis=0)
+    
+    def to_quiz_result(self, index: int, subject: Subject, questions: Sequence[Question],
+                       answers) -> QuizResult:
+        """Build the QuizResult of one submission.
+        
+        Args:
+            index: Row of the submission in the batch
+            subject: Subject of the quiz
+            questions: The graded questions
+            answers: The answer bitmask matrix that was graded
+        
+        Returns:
+            QuizResult equal to what QuizEngine.calculate_results returns
+            for the same answers
+        """
+        question_results = []
+        for column, question in enumerate(questions):
+            user_answer = question.answer_keys(int(answers[index, column]))
+            question_results.append((question, user_answer, bool(self.correct[index, column])))
+        
+        percentage = float(self.percentages[index])
+        return QuizResult(
+            subject=subject,
+            total_questions=len(questions),
+            correct_answers=int(self.scores[index]),
+            percentage=percentage,
+            performance_rating=performance_rating(percentage),
+            question_results=question_results
+        )
+
+
+def grade_batch(answers, answer_keys) -> BatchResult:
+    """Grade a matrix of submissions against the answer keys.
+    
+    An answer is correct when its bitmask equals the key. Partial credit
+    gives each correct key chosen an equal share of the question and takes
+    one share away for each wrong key chosen, never going below zero.
+    
+    Args:
+        answers: Array-like of answer bitmasks, shape (submissions, questions)
+        answer_keys: Array-like of correct answer bitmasks, shape (questions,)
+    
+    Returns:
+        BatchResult for every submission and question
+    """
+    _require_numpy()
+    answers = np.asarray(answers, dtype=np.uint64)
+    keys = np.asarray(answer_keys, dtype=np.uint64)
+    if answers.ndim != 2 or answers.shape[1] != keys.shape[0]:
+        raise ValueError(f"answers must have shape (submissions, {keys.shape[0]}), "
+                         f"got {answers.shape}")
+    
+    correct = (answers == keys) & (answers != 0)
+    scores = correct.sum(axis=1)
+    total = keys.shape[0]
+    percentages = scores / total * 100 if total else np.zeros(len(answers))
+    
+    hits = _popcount(answers & keys).astype(np.int16)
+    wrong = _popcount(answers & ~keys).astype(np.int16)
+    key_sizes = _popcount(keys).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        credit = np.maximum(hits - wrong, 0) / key_sizes
+    credit[:, key_sizes == 0] = 0.0
+    
+    return BatchResult(correct=correct, partial_credit=credit, scores=scores,
+                       percentages=percentages)
@@ -5,18 +5,179 @@ of the quiz application. These models provide a clean separation between the
 database layer and the UI layer.
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Set, Tuple
 from enum import Enum
 
 
+# Slotted dataclasses (no per-instance __dict__) where Python supports them
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Shared (keys, key -> bit) layouts, one per distinct set of option keys
+_KEY_LAYOUTS: Dict[Tuple[str, ...], Tuple[Tuple[str, ...], Dict[str, int]]] = {}
+
+
+def _popcount(mask: int) -> int:
+    """Count the set bits of a non-negative integer."""
+    return bin(mask).count("1")
+
+
+def key_layout(keys) -> Tuple[Tuple[str, ...], Dict[str, int]]:
+    """Get the shared bit layout for a set of option keys.
+    
+    Questions with the same option keys (nearly all share A-D) reuse one
+    interned key tuple and one key-to-bit mapping instead of holding their
+    own copies.
+    
+    Args:
+        keys: Option keys (and any correct answer keys) of a question
+        
+    Returns:
+        Tuple of (sorted interned keys, dictionary mapping key to bit)
+    """
+    ordered = tuple(sorted(set(keys)))
+    layout = _KEY_LAYOUTS.get(ordered)
+    if layout is None:
+        ordered = tuple(sys.intern(key) for key in ordered)
+        layout = (ordered, {key: 1 << i for i, key in enumerate(ordered)})
+        _KEY_LAYOUTS[ordered] = layout
+    return layout
+
+
+def performance_rating(percentage: float) -> str:
+    """Get the performance rating shown for a percentage score.
+    
+    Args:
+        percentage: Percentage score (0.0 to 100.0)
+        
+    Returns:
+        Performance rating string
+    """
+    if percentage >= 90:
+        return "Excellent work! 🌟"
+    elif percentage >= 70:
+        return "Good job! 👍"
+    elif percentage >= 50:
+        return "Not bad! Keep practicing! 📚"
+    else:
+        return "Keep studying! You can do better! 💪"
+
+
+class _GradingMixin:
+    """Bitmask grading shared by Question and the views of a QuestionBank.
+    
+    Requires question_text, correct_mask and the _keys/_bits layout from
+    key_layout().
+    """
+    
+    __slots__ = ()
+    
+    def answer_mask(self, answer: Optional[List[str]]) -> int:
+        """Encode answer keys as a bitmask.
+        
+        Keys that are not options of this question set a bit above all
+        option bits, so such an answer is never graded correct.
+        
+        Args:
+            answer: List of answer keys (None or empty for no answer)
+            
+        Returns:
+            Bitmask of the answer (0 for no answer)
+        """
+        mask = 0
+        for key in answer or ():
+            mask |= self._bits.get(key, 1 << len(self._keys))
+        return mask
+    
+    def answer_keys(self, mask: int) -> List[str]:
+        """Decode a bitmask into its answer keys, in sorted order.
+        
+        Args:
+            mask: Bitmask produced by answer_mask()
+            
+        Returns:
+            List of answer keys
+        """
+        return [key for i, key in enumerate(self._keys) if mask >> i & 1]
+    
+    def is_multi_select(self) -> bool:
+        """Check if this question has multiple correct answers."""
+        return self.correct_mask & (self.correct_mask - 1) != 0
+    
+    def is_mask_correct(self, mask: int) -> bool:
+        """Check if an answer bitmask is correct."""
+        return mask != 0 and mask == self.correct_mask
+    
+    def is_answer_correct(self, user_answer: List[str]) -> bool:
+        """Check if the user's answer is correct.
+        
+        Args:
+            user_answer: List of answer keys selected by the user
+            
+        Returns:
+            True if the answer is correct, False otherwise
+        """
+        return self.is_mask_correct(self.answer_mask(user_answer))
+    
+    def grade_mask(self, mask: int) -> Tuple[int, int, int]:
+        """Compare an answer bitmask with the correct answers.
+        
+        Args:
+            mask: Bitmask produced by answer_mask()
+            
+        Returns:
+            Tuple of (correct keys chosen, wrong keys chosen, correct keys missed)
+        """
+        return (_popcount(mask & self.correct_mask),
+                _popcount(mask & ~self.correct_mask),
+                _popcount(self.correct_mask & ~mask))
+    
+    def partial_credit(self, user_answer: List[str]) -> float:
+        """Get partial credit for an answer.
+        
+        Each correct key chosen earns an equal share of the question and each
+        wrong key chosen takes one share away, never going below zero.
+        
+        Args:
+            user_answer: List of answer keys selected by the user
+            
+        Returns:
+            Credit from 0.0 to 1.0 (1.0 only for a fully correct answer)
+        """
+        if not self.correct_mask:
+            return 0.0
+        hits, wrong, _ = self.grade_mask(self.answer_mask(user_answer))
+        return max(hits - wrong, 0) / _popcount(self.correct_mask)
+    
+    def get_truncated_text(self, max_length: int = 100) -> str:
+        """Get a truncated version of the question text.
+        
+        Args:
+            max_length: Maximum length of the text
+            
+        Returns:
+            Truncated question text with ellipsis if needed
+        """
+        if len(self.question_text) <= max_length:
+            return self.question_text
+        return self.question_text[:max_length - 3] + "..."
+
+
 class QuestionType(Enum):
     """Enum representing the types of questions in a quiz."""
     MULTIPLE_CHOICE = "multiple_choice"
     MULTI_SELECT = "multi_select"
 
 
-@dataclass
+class QuizMode(Enum):
+    """Enum representing how the questions of a quiz are picked."""
+    RANDOM = "random"
+    REVIEW = "review"
+    ADAPTIVE = "adaptive"
+
+
+@dataclass(**_SLOTS)
 class Subject:
     """Represents a quiz subject/category.
     
@@ -29,14 +190,23 @@ class Subject:
     description: str = ""
     id: Optional[int] = None
     
+    def __post_init__(self):
+        """Intern the name, which is repeated across many objects."""
+        self.name = sys.intern(self.name)
+    
     def __str__(self) -> str:
         return self.name
 
 
-@dataclass
-class Question:
+@dataclass(**_SLOTS)
+class Question(_GradingMixin):
     """Represents a quiz question.
     
+    Answers are graded as bitmasks: each option key maps to one bit (in
+    sorted key order), so an answer is a single integer and grading is one
+    integer comparison. correct_answers and the list-based methods are kept
+    as a view over correct_mask.
+    
     Attributes:
         id: Unique identifier for the question
         subject_id: ID of the subject this question belongs to
@@ -45,6 +215,7 @@ class Question:
         options: Dictionary mapping option keys (A, B, C, etc.) to option text
         correct_answers: List of correct answer keys
         subject_name: Name of the subject (optional, for display purposes)
+        correct_mask: Bitmask of the correct answer keys
     """
     question_text: str
     question_type: QuestionType
@@ -53,6 +224,9 @@ class Question:
     subject_id: Optional[int] = None
     id: Optional[int] = None
     subject_name: Optional[str] = None
+    correct_mask: int = field(default=0, init=False, repr=False, compare=False)
+    _keys: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _bits: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate and normalize the question data."""
@@ -64,38 +238,17 @@ class Question:
         if not isinstance(self.correct_answers, list):
             self.correct_answers = [self.correct_answers]
         
-        # Sort correct answers for consistency
-        self.correct_answers = sorted(self.correct_answers)
-    
-    def is_multi_select(self) -> bool:
-        """Check if this question has multiple correct answers."""
-        return len(self.correct_answers) > 1
-    
-    def is_answer_correct(self, user_answer: List[str]) -> bool:
-        """Check if the user's answer is correct.
+        # Subject names repeat on every question of the subject
+        if self.subject_name is not None:
+            self.subject_name = sys.intern(self.subject_name)
         
-        Args:
-            user_answer: List of answer keys selected by the user
-            
-        Returns:
-            True if the answer is correct, False otherwise
-        """
-        if not user_answer:
-            return False
-        return sorted(set(user_answer)) == sorted(set(self.correct_answers))
-    
-    def get_truncated_text(self, max_length: int = 100) -> str:
-        """Get a truncated version of the question text.
+        # One bit per option key; a correct key missing from the options
+        # still gets its own bit so that it is kept in correct_answers
+        self._keys, self._bits = key_layout(list(self.options) + self.correct_answers)
+        self.correct_mask = self.answer_mask(self.correct_answers)
         
-        Args:
-            max_length: Maximum length of the text
-            
-        Returns:
-            Truncated question text with ellipsis if needed
-        """
-        if len(self.question_text) <= max_length:
-            return self.question_text
-        return self.question_text[:max_length - 3] + "..."
+        # Sorted, de-duplicated correct answers for consistency
+        self.correct_answers = self.answer_keys(self.correct_mask)
     
     @classmethod
     def from_db_dict(cls, data: Dict) -> 'Question':
@@ -137,23 +290,36 @@ class Question:
 class QuizSession:
     """Represents an active quiz session.
     
+    The score and the set of unanswered questions are kept up to date as
+    answers are saved, so reading them costs the same for a long exam as
+    for a short quiz. Answers are stored as bitmasks (see Question), with
+    user_answers kept as their decoded view; they must therefore be changed
+    through save_answer() or set_answer(), not by assigning to user_answers.
+    
     Attributes:
         subject: The subject of this quiz
         questions: List of questions in this quiz
         current_question_index: Index of the current question (0-based)
         user_answers: List of user's answers for each question
-        score: Current score
+        score: Number of correctly answered questions so far
     """
     subject: Subject
     questions: List[Question]
     current_question_index: int = 0
     user_answers: List[Optional[List[str]]] = field(default_factory=list)
     score: int = 0
+    _masks: List[int] = field(default_factory=list, init=False, repr=False)
+    _unanswered: Set[int] = field(default_factory=set, init=False, repr=False)
     
     def __post_init__(self):
-        """Initialize user answers list if not provided."""
-        if not self.user_answers:
-            self.user_answers = [None] * len(self.questions)
+        """Initialize user answers list if not provided and the running counters."""
+        answers = self.user_answers or [None] * len(self.questions)
+        self.user_answers = [None] * len(self.questions)
+        self._masks = [0] * len(self.questions)
+        self._unanswered = set(range(len(self.questions)))
+        self.score = 0
+        for i, answer in enumerate(answers):
+            self.set_answer(i, answer)
     
     def get_current_question(self) -> Optional[Question]:
         """Get the current question.
@@ -165,14 +331,56 @@ class QuizSession:
             return self.questions[self.current_question_index]
         return None
     
+    def add_question(self, question: Question) -> None:
+        """Append a question to the quiz, unanswered.
+        
+        Args:
+            question: Question to ask after the current last one
+        """
+        self.questions.append(question)
+        self.user_answers.append(None)
+        self._masks.append(0)
+        self._unanswered.add(len(self.questions) - 1)
+    
     def save_answer(self, answer: List[str]) -> None:
         """Save the user's answer for the current question.
         
         Args:
             answer: List of selected answer keys
+            
+        Raises:
+            ValueError: If a key is not an option of the question
         """
-        if 0 <= self.current_question_index < len(self.questions):
-            self.user_answers[self.current_question_index] = sorted(answer) if answer else None
+        self.set_answer(self.current_question_index, answer)
+    
+    def set_answer(self, index: int, answer: Optional[List[str]]) -> None:
+        """Save the user's answer for any question, updating score and progress.
+        
+        Args:
+            index: 0-based index of the question
+            answer: List of selected answer keys (empty or None to clear)
+            
+        Raises:
+            ValueError: If a key is not an option of the question; the saved
+                answer is left unchanged
+        """
+        if not 0 <= index < len(self.questions):
+            return
+        
+        question = self.questions[index]
+        unknown = [key for key in answer or () if key not in question.options]
+        if unknown:
+            raise ValueError(f"{unknown} are not options of question {question.id}")
+        mask = question.answer_mask(answer)
+        self.score += question.is_mask_correct(mask) - question.is_mask_correct(self._masks[index])
+        self._masks[index] = mask
+        
+        if mask:
+            self.user_answers[index] = question.answer_keys(mask)
+            self._unanswered.discard(index)
+        else:
+            self.user_answers[index] = None
+            self._unanswered.add(index)
     
     def next_question(self) -> bool:
         """Move to the next question.
@@ -210,7 +418,25 @@ class QuizSession:
         Returns:
             List of question numbers that haven't been answered
         """
-        return [i + 1 for i, answer in enumerate(self.user_answers) if answer is None]
+        return sorted(i + 1 for i in self._unanswered)
+    
+    def get_unanswered_count(self) -> int:
+        """Get the number of unanswered questions."""
+        return len(self._unanswered)
+    
+    def get_answered_count(self) -> int:
+        """Get the number of answered questions."""
+        return len(self.questions) - len(self._unanswered)
+    
+    def get_answer_mask(self, index: int) -> int:
+        """Get the saved answer at a 0-based index as a bitmask (0 if unanswered)."""
+        if 0 <= index < len(self._masks):
+            return self._masks[index]
+        return 0
+    
+    def is_correct_at(self, index: int) -> bool:
+        """Check whether the saved answer at a 0-based index is correct."""
+        return 0 <= index < len(self._masks) and self.questions[index].is_mask_correct(self._masks[index])
     
     def calculate_score(self) -> int:
         """Calculate the total score for the quiz.
@@ -218,11 +444,6 @@ class QuizSession:
         Returns:
             Number of correctly answered questions
         """
-        self.score = 0
-        for i, question in enumerate(self.questions):
-            user_answer = self.user_answers[i] if self.user_answers[i] else []
-            if question.is_answer_correct(user_answer):
-                self.score += 1
         return self.score
     
     def get_percentage(self) -> float:
@@ -241,15 +462,7 @@ class QuizSession:
         Returns:
             Performance rating string
         """
-        percentage = self.get_percentage()
-        if percentage >= 90:
-            return "Excellent work! 🌟"
-        elif percentage >= 70:
-            return "Good job! 👍"
-        elif percentage >= 50:
-            return "Not bad! Keep practicing! 📚"
-        else:
-            return "Keep studying! You can do better! 💪"
+        return performance_rating(self.get_percentage())
     
     def get_progress_percentage(self) -> float:
         """Get the current progress through the quiz as a percentage.
@@ -0,0 +1,240 @@
+"""Columnar in-memory question bank for the Quiz Application.
+
+This module provides QuestionBank, which keeps a large number of questions
+resident in a few flat arrays instead of one object graph per question, and
+QuestionView, a light Question-compatible view of one row of the bank.
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .models import Question, QuestionType, _GradingMixin, key_layout
+
+
+_QUESTION_TYPES = list(QuestionType)
+
+# Marks a missing id or subject id in the integer columns
+_NONE = -1
+
+
+class QuestionBank:
+    """A read-mostly, memory-compact store of questions.
+    
+    Each attribute of a question lives in its own column: integers and
+    bitmasks in typed arrays, texts in flat lists. Subject names and option
+    key layouts are stored once and referenced by index, and the options of
+    all questions share one list of texts addressed through an offsets
+    array. A question therefore costs a few machine words plus its texts,
+    instead of a dataclass, an options dict and a list of answers.
+    
+    Indexing or iterating yields QuestionView objects that are created on
+    demand and read from the columns.
+    
+    Attributes:
+        subject_names: Interned subject names referenced by the questions
+    """
+    
+    def __init__(self, questions: Iterable[Question] = ()):
+        """Initialize the bank, optionally filled with questions.
+        
+        Args:
+            questions: Question objects (or views) to add
+        """
+        self._ids = array('q')
+        self._subject_ids = array('q')
+        self._subject_refs = array('l')
+        self._types = array('b')
+        self._layout_refs = array('l')
+        self._correct_masks = array('Q')
+        self._option_offsets = array('q', [0])
+        self._texts: List[str] = []
+        self._option_texts: List[Optional[str]] = []
+        
+        self.subject_names: List[Optional[str]] = []
+        self._subject_index: Dict[Optional[str], int] = {}
+        self._layouts: List[tuple] = []
+        self._layout_index: Dict[tuple, int] = {}
+        
+        self.extend(questions)
+    
+    @classmethod
+    def from_db_rows(cls, rows: Iterable[Dict]) -> 'QuestionBank':
+        """Build a bank from hydrated database rows.
+        
+        Args:
+            rows: Dictionaries with question_text, question_type, options,
+                correct_answers and optionally id, subject_id and subject_name
+                (as returned by QuizDatabase.get_questions_by_ids)
+        
+        Returns:
+            QuestionBank with one question per row
+        """
+        bank = cls()
+        for row in rows:
+            bank._append(
+                row.get('id'), row.get('subject_id'), row.get('subject_name'),
+                row['question_text'], QuestionType(row['question_type']),
+                row['options'], row.get('correct_answers', row.get('correct_answer', []))
+            )
+        return bank
+    
+    def append(self, question: Question) -> None:
+        """Add a question to the end of the bank."""
+        self._append(question.id, question.subject_id, question.subject_name,
+                     question.question_text, question.question_type,
+                     question.options, question.correct_answers)
+    
+    def extend(self, questions: Iterable[Question]) -> None:
+        """Add several questions to the end of the bank."""
+        for question in questions:
+            self.append(question)
+    
+    def _append(self, question_id, subject_id, subject_name, question_text,
+                question_type, options, correct_answers) -> None:
+        """Store one question's fields in the columns."""
+        keys, bits = key_layout(list(options) + list(correct_answers))
+        if len(keys) > 64:
+            raise ValueError(f"Questions with more than 64 option keys are not supported "
+                             f"(got {len(keys)})")
+        correct_mask = 0
+        for key in correct_answers:
+            correct_mask |= bits[key]
+        
+        self._ids.append(_NONE if question_id is None else question_id)
+        self._subject_ids.append(_NONE if subject_id is None else subject_id)
+        self._subject_refs.append(self._subject_ref(subject_name))
+        self._types.append(_QUESTION_TYPES.index(question_type))
+        self._layout_refs.append(self._layout_ref(keys))
+        self._correct_masks.append(correct_mask)
+        self._texts.append(question_text)
+        
+        # Texts in key order; keys only present in the answers have no text
+        for key in keys:
+            if key in options:
+                self._option_texts.append(options[key])
+            else:
+                self._option_texts.append(None)
+        self._option_offsets.append(len(self._option_texts))
+    
+    def _subject_ref(self, subject_name: Optional[str]) -> int:
+        """Index of a subject name in subject_names, adding it if needed."""
+        ref = self._subject_index.get(subject_name)
+        if ref is None:
+            ref = len(self.subject_names)
+            self.subject_names.append(sys.intern(subject_name) if subject_name else subject_name)
+            self._subject_index[subject_name] = ref
+        return ref
+    
+    def _layout_ref(self, keys: tuple) -> int:
+        """Index of an option key layout, adding it if needed."""
+        ref = self._layout_index.get(keys)
+        if ref is None:
+            ref = len(self._layouts)
+            self._layouts.append(key_layout(keys))
+            self._layout_index[keys] = ref
+        return ref
+    
+    def __len__(self) -> int:
+        return len(self._texts)
+    
+    def __getitem__(self, index: int) -> 'QuestionView':
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        return QuestionView(self, index)
+    
+    def __iter__(self) -> Iterator['QuestionView']:
+        for index in range(len(self)):
+            yield QuestionView(self, index)
+    
+    def correct_masks(self) -> array:
+        """The correct answer bitmask of every question, in bank order."""
+        return self._correct_masks
+
+
+class QuestionView(_GradingMixin):
+    """Read-only, Question-compatible view of one question in a QuestionBank.
+    
+    Supports the attributes and grading methods of Question. options and
+    correct_answers are built on access; use to_question() to get a full,
+    independent Question.
+    """
+    
+    __slots__ = ('_bank', '_index')
+    
+    def __init__(self, bank: QuestionBank, index: int):
+        self._bank = bank
+        self._index = index
+    
+    @property
+    def id(self) -> Optional[int]:
+        value = self._bank._ids[self._index]
+        return None if value == _NONE else value
+    
+    @property
+    def subject_id(self) -> Optional[int]:
+        value = self._bank._subject_ids[self._index]
+        return None if value == _NONE else value
+    
+    @property
+    def subject_name(self) -> Optional[str]:
+        return self._bank.subject_names[self._bank._subject_refs[self._index]]
+    
+    @property
+    def question_text(self) -> str:
+        return self._bank._texts[self._index]
+    
+    @property
+    def question_type(self) -> QuestionType:
+        return _QUESTION_TYPES[self._bank._types[self._index]]
+    
+    @property
+    def correct_mask(self) -> int:
+        return self._bank._correct_masks[self._index]
+    
+    @property
+    def _keys(self) -> tuple:
+        return self._bank._layouts[self._bank._layout_refs[self._index]][0]
+    
+    @property
+    def _bits(self) -> Dict[str, int]:
+        return self._bank._layouts[self._bank._layout_refs[self._index]][1]
+    
+    @property
+    def options(self) -> Dict[str, str]:
+        start = self._bank._option_offsets[self._index]
+        texts = self._bank._option_texts
+        return {key: texts[start + i] for i, key in enumerate(self._keys)
+                if texts[start + i] is not None}
+    
+    @property
+    def correct_answers(self) -> List[str]:
+        return self.answer_keys(self.correct_mask)
+    
+    def to_question(self) -> Question:
+        """Materialize the view as an independent Question."""
+        return Question(
+            id=self.id,
+            subject_id=self.subject_id,
+            subject_name=self.subject_name,
+            question_text=self.question_text,
+            question_type=self.question_type,
+            options=self.options,
+            correct_answers=self.correct_answers
+        )
+    
+    def to_db_dict(self) -> Dict:
+        """Convert the question to database dictionary format."""
+        return self.to_question().to_db_dict()
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, QuestionView):
+            other = other.to_question()
+        return self.to_question() == other
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"QuestionView({self.to_question()!r})"
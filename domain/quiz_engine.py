@@ -4,8 +4,15 @@ This module provides the QuizEngine class which encapsulates all the business
 logic for running a quiz, managing state, and calculating results.
 """
 
-from typing import List, Optional
-from .models import Subject, Question, QuizSession, QuizResult, QuestionType
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from .models import Subject, Question, QuizSession, QuizResult, QuestionType, QuizMode
+from .spaced_repetition import DEFAULT_EASE, ReviewState, review_quality, schedule_review
+from .adaptive import ItemPool, estimate_ability
+
+
+# Number of questions of an adaptive quiz (fewer if the subject has fewer)
+ADAPTIVE_QUIZ_LENGTH = 20
 
 
 class QuizEngine:
@@ -21,61 +28,264 @@ class QuizEngine:
     Attributes:
         session: The current quiz session
         db: Database connection object
+        mode: How the questions of the current quiz were picked
+        user_name: User whose review schedule a review quiz follows
+        review_states: Spaced repetition state of each question of a
+            review quiz, by question id
+        item_pool: Questions an adaptive quiz picks from, with their item
+            parameters
+        ability: Ability estimate of the learner in an adaptive quiz
+        ability_error: Standard error of the ability estimate
+        adaptive_length: Number of questions the adaptive quiz will ask
+        journal: Receives every change of the quiz in progress (e.g. an
+            AutosaveJournal), or None
     """
     
-    def __init__(self, db):
+    def __init__(self, db, journal=None):
         """Initialize the quiz engine.
         
         Args:
             db: Database connection object (QuizDatabase instance)
+            journal: Optional journal to report the changes of each quiz to
         """
         self.db = db
+        self.journal = journal
         self.session: Optional[QuizSession] = None
+        self.mode = QuizMode.RANDOM
+        self.user_name: Optional[str] = None
+        self.review_states: Dict[int, ReviewState] = {}
+        self.item_pool: Optional[ItemPool] = None
+        self.ability = 0.0
+        self.ability_error = 1.0
+        self.adaptive_length = 0
     
-    def load_quiz(self, subject_id: int, subject_name: str, shuffle: bool = True) -> bool:
+    def load_quiz(self, subject_id: int, subject_name: str, shuffle: bool = True,
+                  seed: Optional[int] = None, mode: QuizMode = QuizMode.RANDOM,
+                  user_name: Optional[str] = None) -> bool:
         """Load a new quiz for the specified subject.
         
         Args:
             subject_id: ID of the subject to load questions for
             subject_name: Name of the subject
             shuffle: Whether to shuffle the questions (default: True)
+            seed: Optional seed to reproduce the same quiz (default: None)
+            mode: QuizMode.RANDOM for a random sample of the subject,
+                QuizMode.REVIEW for the user's most overdue questions, or
+                QuizMode.ADAPTIVE to pick each question from the answers so far
+            user_name: User whose review schedule to follow (review mode)
             
         Returns:
             True if quiz loaded successfully, False otherwise
         """
         try:
             # Load questions from database
-            question_dicts = self.db.get_questions_by_subject(subject_id, shuffle=shuffle)
+            question_dicts = self.fetch_questions(subject_id, mode, user_name,
+                                                  shuffle=shuffle, seed=seed)
             
             if not question_dicts:
                 return False
             
-            # Convert database dictionaries to Question objects
-            questions = []
-            for q_dict in question_dicts:
-                question = Question(
-                    question_text=q_dict['question'],
-                    question_type=QuestionType(q_dict['type']),
-                    options=q_dict['options'],
-                    correct_answers=q_dict['correct_answer'],
-                    subject_id=subject_id
-                )
-                questions.append(question)
+            return self.start_quiz(subject_id, subject_name, question_dicts,
+                                   mode=mode, user_name=user_name)
             
-            # Create subject object
-            subject = Subject(name=subject_name, id=subject_id)
+        except Exception as e:
+            print(f"Error loading quiz: {e}")
+            return False
+    
+    def fetch_questions(self, subject_id: int, mode: QuizMode = QuizMode.RANDOM,
+                        user_name: Optional[str] = None, shuffle: bool = True,
+                        seed: Optional[int] = None) -> Union[List[dict], ItemPool]:
+        """Fetch the questions of a new quiz without starting it.
+        
+        Only reads from the database, so it may run on a worker thread; pass
+        the result to start_quiz with the same mode and user.
+        
+        Args:
+            subject_id: ID of the subject to load questions for
+            mode: How to pick the questions (see load_quiz)
+            user_name: User whose review schedule to follow (review mode)
+            shuffle: Whether to shuffle the questions (random mode)
+            seed: Optional seed to reproduce the same quiz (random mode)
             
-            # Create new quiz session
-            self.session = QuizSession(
-                subject=subject,
-                questions=questions
-            )
+        Returns:
+            List of question dictionaries, or in adaptive mode the ItemPool
+            of the subject (questions are fetched one at a time as the quiz
+            goes on)
             
+        Raises:
+            ValueError: If review mode is requested without a user
+        """
+        if mode == QuizMode.REVIEW:
+            if not user_name:
+                raise ValueError("Review quizzes need a user name")
+            return self.db.get_due_questions(user_name, subject_id)
+        if mode == QuizMode.ADAPTIVE:
+            return ItemPool.from_rows(self.db.get_item_parameters(subject_id))
+        return self.db.get_questions_by_subject(subject_id, shuffle=shuffle, seed=seed)
+    
+    def start_quiz(self, subject_id: int, subject_name: str,
+                   question_dicts: Union[List[dict], ItemPool],
+                   mode: QuizMode = QuizMode.RANDOM, user_name: Optional[str] = None,
+                   first_question: Optional[Question] = None) -> bool:
+        """Start a new quiz from questions that have already been fetched.
+        
+        This lets callers fetch questions elsewhere (e.g. on a worker thread)
+        and only build the session where it is used.
+        
+        Args:
+            subject_id: ID of the subject the questions belong to
+            subject_name: Name of the subject
+            question_dicts: Questions as returned by fetch_questions (the
+                ItemPool of an adaptive quiz)
+            mode: How the questions were picked
+            user_name: User whose review schedule the quiz follows
+            first_question: First question of an adaptive quiz, from
+                fetch_next_item(pool); fetched here if not given
+            
+        Returns:
+            True if the quiz was started, False if there are no questions
+        """
+        self.mode = mode
+        self.user_name = user_name
+        self.review_states = {}
+        self.item_pool = None
+        if not question_dicts:
+            self.session = None
+            return False
+        
+        if mode == QuizMode.ADAPTIVE:
+            if not self._start_adaptive_quiz(subject_id, subject_name, question_dicts,
+                                             first_question):
+                return False
+            self._journal_begin()
             return True
+        
+        # Convert database dictionaries to Question objects
+        questions = []
+        for q_dict in question_dicts:
+            question = Question(
+                id=q_dict.get('id'),
+                question_text=q_dict['question'],
+                question_type=QuestionType(q_dict['type']),
+                options=q_dict['options'],
+                correct_answers=q_dict['correct_answer'],
+                subject_id=subject_id
+            )
+            questions.append(question)
             
-        except Exception as e:
-            print(f"Error loading quiz: {e}")
+            if mode == QuizMode.REVIEW:
+                # Questions never reviewed come without a schedule
+                self.review_states[question.id] = ReviewState(
+                    question_id=question.id,
+                    ease=q_dict.get('ease') or DEFAULT_EASE,
+                    interval_days=q_dict.get('interval_days') or 0.0,
+                    repetitions=q_dict.get('repetitions') or 0,
+                    due_at=q_dict.get('due_at')
+                )
+        
+        # Create subject object
+        subject = Subject(name=subject_name, id=subject_id)
+        
+        # Create new quiz session
+        self.session = QuizSession(
+            subject=subject,
+            questions=questions
+        )
+        
+        self._journal_begin()
+        return True
+    
+    def _start_adaptive_quiz(self, subject_id: int, subject_name: str, pool: ItemPool,
+                             first_question: Optional[Question] = None) -> bool:
+        """Start an adaptive quiz with the most informative question at average ability."""
+        if first_question is None:
+            first_question = self.fetch_next_item(pool)
+        self.item_pool = pool
+        self.ability, self.ability_error = estimate_ability(())
+        self.adaptive_length = min(ADAPTIVE_QUIZ_LENGTH, len(pool))
+        self.session = QuizSession(subject=Subject(name=subject_name, id=subject_id),
+                                   questions=[])
+        if not self.ask_item(first_question):
+            self.session = None
             return False
+        return True
+    
+    def needs_next_item(self) -> bool:
+        """Check whether moving on asks a new question of an adaptive quiz.
+        
+        Returns:
+            True at the last question asked so far of an adaptive quiz that
+            has more to ask; next_question then fetches the next one
+        """
+        return (self.session is not None and self.mode == QuizMode.ADAPTIVE
+                and self.item_pool is not None and self.session.is_last_question()
+                and len(self.session.questions) < self.adaptive_length)
+    
+    def fetch_next_item(self, pool: Optional[ItemPool] = None) -> Optional[Question]:
+        """Fetch the question an adaptive quiz asks next, without asking it.
+        
+        Only reads from the database, so it may run on a worker thread;
+        pass the result to ask_item, or to start_quiz for the first question
+        of a new quiz.
+        
+        Args:
+            pool: Item pool of a new quiz to fetch the first question of
+                (default: the next question of the current quiz)
+            
+        Returns:
+            The most informative question not asked yet at the current
+            ability estimate, or None if none is left or it could not be
+            fetched
+        """
+        if pool is None:
+            pool, ability = self.item_pool, self.ability
+            asked = [question.id for question in self.session.questions]
+        else:
+            ability, asked = estimate_ability(())[0], []
+        question_id = pool.most_informative(ability, asked)
+        rows = self.db.get_questions_by_ids([question_id]) if question_id is not None else []
+        return Question.from_db_dict(rows[0]) if rows else None
+    
+    def ask_item(self, question: Optional[Question]) -> bool:
+        """Add a question from fetch_next_item to an adaptive quiz.
+        
+        Args:
+            question: Question to ask next, or None if none could be
+                fetched, in which case the quiz ends with the questions
+                asked so far
+            
+        Returns:
+            True if the question was added
+        """
+        if question is None:
+            self.adaptive_length = len(self.session.questions)
+            return False
+        self.session.add_question(question)
+        self._journal_record("ask", question.id)
+        return True
+    
+    def _update_ability(self) -> None:
+        """Re-estimate the learner's ability from the answered questions."""
+        session = self.session
+        self.ability, self.ability_error = estimate_ability(
+            (*self.item_pool.parameters(question.id), session.is_correct_at(i))
+            for i, question in enumerate(session.questions) if session.user_answers[i])
+    
+    def _journal_begin(self) -> None:
+        """Report a new quiz to the journal, if there is one."""
+        if self.journal is not None:
+            self.journal.begin(self.get_state())
+    
+    def _journal_record(self, kind: str, value) -> None:
+        """Report a change of the quiz to the journal, if there is one."""
+        if self.journal is not None:
+            self.journal.record(kind, value)
+    
+    def _quiz_length(self) -> int:
+        """Number of questions of the current quiz, counting those not asked yet."""
+        if self.mode == QuizMode.ADAPTIVE and self.item_pool is not None:
+            return self.adaptive_length
+        return len(self.session.questions)
     
     def get_current_question(self) -> Optional[Question]:
         """Get the current question in the quiz.
@@ -95,26 +305,47 @@ class QuizEngine:
         """
         if not self.session:
             return (0, 0)
-        return (self.session.current_question_index + 1, len(self.session.questions))
+        return (self.session.current_question_index + 1, self._quiz_length())
     
     def save_answer(self, answer: List[str]) -> None:
         """Save the user's answer for the current question.
         
+        In an adaptive quiz the ability estimate is updated, so it decides
+        which question comes next.
+        
         Args:
             answer: List of selected answer keys
+            
+        Raises:
+            ValueError: If a key is not an option of the current question
         """
         if self.session:
+            index = self.session.current_question_index
             self.session.save_answer(answer)
+            self._journal_record("answer", [index, self.session.get_answer_mask(index)])
+            if self.mode == QuizMode.ADAPTIVE and self.item_pool is not None:
+                self._update_ability()
     
     def next_question(self) -> bool:
         """Move to the next question.
         
+        An adaptive quiz asks a new question when moving past the last one
+        asked so far, the most informative one at the current ability
+        estimate. Fetching it queries the database; callers that must not
+        block can check needs_next_item and fetch it beforehand with
+        fetch_next_item and ask_item.
+        
         Returns:
             True if moved successfully, False if already at last question
         """
         if not self.session:
             return False
-        return self.session.next_question()
+        if self.needs_next_item():
+            self.ask_item(self.fetch_next_item())
+        if not self.session.next_question():
+            return False
+        self._journal_record("move", self.session.current_question_index)
+        return True
     
     def previous_question(self) -> bool:
         """Move to the previous question.
@@ -124,7 +355,10 @@ class QuizEngine:
         """
         if not self.session:
             return False
-        return self.session.previous_question()
+        if not self.session.previous_question():
+            return False
+        self._journal_record("move", self.session.current_question_index)
+        return True
     
     def can_go_next(self) -> bool:
         """Check if can move to next question.
@@ -134,7 +368,7 @@ class QuizEngine:
         """
         if not self.session:
             return False
-        return not self.session.is_last_question()
+        return not self.is_last_question()
     
     def can_go_previous(self) -> bool:
         """Check if can move to previous question.
@@ -154,7 +388,7 @@ class QuizEngine:
         """
         if not self.session:
             return False
-        return self.session.is_last_question()
+        return self.session.current_question_index == self._quiz_length() - 1
     
     def is_first_question(self) -> bool:
         """Check if currently on the first question.
@@ -190,34 +424,53 @@ class QuizEngine:
             return []
         return self.session.get_unanswered_questions()
     
+    def get_answered_count(self) -> int:
+        """Get the number of questions answered so far.
+        
+        Returns:
+            Number of answered questions or 0 if no active session
+        """
+        if not self.session:
+            return 0
+        return self.session.get_answered_count()
+    
     def has_unanswered_questions(self) -> bool:
         """Check if there are any unanswered questions.
         
         Returns:
             True if any questions remain unanswered
         """
-        return len(self.get_unanswered_questions()) > 0
+        if not self.session:
+            return False
+        return self.session.get_unanswered_count() > 0
     
     def calculate_results(self) -> Optional[QuizResult]:
         """Calculate and return quiz results.
         
+        An adaptive quiz ends here: it is scored on the questions asked so
+        far and asks no more. The quiz is cleared from the journal.
+        
         Returns:
             QuizResult object with score and details, or None if no session
         """
         if not self.session:
             return None
         
+        if self.mode == QuizMode.ADAPTIVE:
+            self.adaptive_length = len(self.session.questions)
+        if self.journal is not None:
+            self.journal.end()
+        
         # Calculate score
         score = self.session.calculate_score()
         percentage = self.session.get_percentage()
         rating = self.session.get_performance_rating()
         
-        # Build detailed results
+        # Build detailed results from the correctness recorded as answers were saved
         question_results = []
         for i, question in enumerate(self.session.questions):
             user_answer = self.session.user_answers[i] if self.session.user_answers[i] else []
-            is_correct = question.is_answer_correct(user_answer)
-            question_results.append((question, user_answer, is_correct))
+            question_results.append((question, user_answer, self.session.is_correct_at(i)))
         
         return QuizResult(
             subject=self.session.subject,
@@ -228,6 +481,34 @@ class QuizEngine:
             question_results=question_results
         )
     
+    def get_review_updates(self, now: Optional[datetime] = None) -> List[ReviewState]:
+        """Reschedule the answered questions of a review quiz.
+        
+        Each answered question is graded with review_quality and scheduled
+        with SM-2; unanswered questions keep their schedule and stay due.
+        
+        Args:
+            now: Time of the review (default: now)
+            
+        Returns:
+            New ReviewState of each answered question, or an empty list if
+            the quiz is not a review quiz
+        """
+        if not self.session or self.mode != QuizMode.REVIEW:
+            return []
+        if now is None:
+            now = datetime.now()
+        
+        updates = []
+        for i, question in enumerate(self.session.questions):
+            answer = self.session.user_answers[i]
+            if not answer:
+                continue
+            quality = review_quality(self.session.is_correct_at(i),
+                                     question.partial_credit(answer))
+            updates.append(schedule_review(self.review_states[question.id], quality, now))
+        return updates
+    
     def get_progress_percentage(self) -> float:
         """Get the current progress through the quiz as a percentage.
         
@@ -236,13 +517,17 @@ class QuizEngine:
         """
         if not self.session:
             return 0.0
-        return self.session.get_progress_percentage()
+        length = self._quiz_length()
+        if not length:
+            return 0.0
+        return (self.session.current_question_index / length) * 100
     
-    def restart_quiz(self, shuffle: bool = True) -> bool:
+    def restart_quiz(self, shuffle: bool = True, seed: Optional[int] = None) -> bool:
         """Restart the current quiz with the same subject.
         
         Args:
             shuffle: Whether to shuffle the questions (default: True)
+            seed: Optional seed to reproduce a specific quiz (default: None)
             
         Returns:
             True if restarted successfully, False otherwise
@@ -253,7 +538,100 @@ class QuizEngine:
         subject_id = self.session.subject.id
         subject_name = self.session.subject.name
         
-        return self.load_quiz(subject_id, subject_name, shuffle=shuffle)
+        return self.load_quiz(subject_id, subject_name, shuffle=shuffle, seed=seed,
+                              mode=self.mode, user_name=self.user_name)
+    
+    def get_state(self) -> Optional[dict]:
+        """Capture the current quiz in a compact, JSON-serializable form.
+        
+        Questions are kept by id and answers as bitmasks, so the state is a
+        few hundred bytes however long the question texts are. Pass it to
+        restore_state to continue the quiz later, e.g. in another process.
+        
+        Returns:
+            State dictionary, or None if there is no active session
+        """
+        if not self.session:
+            return None
+        session = self.session
+        state = {
+            "subject_id": session.subject.id,
+            "subject_name": session.subject.name,
+            "mode": self.mode.value,
+            "user_name": self.user_name,
+            "question_ids": [question.id for question in session.questions],
+            "answers": [session.get_answer_mask(i) for i in range(len(session.questions))],
+            "index": session.current_question_index
+        }
+        if self.mode == QuizMode.REVIEW:
+            state["reviews"] = [
+                [r.question_id, r.ease, r.interval_days, r.repetitions,
+                 r.due_at.isoformat() if r.due_at else None]
+                for r in self.review_states.values()
+            ]
+        if self.mode == QuizMode.ADAPTIVE:
+            state["adaptive_length"] = self.adaptive_length
+        return state
+    
+    def restore_state(self, state: dict) -> bool:
+        """Continue a quiz captured by get_state.
+        
+        The questions are fetched again by id (an adaptive quiz also fetches
+        its item pool and re-estimates the ability from the answers).
+        Questions deleted in the meantime are dropped along with their
+        answers.
+        
+        Args:
+            state: State dictionary returned by get_state
+            
+        Returns:
+            True if the quiz was restored, False if none of its questions
+            exist any more
+        
+        Raises:
+            The database's error if the questions or item parameters cannot
+            be read, which must not be mistaken for deleted questions
+        """
+        mode = QuizMode(state["mode"])
+        rows = {row['id']: row
+                for row in self.db.get_questions_by_ids(state["question_ids"], strict=True)}
+        questions, masks = [], []
+        for question_id, mask in zip(state["question_ids"], state["answers"]):
+            if question_id in rows:
+                questions.append(Question.from_db_dict(rows[question_id]))
+                masks.append(mask)
+        if not questions:
+            return False
+        
+        self.mode = mode
+        self.user_name = state.get("user_name")
+        self.review_states = {}
+        self.item_pool = None
+        self.session = QuizSession(
+            subject=Subject(name=state["subject_name"], id=state["subject_id"]),
+            questions=questions
+        )
+        for i, (question, mask) in enumerate(zip(questions, masks)):
+            self.session.set_answer(i, question.answer_keys(mask))
+        self.session.current_question_index = min(state["index"], len(questions) - 1)
+        
+        if mode == QuizMode.REVIEW:
+            for question_id, ease, interval_days, repetitions, due_at in state["reviews"]:
+                self.review_states[question_id] = ReviewState(
+                    question_id=question_id,
+                    ease=ease,
+                    interval_days=interval_days,
+                    repetitions=repetitions,
+                    due_at=datetime.fromisoformat(due_at) if due_at else None
+                )
+        if mode == QuizMode.ADAPTIVE:
+            self.item_pool = ItemPool.from_rows(
+                self.db.get_item_parameters(state["subject_id"], strict=True))
+            self.adaptive_length = max(len(questions),
+                                       min(state["adaptive_length"], len(self.item_pool)))
+            self._update_ability()
+        self._journal_begin()
+        return True
     
     def go_to_question(self, question_index: int) -> bool:
         """Navigate to a specific question by index.
@@ -269,6 +647,7 @@ class QuizEngine:
         
         if 0 <= question_index < len(self.session.questions):
             self.session.current_question_index = question_index
+            self._journal_record("move", question_index)
             return True
         return False
     
@@ -313,12 +692,9 @@ class QuizEngine:
         Returns:
             True if answer is correct, False otherwise
         """
-        question = self.get_question_at_index(index)
-        answer = self.get_answer_at_index(index)
-        
-        if question and answer is not None:
-            return question.is_answer_correct(answer)
-        return False
+        if not self.session:
+            return False
+        return self.session.is_correct_at(index)
     
     def get_total_questions(self) -> int:
         """Get the total number of questions in the current quiz.
@@ -328,7 +704,7 @@ class QuizEngine:
         """
         if not self.session:
             return 0
-        return len(self.session.questions)
+        return self._quiz_length()
     
     def get_score(self) -> int:
         """Get the current score.
@@ -0,0 +1,107 @@
+"""Spaced repetition scheduling for the Quiz Application.
+
+This module implements the SM-2 algorithm. Every question a user has
+reviewed keeps an ease factor and an interval: the interval grows by the
+ease factor while the user keeps answering correctly, and starts over when
+they get it wrong. Review quizzes ask the questions whose due time has
+passed, most overdue first.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .models import _SLOTS
+
+
+# Ease factor of a question that has never been reviewed
+DEFAULT_EASE = 2.5
+# SM-2 never lets the ease factor drop below this
+MIN_EASE = 1.3
+
+
+@dataclass(**_SLOTS)
+class ReviewState:
+    """Spaced repetition state of one question for one user.
+    
+    Attributes:
+        question_id: ID of the question
+        ease: Ease factor; the interval is multiplied by it after each
+            correct review
+        interval_days: Days from the last review until the question is due
+        repetitions: Number of correct reviews in a row
+        due_at: When the question is due again (None if never reviewed)
+    """
+    question_id: Optional[int] = None
+    ease: float = DEFAULT_EASE
+    interval_days: float = 0.0
+    repetitions: int = 0
+    due_at: Optional[datetime] = None
+    
+    @property
+    def is_new(self) -> bool:
+        """Check if the question has never been reviewed."""
+        return self.due_at is None
+
+
+def review_quality(is_correct: bool, partial_credit: float) -> int:
+    """Grade an answer on the SM-2 quality scale from 0 to 5.
+    
+    A correct answer is a correct recall (4). A wrong answer that still
+    earns partial credit counts as a near miss (2), any other as a blackout
+    (0). Grades below 3 restart the question's repetitions.
+    
+    Args:
+        is_correct: Whether the answer was fully correct
+        partial_credit: Credit of the answer from 0.0 to 1.0
+    
+    Returns:
+        Quality grade from 0 to 5
+    """
+    if is_correct:
+        return 4
+    return 2 if partial_credit > 0 else 0
+
+
+def schedule_review(state: ReviewState, quality: int,
+                    now: Optional[datetime] = None) -> ReviewState:
+    """Apply one review to a question's state (SM-2).
+    
+    A passing grade (3 or more) schedules the question 1 day, then 6 days,
+    then the previous interval times the ease factor ahead; a failing grade
+    restarts at 1 day. The ease factor is adjusted by every review and
+    never drops below MIN_EASE.
+    
+    Args:
+        state: State before the review
+        quality: Quality grade from 0 to 5 (see review_quality)
+        now: Time of the review (default: now)
+    
+    Returns:
+        New ReviewState; the given state is not modified
+    """
+    if now is None:
+        now = datetime.now()
+    
+    if quality >= 3:
+        if state.repetitions == 0:
+            interval = 1.0
+        elif state.repetitions == 1:
+            interval = 6.0
+        else:
+            interval = state.interval_days * state.ease
+        repetitions = state.repetitions + 1
+    else:
+        interval = 1.0
+        repetitions = 0
+    
+    miss = 5 - quality
+    ease = max(MIN_EASE, state.ease + 0.1 - miss * (0.08 + miss * 0.02))
+    
+    return ReviewState(
+        question_id=state.question_id,
+        ease=ease,
+        interval_days=interval,
+        repetitions=repetitions,
+        due_at=now + timedelta(days=interval)
+    )
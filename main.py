@@ -1,13 +1,20 @@
+import getpass
 import sys
+from functools import partial
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QRadioButton, 
                              QCheckBox, QButtonGroup, QMessageBox, QProgressBar,
                              QMenuBar, QComboBox, QDialog, QTableWidget, 
                              QTableWidgetItem, QLineEdit, QTextEdit, QDialogButtonBox,
                              QFormLayout, QHeaderView, QAbstractItemView)
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool
 from PyQt6.QtGui import QFont, QAction
-from quiz_db import QuizDatabase
+from quiz_snapshot import SnapshotQuizDatabase
+from quiz_recorder import AttemptRecorder
+from quiz_autosave import AutosaveJournal
+from domain import QuizEngine, QuizMode
+from ui.workers import DatabaseWorker
+from ui.option_rows import OptionPanel
 from ui.dialogs.subject_dialog import SubjectManagementDialog
 from ui.dialogs.question_dialog import QuestionManagementDialog
 
@@ -15,13 +22,20 @@ from ui.dialogs.question_dialog import QuestionManagementDialog
 class QuizApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.quiz_data = []
-        self.current_question = 0
-        self.score = 0
-        self.user_answers = []
-        self.db = QuizDatabase()
+        self.db = SnapshotQuizDatabase()
+        self.journal = AutosaveJournal()
+        # Quiz interrupted by a crash or by closing the app, offered for resuming
+        self.saved_quiz = self.journal.load()
+        self.journal.start()
+        self.engine = QuizEngine(self.db, journal=self.journal)
+        self.recorder = AttemptRecorder(self.db)
+        self.recorder.start()
+        self.user_name = getpass.getuser()
         self.subjects = []
         self.current_subject = None
+        self.thread_pool = QThreadPool()
+        self.subjects_worker = None
+        self.quiz_worker = None
         self.init_ui()
         self.load_subjects()
         
@@ -51,6 +65,18 @@ class QuizApp(QMainWindow):
         self.subject_combo.setMinimumHeight(35)
         self.subject_combo.currentIndexChanged.connect(self.on_subject_changed)
         subject_layout.addWidget(self.subject_combo)
+        
+        mode_label = QLabel("Mode:")
+        mode_label.setFont(QFont("Arial", 12))
+        subject_layout.addWidget(mode_label)
+        
+        self.mode_combo = QComboBox()
+        self.mode_combo.setMinimumHeight(35)
+        self.mode_combo.addItem("Random questions", QuizMode.RANDOM)
+        self.mode_combo.addItem("Review due questions", QuizMode.REVIEW)
+        self.mode_combo.addItem("Adaptive (IRT)", QuizMode.ADAPTIVE)
+        self.mode_combo.currentIndexChanged.connect(self.on_mode_changed)
+        subject_layout.addWidget(self.mode_combo)
         subject_layout.addStretch()
         
         main_layout.addLayout(subject_layout)
@@ -97,18 +123,9 @@ class QuizApp(QMainWindow):
         self.instruction_label.setStyleSheet("color: #666;")
         main_layout.addWidget(self.instruction_label)
         
-        # Options container - allow container to expand
-        self.options_widget = QWidget()
-        self.options_layout = QVBoxLayout(self.options_widget)
-        self.options_layout.setSpacing(10)
-        self.options_layout.addStretch()
-        main_layout.addWidget(self.options_widget)
-        
-        # Button group for radio buttons (single choice)
-        self.radio_group = QButtonGroup()
-        
-        # List to store checkboxes (multi choice)
-        self.checkboxes = []
+        # Options container - rows are reused from question to question
+        self.options_panel = OptionPanel()
+        main_layout.addWidget(self.options_panel)
         
         # Spacer to push buttons to bottom
         main_layout.addStretch()
@@ -271,50 +288,143 @@ class QuizApp(QMainWindow):
         dialog = QuestionManagementDialog(self.db, self)
         dialog.exec()
         
+    def start_worker(self, func, on_finished, on_failed, *args, **kwargs):
+        """Run a database call on the thread pool and return its worker."""
+        worker = DatabaseWorker(func, *args, **kwargs)
+        worker.signals.finished.connect(partial(on_finished, worker))
+        worker.signals.failed.connect(partial(on_failed, worker))
+        self.thread_pool.start(worker)
+        return worker
+    
+    def fetch_subjects(self):
+        """Fetch subjects, from the offline snapshot if there is one; runs on a worker thread."""
+        if not self.db.has_snapshot() and not self.db.connect():
+            return None
+        # Connects (if not yet) and keeps the snapshot in sync in the background
+        self.db.start_sync()
+        return self.db.get_all_subjects()
+    
     def load_subjects(self):
-        """Load available subjects from the database."""
-        try:
-            # Connect to database
-            if not self.db.connect():
-                QMessageBox.critical(
-                    self, 
-                    "Database Error", 
-                    "Could not connect to PostgreSQL database.\n\n"
-                    "Please ensure:\n"
-                    "1. Docker container is running (cd db && docker-compose up -d)\n"
-                    "2. Database has been migrated (python migrate_to_postgres.py)"
-                )
-                sys.exit(1)
-            
-            # Load subjects from database
-            self.subjects = self.db.get_all_subjects()
-            
-            if not self.subjects:
-                QMessageBox.critical(
-                    self,
-                    "No Data",
-                    "No subjects found in the database.\n\n"
-                    "You must reseed the database with initial data.\n"
-                )
-                sys.exit(1)
-            
-            # Populate subject combo box
-            self.subject_combo.blockSignals(True)
-            for subject in self.subjects:
-                self.subject_combo.addItem(subject['name'], subject['id'])
-            self.subject_combo.blockSignals(False)
-            
-            # Automatically select first subject
-            if self.subjects:
-                self.on_subject_changed(0)
-            
-        except Exception as e:
+        """Load available subjects from the database in the background."""
+        if self.subjects_worker:
+            self.subjects_worker.cancel()
+        
+        self.subject_combo.setEnabled(False)
+        self.subjects_worker = self.start_worker(
+            self.fetch_subjects, self.on_subjects_loaded, self.on_subjects_failed
+        )
+    
+    def on_subjects_loaded(self, worker, subjects):
+        """Populate the subject combo box once subjects have been fetched."""
+        if worker is not self.subjects_worker or worker.is_cancelled():
+            return
+        self.subjects_worker = None
+        self.subject_combo.setEnabled(True)
+        
+        if subjects is None:
             QMessageBox.critical(
                 self, 
-                "Error", 
-                f"Failed to load subjects:\n{str(e)}"
+                "Database Error", 
+                "Could not connect to PostgreSQL database.\n\n"
+                "Please ensure:\n"
+                "1. Docker container is running (cd db && docker-compose up -d)\n"
+                "2. Database has been migrated (python migrate_to_postgres.py)"
+            )
+            QApplication.exit(1)
+            return
+        
+        # Load subjects from database
+        self.subjects = subjects
+        
+        if not self.subjects:
+            QMessageBox.critical(
+                self,
+                "No Data",
+                "No subjects found in the database.\n\n"
+                "You must reseed the database with initial data.\n"
             )
-            sys.exit(1)
+            QApplication.exit(1)
+            return
+        
+        # Populate subject combo box
+        self.subject_combo.blockSignals(True)
+        self.subject_combo.clear()
+        for subject in self.subjects:
+            self.subject_combo.addItem(subject['name'], subject['id'])
+        self.subject_combo.blockSignals(False)
+        
+        saved_quiz, self.saved_quiz = self.saved_quiz, None
+        if saved_quiz and self.offer_resume(saved_quiz):
+            return
+        
+        # Automatically select first subject
+        if self.subjects:
+            self.on_subject_changed(0)
+    
+    def on_subjects_failed(self, worker, error):
+        """Report a failure to load subjects and exit."""
+        if worker is not self.subjects_worker or worker.is_cancelled():
+            return
+        self.subjects_worker = None
+        QMessageBox.critical(
+            self, 
+            "Error", 
+            f"Failed to load subjects:\n{error}"
+        )
+        QApplication.exit(1)
+    
+    def offer_resume(self, state):
+        """Offer to continue an interrupted quiz; returns True if it is being resumed."""
+        subject_index = self.subject_combo.findData(state["subject_id"])
+        if subject_index < 0:
+            return False
+        
+        answered = sum(1 for mask in state["answers"] if mask)
+        reply = QMessageBox.question(
+            self,
+            "Resume Quiz",
+            f"You have an unfinished {self.subject_combo.itemText(subject_index)} quiz "
+            f"({answered} of {len(state['answers'])} questions answered).\n\n"
+            "Do you want to continue where you left off?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.Yes
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return False
+        
+        # Show the quiz's subject and mode without starting a new quiz
+        for combo, value in ((self.subject_combo, state["subject_id"]),
+                             (self.mode_combo, QuizMode(state["mode"]))):
+            combo.blockSignals(True)
+            combo.setCurrentIndex(combo.findData(value))
+            combo.blockSignals(False)
+        self.current_subject = state["subject_id"]
+        self.title_label.setText(f"{self.subject_combo.currentText()} Quiz")
+        
+        self.set_loading(True)
+        self.quiz_worker = self.start_worker(
+            self.fetch_saved_quiz, self.on_saved_quiz_loaded, self.on_quiz_failed, state
+        )
+        return True
+    
+    def fetch_saved_quiz(self, state):
+        """Rebuild an interrupted quiz in a new engine; runs on a worker thread."""
+        engine = QuizEngine(self.db, journal=self.journal)
+        return engine if engine.restore_state(state) else None
+    
+    def on_saved_quiz_loaded(self, worker, engine):
+        """Continue an interrupted quiz once it has been rebuilt."""
+        if worker is not self.quiz_worker or worker.is_cancelled():
+            return
+        self.quiz_worker = None
+        
+        if engine is None:
+            # Its questions have all been deleted
+            self.load_quiz()
+            return
+        self.engine = engine
+        self.set_loading(False)
+        self.display_question()
     
     def on_subject_changed(self, index):
         """Handle subject selection change."""
@@ -333,65 +443,127 @@ class QuizApp(QMainWindow):
         # Load questions for this subject
         self.load_quiz()
     
+    def on_mode_changed(self, index):
+        """Start a new quiz when switching between quiz modes."""
+        if index >= 0:
+            self.load_quiz()
+    
     def load_quiz(self):
-        """Load quiz questions for the current subject from PostgreSQL database."""
+        """Load quiz questions for the current subject in the background.
+        
+        A load that is still running for a previously selected subject is
+        cancelled, so only the most recent selection is displayed.
+        """
         if self.current_subject is None:
             return
         
-        try:
-            # Load questions from database for current subject
-            self.quiz_data = self.db.get_questions_by_subject(self.current_subject, shuffle=True)
-            
-            if not self.quiz_data:
-                QMessageBox.warning(
+        if self.quiz_worker:
+            self.quiz_worker.cancel()
+        
+        self.set_loading(True)
+        self.quiz_worker = self.start_worker(
+            self.fetch_quiz, self.on_quiz_loaded, self.on_quiz_failed,
+            self.current_subject, self.mode_combo.currentData()
+        )
+    
+    def fetch_quiz(self, subject_id, mode):
+        """Fetch the questions of a new quiz (and the first of an adaptive one); runs on a worker thread."""
+        if mode == QuizMode.REVIEW:
+            # The previous review quiz may still be on its way to the
+            # database; without it its questions would be asked again
+            self.recorder.flush(5)
+        questions = self.engine.fetch_questions(subject_id, mode, self.user_name)
+        if mode == QuizMode.ADAPTIVE and questions:
+            return questions, self.engine.fetch_next_item(questions)
+        return questions, None
+    
+    def set_loading(self, loading):
+        """Show or clear the loading state while questions are fetched."""
+        if loading:
+            self.clear_options()
+            self.question_number_label.setText("")
+            self.question_label.setText("Loading questions...")
+            self.instruction_label.setText("")
+            # A zero range turns the progress bar into a busy indicator
+            self.progress_bar.setRange(0, 0)
+        else:
+            self.progress_bar.setRange(0, max(self.engine.get_total_questions(), 1))
+        
+        self.options_panel.setEnabled(not loading)
+        self.prev_button.setEnabled(not loading and self.engine.can_go_previous())
+        self.next_button.setEnabled(not loading)
+        self.submit_button.setEnabled(not loading)
+    
+    def on_quiz_loaded(self, worker, quiz_data):
+        """Start the quiz once its questions have been fetched."""
+        if worker is not self.quiz_worker or worker.is_cancelled():
+            return
+        self.quiz_worker = None
+        
+        mode = self.mode_combo.currentData()
+        questions, first_question = quiz_data
+        if mode == QuizMode.ADAPTIVE and questions and first_question is None:
+            # Without it the quiz could not start; report it like a failed load
+            self.set_loading(False)
+            QMessageBox.critical(self, "Error", "Failed to load the first question of the quiz.")
+            return
+        if not self.engine.start_quiz(self.current_subject, self.subject_combo.currentText(),
+                                      questions, mode=mode, user_name=self.user_name,
+                                      first_question=first_question):
+            self.set_loading(False)
+            self.question_label.setText("")
+            if mode == QuizMode.REVIEW:
+                QMessageBox.information(
                     self,
-                    "No Questions",
-                    "No questions found for this subject.\n\n"
-                    "Please add questions to the database."
+                    "Nothing to Review",
+                    "No questions of this subject are due for review.\n\n"
+                    "Come back later or take a random quiz."
                 )
                 return
-            
-            # Initialize user_answers list
-            self.user_answers = [None] * len(self.quiz_data)
-            
-            # Set progress bar maximum
-            self.progress_bar.setMaximum(len(self.quiz_data))
-            
-            # Display first question
-            self.display_question()
-            
-        except Exception as e:
-            QMessageBox.critical(
-                self, 
-                "Error", 
-                f"Failed to load quiz questions:\n{str(e)}"
+            QMessageBox.warning(
+                self,
+                "No Questions",
+                "No questions found for this subject.\n\n"
+                "Please add questions to the database."
             )
-            sys.exit(1)
+            return
+        
+        # Set progress bar maximum
+        self.set_loading(False)
+        
+        # Display first question
+        self.display_question()
+    
+    def on_quiz_failed(self, worker, error):
+        """Report a failure to load quiz questions."""
+        if worker is not self.quiz_worker or worker.is_cancelled():
+            return
+        self.quiz_worker = None
+        self.set_loading(False)
+        QMessageBox.critical(
+            self, 
+            "Error", 
+            f"Failed to load quiz questions:\n{error}"
+        )
     
     def display_question(self):
         """Display the current question and its options."""
-        if self.current_question >= len(self.quiz_data):
+        question = self.engine.get_current_question()
+        if question is None:
             return
         
-        question_data = self.quiz_data[self.current_question]
-        
         # Update question number
-        self.question_number_label.setText(
-            f"Question {self.current_question + 1} of {len(self.quiz_data)}"
-        )
+        number, total = self.engine.get_question_number()
+        self.question_number_label.setText(f"Question {number} of {total}")
         
         # Update progress bar
-        self.progress_bar.setValue(self.current_question)
+        self.progress_bar.setValue(number - 1)
         
         # Update question text
-        self.question_label.setText(question_data["question"])
-        
-        # Clear previous options
-        self.clear_options()
+        self.question_label.setText(question.question_text)
         
         # Determine if multi-select question
-        correct_answer = question_data["correct_answer"]
-        is_multi_select = isinstance(correct_answer, list) and len(correct_answer) > 1
+        is_multi_select = question.is_multi_select()
         
         # Update instruction label
         if is_multi_select:
@@ -399,60 +571,17 @@ class QuizApp(QMainWindow):
         else:
             self.instruction_label.setText("Select one answer:")
         
-        # Create options
-        options = question_data["options"]
-        
-        if is_multi_select:
-            # Create checkboxes for multi-select
-            self.checkboxes = []
-            for key in sorted(options.keys()):
-                # Create a horizontal layout for each option
-                option_layout = QHBoxLayout()
-                
-                checkbox = QCheckBox(f"{key}.")
-                label = QLabel(options[key])
-                label.setWordWrap(True)
-                label.setFont(QFont("Arial", 16))
-                label.mousePressEvent = lambda event, cb=checkbox: cb.setChecked(not cb.isChecked())
-                
-                option_layout.addWidget(checkbox)
-                option_layout.addWidget(label, 1)  # Stretch factor 1 to take remaining space
-                
-                self.checkboxes.append((key, checkbox))
-                self.options_layout.addLayout(option_layout)
-                
-                # Restore previous answer if any
-                if self.user_answers[self.current_question]:
-                    if key in self.user_answers[self.current_question]:
-                        checkbox.setChecked(True)
-        else:
-            # Create radio buttons for single-select
-            for key in sorted(options.keys()):
-                # Create a horizontal layout for each option
-                option_layout = QHBoxLayout()
-                
-                radio = QRadioButton(f"{key}.")
-                label = QLabel(options[key])
-                label.setWordWrap(True)
-                label.setFont(QFont("Arial", 16))
-                label.mousePressEvent = lambda event, rb=radio: rb.setChecked(True)
-                
-                option_layout.addWidget(radio)
-                option_layout.addWidget(label, 1)  # Stretch factor 1 to take remaining space
-                
-                self.radio_group.addButton(radio)
-                self.options_layout.addLayout(option_layout)
-                
-                # Restore previous answer if any
-                if self.user_answers[self.current_question]:
-                    if key in self.user_answers[self.current_question]:
-                        radio.setChecked(True)
+        # Show options, restoring the previous answer if any
+        self.options_panel.show_options(
+            question.options, is_multi_select,
+            selected=self.engine.get_current_answer()
+        )
         
         # Update navigation buttons
-        self.prev_button.setEnabled(self.current_question > 0)
+        self.prev_button.setEnabled(self.engine.can_go_previous())
         
         # Show submit button on last question
-        if self.current_question == len(self.quiz_data) - 1:
+        if self.engine.is_last_question():
             self.next_button.setVisible(False)
             self.submit_button.setVisible(True)
         else:
@@ -460,71 +589,68 @@ class QuizApp(QMainWindow):
             self.submit_button.setVisible(False)
     
     def clear_options(self):
-        """Clear all option widgets."""
-        # Remove all radio buttons from group
-        for button in self.radio_group.buttons():
-            self.radio_group.removeButton(button)
-            button.deleteLater()
-        
-        # Clear checkboxes list
-        self.checkboxes = []
-        
-        # Clear all widgets and layouts from options layout
-        while self.options_layout.count():
-            item = self.options_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                # Clear widgets from the nested layout
-                while item.layout().count():
-                    child_item = item.layout().takeAt(0)
-                    if child_item.widget():
-                        child_item.widget().deleteLater()
-                # Delete the layout itself
-                item.layout().deleteLater()
+        """Hide all option rows."""
+        self.options_panel.clear()
     
     def get_current_answer(self):
         """Get the user's answer for the current question."""
-        question_data = self.quiz_data[self.current_question]
-        correct_answer = question_data["correct_answer"]
-        is_multi_select = isinstance(correct_answer, list) and len(correct_answer) > 1
-        
-        if is_multi_select:
-            # Get selected checkboxes
-            selected = []
-            for key, checkbox in self.checkboxes:
-                if checkbox.isChecked():
-                    selected.append(key)
-            return sorted(selected) if selected else None
-        else:
-            # Get selected radio button
-            for button in self.radio_group.buttons():
-                if button.isChecked():
-                    # Extract the key (first character before the dot)
-                    text = button.text()
-                    key = text.split('.')[0].strip()
-                    return [key]
-            return None
+        selected = self.options_panel.selected_keys()
+        return selected if selected else None
     
     def save_current_answer(self):
         """Save the current answer before navigating."""
-        answer = self.get_current_answer()
-        self.user_answers[self.current_question] = answer
+        self.engine.save_answer(self.get_current_answer())
     
     def next_question(self):
-        """Move to the next question."""
+        """Move to the next question, fetching it first if an adaptive quiz asks a new one."""
         self.save_current_answer()
         
-        if self.current_question < len(self.quiz_data) - 1:
-            self.current_question += 1
+        if self.engine.needs_next_item():
+            # The answer shown was saved above and belongs to the question
+            # being replaced; keep it until the next one is displayed
+            for widget in (self.options_panel, self.prev_button, self.next_button,
+                           self.submit_button):
+                widget.setEnabled(False)
+            self.quiz_worker = self.start_worker(
+                self.engine.fetch_next_item, self.on_next_item_loaded, self.on_next_item_failed
+            )
+            return
+        
+        if self.engine.next_question():
             self.display_question()
     
+    def on_next_item_loaded(self, worker, question):
+        """Move to the next question of an adaptive quiz once it has been fetched."""
+        if worker is not self.quiz_worker or worker.is_cancelled():
+            return
+        self.quiz_worker = None
+        
+        asked = self.engine.ask_item(question)
+        self.set_loading(False)
+        if asked:
+            self.engine.next_question()
+        self.display_question()
+        if not asked:
+            # The quiz now ends at the current question, which shows Submit
+            QMessageBox.warning(
+                self,
+                "Error",
+                "Failed to load the next question.\n\n"
+                "You can submit the quiz with the questions answered so far."
+            )
+    
+    def on_next_item_failed(self, worker, error):
+        """Report a failure to fetch the next question of an adaptive quiz."""
+        if worker is not self.quiz_worker or worker.is_cancelled():
+            return
+        print(f"Error loading the next question: {error}")
+        self.on_next_item_loaded(worker, None)
+    
     def previous_question(self):
         """Move to the previous question."""
         self.save_current_answer()
         
-        if self.current_question > 0:
-            self.current_question -= 1
+        if self.engine.previous_question():
             self.display_question()
     
     def submit_quiz(self):
@@ -532,12 +658,8 @@ class QuizApp(QMainWindow):
         self.save_current_answer()
         
         # Check if all questions are answered
-        unanswered = []
-        for i, answer in enumerate(self.user_answers):
-            if answer is None:
-                unanswered.append(i + 1)
-        
-        if unanswered:
+        if self.engine.has_unanswered_questions():
+            unanswered = self.engine.get_unanswered_questions()
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Icon.Warning)
             msg.setWindowTitle("Unanswered Questions")
@@ -549,36 +671,25 @@ class QuizApp(QMainWindow):
             if msg.exec() == QMessageBox.StandardButton.No:
                 return
         
-        # Calculate score
-        self.score = 0
-        for i, question in enumerate(self.quiz_data):
-            correct_answer = sorted(set(question["correct_answer"]))
-            user_answer = self.user_answers[i] if self.user_answers[i] else []
-            
-            if sorted(set(user_answer)) == correct_answer:
-                self.score += 1
-        
-        # Show results
-        self.show_results()
+        # The score is kept up to date as answers are saved; the attempt is
+        # written in the background so the results show without waiting
+        result = self.engine.calculate_results()
+        self.recorder.record(result, self.user_name, self.engine.get_review_updates())
+        self.show_results(result)
     
-    def show_results(self):
+    def show_results(self, result):
         """Display the quiz results."""
-        percentage = (self.score / len(self.quiz_data)) * 100
-        
         # Create results message
         result_text = f"Quiz Complete!\n\n"
-        result_text += f"Final Score: {self.score} / {len(self.quiz_data)}\n"
-        result_text += f"Percentage: {percentage:.1f}%\n\n"
+        result_text += f"Final Score: {result.correct_answers} / {result.total_questions}\n"
+        result_text += f"Percentage: {result.percentage:.1f}%\n"
+        if self.engine.mode == QuizMode.ADAPTIVE:
+            result_text += (f"Ability estimate: {self.engine.ability:+.2f} "
+                            f"(± {self.engine.ability_error:.2f})\n")
+        result_text += "\n"
         
         # Add performance rating
-        if percentage >= 90:
-            result_text += "Excellent work! 🌟"
-        elif percentage >= 70:
-            result_text += "Good job! 👍"
-        elif percentage >= 50:
-            result_text += "Not bad! Keep practicing! 📚"
-        else:
-            result_text += "Keep studying! You can do better! 💪"
+        result_text += result.performance_rating
         
         msg = QMessageBox()
         msg.setIcon(QMessageBox.Icon.Information)
@@ -608,27 +719,28 @@ class QuizApp(QMainWindow):
     
     def review_answers(self):
         """Show a detailed review of all answers."""
-        self.current_question = 0
+        self.engine.go_to_question(0)
         self.display_question_review()
     
     def display_question_review(self):
         """Display question in review mode showing correct/incorrect answers."""
-        if self.current_question >= len(self.quiz_data):
+        question = self.engine.get_current_question()
+        if question is None:
             return
         
-        question_data = self.quiz_data[self.current_question]
-        user_answer = self.user_answers[self.current_question] if self.user_answers[self.current_question] else []
-        correct_answer = sorted(set(question_data["correct_answer"]))
-        is_correct = sorted(set(user_answer)) == correct_answer
+        number, total = self.engine.get_question_number()
+        user_answer = self.engine.get_current_answer() or []
+        correct_answer = question.correct_answers
+        is_correct = self.engine.is_answer_correct_at_index(number - 1)
         
         # Update question number with result indicator
         result_emoji = "✅" if is_correct else "❌"
         self.question_number_label.setText(
-            f"{result_emoji} Question {self.current_question + 1} of {len(self.quiz_data)}"
+            f"{result_emoji} Question {number} of {total}"
         )
         
         # Update question text
-        self.question_label.setText(question_data["question"])
+        self.question_label.setText(question.question_text)
         
         # Show answer info
         if is_correct:
@@ -640,75 +752,17 @@ class QuizApp(QMainWindow):
             )
             self.instruction_label.setStyleSheet("color: red; font-weight: bold;")
         
-        # Clear and display options (disabled)
-        self.clear_options()
-        
-        options = question_data["options"]
-        is_multi_select = isinstance(question_data["correct_answer"], list) and len(question_data["correct_answer"]) > 1
-        
-        if is_multi_select:
-            self.checkboxes = []
-            for key in sorted(options.keys()):
-                # Create a horizontal layout for each option
-                option_layout = QHBoxLayout()
-                
-                checkbox = QCheckBox(f"{key}.")
-                checkbox.setEnabled(False)
-                
-                label = QLabel(options[key])
-                label.setWordWrap(True)
-                label.setFont(QFont("Arial", 16))
-                
-                if key in user_answer:
-                    checkbox.setChecked(True)
-                
-                # Highlight correct answers
-                if key in correct_answer:
-                    label.setStyleSheet("color: green; font-weight: bold;")
-                elif key in user_answer:
-                    label.setStyleSheet("color: red;")
-                
-                option_layout.addWidget(checkbox)
-                option_layout.addWidget(label, 1)  # Stretch factor 1 to take remaining space
-                
-                self.checkboxes.append((key, checkbox))
-                self.options_layout.addLayout(option_layout)
-        else:
-            for key in sorted(options.keys()):
-                # Create a horizontal layout for each option
-                option_layout = QHBoxLayout()
-                
-                radio = QRadioButton(f"{key}.")
-                radio.setEnabled(False)
-                
-                label = QLabel(options[key])
-                label.setWordWrap(True)
-                label.setFont(QFont("Arial", 16))
-                
-                self.radio_group.addButton(radio)
-                
-                if key in user_answer:
-                    radio.setChecked(True)
-                
-                # Highlight correct answer
-                if key in correct_answer:
-                    label.setStyleSheet("color: green; font-weight: bold;")
-                elif key in user_answer:
-                    label.setStyleSheet("color: red;")
-                
-                option_layout.addWidget(radio)
-                option_layout.addWidget(label, 1)  # Stretch factor 1 to take remaining space
-                
-                self.options_layout.addLayout(option_layout)
-                
-                self.options_layout.addWidget(radio)
+        # Display options (disabled) and highlight correct answers
+        self.options_panel.show_options(question.options, question.is_multi_select(),
+                                        selected=user_answer, enabled=False)
+        self.options_panel.highlight(correct_answer, user_answer)
         
         # Update navigation buttons for review mode
-        self.prev_button.setEnabled(self.current_question > 0)
+        self.prev_button.setEnabled(self.engine.can_go_previous())
         self.next_button.setVisible(True)
         self.submit_button.setVisible(False)
         
-        if self.current_question == len(self.quiz_data) - 1:
+        if self.engine.is_last_question():
             self.next_button.setText("Finish Review")
             self.next_button.disconnect()
             self.next_button.clicked.connect(self.finish_review)
@@ -723,7 +777,7 @@ class QuizApp(QMainWindow):
                 pass
             self.next_button.clicked.connect(self.next_review_question)
         
-        if self.current_question > 0:
+        if self.engine.can_go_previous():
             # Disconnect any existing connections before reconnecting
             # PyQt6's disconnect() raises TypeError if no connections exist
             try:
@@ -735,14 +789,12 @@ class QuizApp(QMainWindow):
     
     def next_review_question(self):
         """Move to next question in review mode."""
-        if self.current_question < len(self.quiz_data) - 1:
-            self.current_question += 1
+        if self.engine.next_question():
             self.display_question_review()
     
     def prev_review_question(self):
         """Move to previous question in review mode."""
-        if self.current_question > 0:
-            self.current_question -= 1
+        if self.engine.previous_question():
             self.display_question_review()
     
     def finish_review(self):
@@ -764,16 +816,6 @@ class QuizApp(QMainWindow):
     
     def restart_quiz(self):
         """Restart the quiz with shuffled questions."""
-        self.current_question = 0
-        self.score = 0
-        
-        # Reload questions for current subject (shuffled)
-        if self.current_subject:
-            self.quiz_data = self.db.get_questions_by_subject(self.current_subject, shuffle=True)
-        
-        # Reset answers
-        self.user_answers = [None] * len(self.quiz_data)
-        
         # Reset instruction label style
         instruction_font = QFont()
         instruction_font.setPointSize(10)
@@ -791,14 +833,26 @@ class QuizApp(QMainWindow):
             # No existing connections, which is fine
             pass
         
+        self.next_button.setText("Next")
         self.next_button.clicked.connect(self.next_question)
         self.prev_button.clicked.connect(self.previous_question)
         
-        # Display first question
-        self.display_question()
+        # Reload questions for current subject (shuffled); the first question
+        # is displayed once the load completes
+        self.load_quiz()
     
     def closeEvent(self, event):
-        """Clean up database connection when closing the application."""
+        """Save pending attempts and close the database when closing the application."""
+        for worker in (self.subjects_worker, self.quiz_worker):
+            if worker:
+                worker.cancel()
+        self.thread_pool.waitForDone(3000)
+        
+        # Writes every submitted attempt before the connections are closed
+        self.recorder.close()
+        # Keeps the quiz in progress, if any, for resuming on the next start
+        self.journal.close()
+        
         if hasattr(self, 'db') and self.db:
             self.db.close()
         event.accept()
@@ -0,0 +1,266 @@
+"""
+Autosave for the Quiz App - crash-safe journal of the quiz in progress
+"""
+
+import json
+import os
+import threading
+import time
+
+from quiz_db import _config
+
+
+def _apply(state, kind, value):
+    """Apply one journaled change to a quiz state (see QuizEngine.get_state)."""
+    if kind == "answer":
+        index, mask = value
+        state["answers"][index] = mask
+    elif kind == "move":
+        state["index"] = value
+    elif kind == "ask":
+        state["question_ids"].append(value)
+        state["answers"].append(0)
+    else:
+        raise ValueError(f"Unknown change {kind!r}")
+
+
+class AutosaveJournal:
+    """
+    Local journal of the quiz in progress, to resume it after a crash.
+    
+    A QuizEngine with a journal reports every change of its quiz: begin()
+    with the quiz state when a quiz starts, record() for each saved answer,
+    move and adaptively asked question, and end() once the quiz is
+    submitted. Each change is appended to the journal file as one short JSON
+    line. record() only queues the line; a writer thread writes everything
+    queued once changes pause for delay seconds (at most MAX_DELAY after the
+    first), with one write and one fsync, so answering a question never
+    waits on the disk. A crash loses at most the changes of the last
+    MAX_DELAY seconds. A failed write is retried with backoff, writing the
+    whole current state.
+    
+    load() replays the journal into the state of the interrupted quiz, for
+    QuizEngine.restore_state. The file holds the state the quiz started with
+    and the changes since, so replay takes time in proportion to the quiz,
+    never to the question bank. begin(), end() and every COMPACT_RECORDS
+    changes rewrite it with just the current state.
+    """
+    
+    # Seconds after the first queued change by which it is written
+    MAX_DELAY = 2.0
+    # Changes appended before the file is rewritten with the current state
+    COMPACT_RECORDS = 1000
+    # Seconds to wait before retrying a failed write; doubled up to RETRY_MAX_DELAY
+    RETRY_DELAY = 1
+    RETRY_MAX_DELAY = 60
+    
+    def __init__(self, path=None, delay=None):
+        """
+        Initialize the journal (path and delay from config.ini by default).
+        
+        Args:
+            path: Journal file; its directory is created if needed
+            delay: Seconds without changes before queued changes are written
+        """
+        if path is None:
+            path = _config.get('autosave', 'path', fallback='~/.quiz_app/autosave.jsonl')
+        if delay is None:
+            delay = _config.getint('autosave', 'delay_ms', fallback=500) / 1000
+        self.path = os.path.expanduser(path)
+        self.delay = delay
+        self._state = None
+        self._records = 0
+        # Lines queued for appending, or a rewrite of the whole file
+        self._pending = []
+        self._rewrite = False
+        self._first_change = self._last_change = 0.0
+        # Earliest time of the next write after failed ones, and their number
+        self._retry_at = 0.0
+        self._failures = 0
+        self._changed = threading.Condition()
+        self._stopping = False
+        self._thread = None
+        self._file = None
+        self.writes = 0
+    
+    def start(self):
+        """Start the writer thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            try:
+                os.makedirs(directory, exist_ok=True)
+            except OSError as e:
+                # Writes report the error and are retried
+                print(f"Could not create the autosave directory {directory}: {e}")
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="quiz-autosave", daemon=True)
+        self._thread.start()
+    
+    def close(self):
+        """Write everything queued and stop the writer thread."""
+        if not self._thread:
+            return
+        with self._changed:
+            self._stopping = True
+            self._changed.notify()
+        self._thread.join()
+        self._thread = None
+        if self._file:
+            self._file.close()
+            self._file = None
+    
+    def load(self):
+        """
+        Replay the journal.
+        
+        Returns:
+            State of the interrupted quiz for QuizEngine.restore_state, or
+            None if no quiz was in progress
+        """
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Could not read the autosaved quiz from {self.path}: {e}")
+            return None
+        
+        state = None
+        for line in lines:
+            try:
+                (kind, value), = json.loads(line).items()
+                if kind == "start":
+                    state = value
+                elif state is not None:
+                    _apply(state, kind, value)
+            except (ValueError, TypeError, LookupError):
+                # A line torn by a crash while it was written
+                break
+        return state
+    
+    def begin(self, state):
+        """
+        Journal a new quiz, replacing the previous one.
+        
+        Args:
+            state: Quiz state from QuizEngine.get_state; the journal keeps
+                it up to date, so it must not be changed by the caller
+        """
+        with self._changed:
+            self._mark_changed()
+            self._state = state
+            self._records = 0
+            self._pending = []
+            self._rewrite = True
+    
+    def record(self, kind, value):
+        """
+        Journal a change of the quiz in progress (ignored if there is none).
+        
+        Args:
+            kind: "answer" with value [question index, answer bitmask],
+                "move" with the new question index, or "ask" with the id of
+                a question added to an adaptive quiz
+            value: JSON-serializable value of the change
+        """
+        with self._changed:
+            if self._state is None:
+                return
+            _apply(self._state, kind, value)
+            self._mark_changed()
+            self._records += 1
+            if self._records >= self.COMPACT_RECORDS:
+                self._records = 0
+                self._pending = []
+                self._rewrite = True
+            elif not self._rewrite:
+                self._pending.append(json.dumps({kind: value}, separators=(",", ":")))
+    
+    def end(self):
+        """Clear the journal once the quiz in progress has been submitted."""
+        with self._changed:
+            if self._state is None:
+                return
+            self._mark_changed()
+            self._state = None
+            self._pending = []
+            self._rewrite = True
+    
+    def _mark_changed(self):
+        """Note the time of a change and wake the writer (lock held)."""
+        now = time.monotonic()
+        if not (self._pending or self._rewrite):
+            self._first_change = now
+        self._last_change = now
+        self._changed.notify()
+    
+    def _run(self):
+        """Write queued changes once they pause, until stopped and drained."""
+        while True:
+            with self._changed:
+                while not (self._pending or self._rewrite or self._stopping):
+                    self._changed.wait()
+                while not self._stopping:
+                    timeout = max(min(self._last_change + self.delay,
+                                      self._first_change + self.MAX_DELAY),
+                                  self._retry_at) - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._changed.wait(timeout)
+                if not (self._pending or self._rewrite):
+                    return
+                
+                rewrite = self._rewrite
+                if not rewrite:
+                    lines = self._pending
+                elif self._state is not None:
+                    lines = [json.dumps({"start": self._state}, separators=(",", ":"))]
+                else:
+                    lines = []
+                self._pending = []
+                self._rewrite = False
+            
+            if self._write(lines, rewrite):
+                self._failures = 0
+                continue
+            # Changes may be missing from the file; write all of it next time
+            with self._changed:
+                if self._stopping:
+                    return
+                self._pending = []
+                self._rewrite = True
+                self._retry_at = time.monotonic() + min(
+                    self.RETRY_DELAY * 2 ** self._failures, self.RETRY_MAX_DELAY)
+                self._failures += 1
+    
+    def _write(self, lines, rewrite):
+        """Append lines to the journal, or replace it with them, and fsync."""
+        data = "".join(line + "\n" for line in lines)
+        try:
+            if rewrite:
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                temporary = self.path + ".tmp"
+                with open(temporary, "w", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporary, self.path)
+            else:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            self.writes += 1
+            return True
+        except OSError as e:
+            print(f"Could not autosave the quiz to {self.path}: {e}")
+            if self._file:
+                self._file.close()
+                self._file = None
+            return False
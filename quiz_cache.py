@@ -0,0 +1,360 @@
+"""
+In-process cache for the Quiz App database layer
+"""
+
+import heapq
+import random
+import sys
+import threading
+from collections import OrderedDict
+
+from quiz_db import QuizDatabase, _config, seeded_sort_key, to_quiz_dict
+from quiz_listener import ChangeListener
+
+
+def _estimate_size(obj):
+    """Approximate the memory footprint of a cached value in bytes."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_estimate_size(k) + _estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+def _copy_question(question):
+    """Copy a cached question so callers cannot mutate the cache."""
+    copied = dict(question)
+    copied['options'] = dict(question['options'])
+    copied['correct_answers'] = list(question['correct_answers'])
+    return copied
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by estimated memory.
+    
+    Entries are evicted oldest-first once their combined size exceeds
+    max_bytes. Hits, misses and evictions are counted for stats().
+    
+    Every delete() and clear() advances the generation. A value read from
+    the database is put() with the generation from before the read, and is
+    dropped if anything was invalidated meanwhile, as it may be stale.
+    """
+    
+    def __init__(self, max_bytes):
+        """Initialize an empty cache holding at most max_bytes."""
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+    
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def peek(self, key):
+        """Return the cached value for key without touching LRU order or stats."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry else None
+    
+    def put(self, key, value, generation=None):
+        """
+        Store value under key, evicting least recently used entries.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            generation: Generation from before value was read; the value is
+                not stored if the cache has been invalidated since
+        """
+        size = _estimate_size(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            if generation is not None and generation != self.generation:
+                return
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+    
+    def delete(self, key):
+        """Remove key from the cache if present."""
+        with self._lock:
+            self.generation += 1
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._bytes -= entry[1]
+    
+    def keys(self):
+        """Snapshot of the cached keys."""
+        with self._lock:
+            return list(self._entries)
+    
+    def clear(self):
+        """Remove all entries; statistics are kept."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries,
+            bytes and max_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+
+class CachedQuizDatabase(QuizDatabase):
+    """
+    QuizDatabase with an in-process cache of subjects and questions.
+    
+    Subjects, per-subject question id lists and fully hydrated questions are
+    kept in an LRUCache. Quizzes are sampled from the cached id list and only
+    questions missing from the cache are fetched. Successful writes through
+    this instance invalidate exactly the entries they affect; after
+    start_listening(), changes made by other clients are evicted the same
+    way as PostgreSQL reports them.
+    """
+    
+    SUBJECTS_KEY = ("subjects",)
+    ALL_QUESTIONS_KEY = ("all_questions",)
+    
+    def __init__(self, *args, max_cache_bytes=None, **kwargs):
+        """Initialize the database and its cache (size from config.ini)."""
+        super().__init__(*args, **kwargs)
+        if max_cache_bytes is None:
+            max_cache_bytes = _config.getint('cache', 'max_megabytes', fallback=64) * 1024 * 1024
+        self.cache = LRUCache(max_cache_bytes)
+        self.listener = None
+    
+    def start_listening(self):
+        """Evict entries changed by other clients, as notified by PostgreSQL."""
+        if self.listener is None:
+            self.listener = ChangeListener(self.connection_params, self.handle_change,
+                                           on_connect=self.handle_reconnect)
+        self.listener.start()
+    
+    def close(self):
+        """Stop listening for changes and close all pooled connections."""
+        if self.listener:
+            self.listener.stop()
+        super().close()
+    
+    def handle_change(self, change):
+        """
+        Evict the cache entries affected by one change notification.
+        
+        Args:
+            change: Payload from notify_quiz_change with the table, the
+                operation and the ids of the affected subjects and/or
+                questions, or flush for a statement that changed many rows
+        """
+        if change.get('flush'):
+            self.cache.clear()
+            return
+        
+        table = change.get('table')
+        subject_ids = change.get('subject_ids') or ()
+        question_ids = change.get('question_ids') or ()
+        if table == 'subjects':
+            if change.get('op') == 'DELETE':
+                for subject_id in subject_ids:
+                    self.invalidate_subject(subject_id)
+            else:
+                self.cache.delete(self.SUBJECTS_KEY)
+                self.cache.delete(self.ALL_QUESTIONS_KEY)
+        elif table == 'questions':
+            for question_id in question_ids:
+                self.cache.delete(("question", question_id))
+            self.cache.delete(self.ALL_QUESTIONS_KEY)
+            if change.get('op') == 'UPDATE':
+                # Id lists only change if questions moved to another subject
+                old_subject_ids = change.get('old_subject_ids')
+                subject_ids = [*subject_ids, *old_subject_ids] if old_subject_ids else ()
+            for subject_id in subject_ids:
+                self.cache.delete(("subject_ids", subject_id))
+        elif table in ('options', 'correct_answers'):
+            for question_id in question_ids:
+                self.cache.delete(("question", question_id))
+    
+    def handle_reconnect(self):
+        """Clear the cache, as changes made while disconnected were not notified."""
+        self.cache.clear()
+    
+    def cache_stats(self):
+        """Get hit/miss statistics of the question bank cache."""
+        return self.cache.stats()
+    
+    def invalidate_subject(self, subject_id):
+        """Evict a subject, its question id list and its cached questions."""
+        self.cache.delete(self.SUBJECTS_KEY)
+        self.cache.delete(self.ALL_QUESTIONS_KEY)
+        self.cache.delete(("subject_ids", subject_id))
+        for key in self.cache.keys():
+            if key[0] == "question":
+                question = self.cache.peek(key)
+                if question and question['subject_id'] == subject_id:
+                    self.cache.delete(key)
+    
+    def invalidate_question(self, question_id, subject_id=None):
+        """Evict a question and the id lists of the subjects it belongs to."""
+        cached = self.cache.peek(("question", question_id))
+        self.cache.delete(("question", question_id))
+        self.cache.delete(self.ALL_QUESTIONS_KEY)
+        
+        subject_ids = {subject_id, cached['subject_id'] if cached else None}
+        if cached is None:
+            # Previous subject unknown: drop any id list that contains it
+            for key in self.cache.keys():
+                if key[0] == "subject_ids" and question_id in (self.cache.peek(key) or ()):
+                    subject_ids.add(key[1])
+        for sid in subject_ids - {None}:
+            self.cache.delete(("subject_ids", sid))
+    
+    def get_all_subjects(self, strict=False):
+        """Retrieve all subjects, from the cache when possible."""
+        subjects = self.cache.get(self.SUBJECTS_KEY)
+        if subjects is None:
+            generation = self.cache.generation
+            subjects = super().get_all_subjects(strict)
+            if subjects:
+                self.cache.put(self.SUBJECTS_KEY, subjects, generation)
+        return [dict(s) for s in subjects]
+    
+    def get_question_ids_by_subject(self, subject_id, strict=False):
+        """Retrieve a subject's question ids, from the cache when possible."""
+        question_ids = self.cache.get(("subject_ids", subject_id))
+        if question_ids is None:
+            generation = self.cache.generation
+            question_ids = super().get_question_ids_by_subject(subject_id, strict)
+            if question_ids:
+                self.cache.put(("subject_ids", subject_id), question_ids, generation)
+        return list(question_ids)
+    
+    def get_questions_by_ids(self, question_ids, strict=False):
+        """Retrieve questions, fetching only those missing from the cache."""
+        cached = {}
+        missing = []
+        for qid in question_ids:
+            question = self.cache.get(("question", qid))
+            if question is None:
+                missing.append(qid)
+            else:
+                cached[qid] = question
+        
+        generation = self.cache.generation
+        for question in super().get_questions_by_ids(missing, strict):
+            self.cache.put(("question", question['id']), question, generation)
+            cached[question['id']] = question
+        
+        return [_copy_question(cached[qid]) for qid in question_ids if qid in cached]
+    
+    def get_question_by_id(self, question_id):
+        """Retrieve a single question, from the cache when possible."""
+        questions = self.get_questions_by_ids([question_id])
+        return questions[0] if questions else None
+    
+    def get_questions_by_subject(self, subject_id, shuffle=True, seed=None, limit=None):
+        """Sample quiz questions from the cached id list of a subject."""
+        if limit is None:
+            limit = _config.getint('quiz', 'max_questions', fallback=70)
+        
+        question_ids = self.get_question_ids_by_subject(subject_id)
+        if not shuffle:
+            picked = question_ids[:limit]
+        elif seed is None:
+            picked = random.sample(question_ids, min(limit, len(question_ids)))
+        else:
+            # Same order as the seeded sample computed by PostgreSQL
+            picked = heapq.nsmallest(limit, question_ids,
+                                     key=lambda qid: seeded_sort_key(seed, qid))
+        
+        return [to_quiz_dict(q) for q in self.get_questions_by_ids(picked)]
+    
+    def get_all_questions(self):
+        """Retrieve all question summaries, from the cache when possible."""
+        questions = self.cache.get(self.ALL_QUESTIONS_KEY)
+        if questions is None:
+            generation = self.cache.generation
+            questions = super().get_all_questions()
+            if questions:
+                self.cache.put(self.ALL_QUESTIONS_KEY, questions, generation)
+        return [dict(q) for q in questions]
+    
+    def add_question(self, subject_id, question_text, question_type, options, correct_answers):
+        """Add a question and invalidate its subject's id list."""
+        question_id = super().add_question(subject_id, question_text, question_type,
+                                           options, correct_answers)
+        if question_id is not None:
+            self.invalidate_question(question_id, subject_id)
+        return question_id
+    
+    def update_question(self, question_id, subject_id, question_text, question_type, options, correct_answers):
+        """Update a question and invalidate it and its old and new subject."""
+        if super().update_question(question_id, subject_id, question_text, question_type,
+                                   options, correct_answers):
+            self.invalidate_question(question_id, subject_id)
+            return True
+        return False
+    
+    def delete_question(self, question_id):
+        """Delete a question and invalidate it and its subject's id list."""
+        if super().delete_question(question_id):
+            self.invalidate_question(question_id)
+            return True
+        return False
+    
+    def add_subject(self, name, description=""):
+        """Add a subject and invalidate the subject list."""
+        subject_id = super().add_subject(name, description)
+        if subject_id is not None:
+            self.cache.delete(self.SUBJECTS_KEY)
+        return subject_id
+    
+    def update_subject(self, subject_id, name, description=""):
+        """Update a subject and invalidate lists that show its name."""
+        if super().update_subject(subject_id, name, description):
+            self.cache.delete(self.SUBJECTS_KEY)
+            self.cache.delete(self.ALL_QUESTIONS_KEY)
+            return True
+        return False
+    
+    def delete_subject(self, subject_id):
+        """Delete a subject and invalidate everything cached for it."""
+        if super().delete_subject(subject_id):
+            self.invalidate_subject(subject_id)
+            return True
+        return False
@@ -0,0 +1,148 @@
+"""
+Offline item calibration for adaptive Quiz App quizzes
+
+Reads the answered responses of the attempt history, estimates the 2PL item
+response theory parameters (discrimination and difficulty) of every question
+with enough responses, and stores them in item_parameters, where adaptive
+quizzes pick them up. Every attempt counts as one learner. Calibration runs
+over all responses at once with NumPy, so a history of millions of responses
+takes seconds; run it again from time to time (e.g. nightly) as attempts
+accumulate.
+
+Questions with fewer than --min-responses responses keep their previous
+parameters, or the defaults if they were never calibrated.
+
+Usage:
+    python quiz_calibrate.py [--subject "Security+"] [--min-responses 30]
+                             [--iterations 100] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # reported by main()
+    np = None
+
+import psycopg2
+
+from domain import calibrate_items
+from quiz_db import QuizDatabase
+
+
+def load_history(db, subject_id=None):
+    """
+    Read the answered responses of the attempt history into arrays.
+    
+    Args:
+        db: QuizDatabase to read from
+        subject_id: Only read attempts of this subject (None for all)
+    
+    Returns:
+        Tuple of NumPy arrays (attempt_ids, question_ids, correct), one
+        element per response
+    """
+    attempt_ids, question_ids, correct = array('q'), array('q'), array('b')
+    for attempt_id, question_id, is_correct in db.iter_responses(subject_id):
+        attempt_ids.append(attempt_id)
+        question_ids.append(question_id)
+        correct.append(is_correct)
+    return (np.frombuffer(attempt_ids, dtype=np.int64),
+            np.frombuffer(question_ids, dtype=np.int64),
+            np.frombuffer(correct, dtype=np.int8).astype(bool))
+
+
+def calibrate(attempt_ids, question_ids, correct, min_responses=30, iterations=100):
+    """
+    Calibrate the questions of a response history.
+    
+    Args:
+        attempt_ids: Attempt of each response
+        question_ids: Question of each response
+        correct: Whether each response was correct
+        min_responses: Leave out questions with fewer responses than this
+        iterations: Maximum number of calibration rounds
+    
+    Returns:
+        List of (question_id, discrimination, difficulty, responses) tuples
+    """
+    _, inverse, counts = np.unique(question_ids, return_inverse=True, return_counts=True)
+    keep = counts[inverse] >= min_responses
+    if not keep.any():
+        return []
+    
+    # Map ids to dense 0-based indexes
+    items, item_index, responses = np.unique(question_ids[keep], return_inverse=True,
+                                             return_counts=True)
+    persons, person_index = np.unique(attempt_ids[keep], return_inverse=True)
+    
+    discrimination, difficulty, _ = calibrate_items(
+        person_index, item_index, correct[keep], len(persons), len(items),
+        iterations=iterations)
+    
+    return [(int(question_id), float(a), float(b), int(n))
+            for question_id, a, b, n in zip(items, discrimination, difficulty, responses)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate questions for adaptive quizzes.")
+    parser.add_argument("--subject", help="only calibrate this subject (default: all)")
+    parser.add_argument("--min-responses", type=int, default=30,
+                        help="leave out questions with fewer responses")
+    parser.add_argument("--iterations", type=int, default=100,
+                        help="maximum number of calibration rounds")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the summary without storing the parameters")
+    args = parser.parse_args()
+    
+    if np is None:
+        print("quiz_calibrate.py requires NumPy (pip install numpy)", file=sys.stderr)
+        sys.exit(1)
+    
+    db = QuizDatabase(min_connections=1, max_connections=1)
+    if not db.connect():
+        sys.exit(1)
+    
+    try:
+        subject_id = None
+        if args.subject:
+            subject_ids = {s['name']: s['id'] for s in db.get_all_subjects()}
+            if args.subject not in subject_ids:
+                print(f"Unknown subject {args.subject!r}", file=sys.stderr)
+                sys.exit(1)
+            subject_id = subject_ids[args.subject]
+        
+        start = time.perf_counter()
+        try:
+            attempt_ids, question_ids, correct = load_history(db, subject_id)
+        except psycopg2.Error as e:
+            print(f"Could not read the attempt history: {e}", file=sys.stderr)
+            sys.exit(1)
+        loaded = time.perf_counter()
+        
+        parameters = calibrate(attempt_ids, question_ids, correct,
+                               min_responses=args.min_responses, iterations=args.iterations)
+        calibrated = time.perf_counter()
+        
+        print(f"Read {len(correct):,} responses of {len(np.unique(attempt_ids)):,} attempts "
+              f"in {loaded - start:.2f}s", file=sys.stderr)
+        print(f"Calibrated {len(parameters):,} of {len(np.unique(question_ids)):,} questions "
+              f"in {calibrated - loaded:.2f}s", file=sys.stderr)
+        if parameters:
+            _, discrimination, difficulty, _ = zip(*parameters)
+            for name, values in (("discrimination", discrimination), ("difficulty", difficulty)):
+                low, median, high = np.percentile(values, [5, 50, 95])
+                print(f"  {name}: median {median:.2f}, 90% between {low:.2f} and {high:.2f}",
+                      file=sys.stderr)
+        
+        if not args.dry_run and not db.save_item_parameters(parameters):
+            sys.exit(1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,158 +3,515 @@ Database module for Quiz App - PostgreSQL backend
 """
 
 import configparser
+import hashlib
 import os
+import select
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 import psycopg2
-from psycopg2.extras import RealDictCursor
-import random
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 _config = configparser.ConfigParser()
 _config.read(os.path.join(os.path.dirname(__file__), 'config.ini'))
 
+# Per-question columns for fully hydrated questions: options and correct
+# answers are aggregated by correlated subqueries (served by the question_id
+# indexes) instead of two extra round trips per question.
+_HYDRATED_COLUMNS = """
+    q.id, q.subject_id, q.question_text, q.question_type,
+    COALESCE((SELECT json_object_agg(o.option_key, o.option_text
+                                     ORDER BY o.option_key)
+              FROM options o
+              WHERE o.question_id = q.id), json_build_object()) AS options,
+    COALESCE((SELECT array_agg(ca.answer_key ORDER BY ca.answer_key)
+              FROM correct_answers ca
+              WHERE ca.question_id = q.id), ARRAY[]::varchar[]) AS correct_answers
+"""
+
+_HYDRATED_QUESTIONS_SQL = """
+    SELECT """ + _HYDRATED_COLUMNS + """
+    FROM questions q
+    WHERE {where}
+    ORDER BY q.id
+"""
+
+# Random sample of a subject's questions. Only question ids are ranked and
+# limited; options and answers are hydrated for the picked rows alone, so the
+# cost follows the quiz size rather than the bank size. The sort key is either
+# random() or, for reproducible quizzes, an md5 of the seed and the id.
+_SAMPLED_QUESTIONS_SQL = """
+    WITH picked AS (
+        SELECT id, {sort_key} AS sort_key
+        FROM questions
+        WHERE subject_id = %(subject_id)s
+        ORDER BY sort_key
+        LIMIT %(limit)s
+    )
+    SELECT """ + _HYDRATED_COLUMNS + """
+    FROM picked p
+    JOIN questions q ON q.id = p.id
+    ORDER BY p.sort_key
+"""
+
+# Ranked full-text search. Matches in the question text and in any of its
+# options are found through the GIN expression indexes (see db/init.sql);
+# option matches count half as much as question matches.
+_SEARCH_QUESTIONS_SQL = """
+    WITH query AS (
+        SELECT websearch_to_tsquery('english', %(text)s) AS tsq
+    ), matches AS (
+        SELECT q.id AS question_id,
+               ts_rank(to_tsvector('english', q.question_text), query.tsq) AS rank
+        FROM questions q, query
+        WHERE to_tsvector('english', q.question_text) @@ query.tsq
+        UNION ALL
+        SELECT o.question_id,
+               ts_rank(to_tsvector('english', o.option_text), query.tsq) / 2
+        FROM options o, query
+        WHERE to_tsvector('english', o.option_text) @@ query.tsq
+    )
+    SELECT q.id, q.subject_id, s.name AS subject_name,
+           q.question_text, q.question_type, SUM(m.rank) AS rank
+    FROM matches m
+    JOIN questions q ON q.id = m.question_id
+    JOIN subjects s ON s.id = q.subject_id
+    WHERE %(subject_id)s::integer IS NULL OR q.subject_id = %(subject_id)s
+    GROUP BY q.id, s.name
+    ORDER BY rank DESC, q.id
+    LIMIT %(limit)s OFFSET %(offset)s
+"""
+
+# Spaced repetition quiz: the user's most overdue questions of a subject (one
+# range of idx_review_items_due), topped up with questions the user has never
+# reviewed, in bank order. Only the picked questions are hydrated.
+_DUE_QUESTIONS_SQL = """
+    WITH due AS (
+        SELECT question_id, due_at
+        FROM review_items
+        WHERE user_name = %(user_name)s AND subject_id = %(subject_id)s
+          AND due_at <= %(now)s
+        ORDER BY due_at
+        LIMIT %(limit)s
+    ), unseen AS (
+        SELECT q.id AS question_id, NULL::timestamp AS due_at
+        FROM questions q
+        WHERE q.subject_id = %(subject_id)s
+          AND NOT EXISTS (SELECT 1 FROM review_items r
+                          WHERE r.user_name = %(user_name)s AND r.question_id = q.id)
+        ORDER BY q.id
+        LIMIT %(limit)s
+    ), picked AS (
+        -- Unseen questions are only read while fewer than limit are due
+        SELECT * FROM due
+        UNION ALL
+        SELECT * FROM unseen
+        LIMIT %(limit)s
+    )
+    SELECT """ + _HYDRATED_COLUMNS + """,
+           r.ease, r.interval_days, r.repetitions, r.due_at
+    FROM picked p
+    JOIN questions q ON q.id = p.question_id
+    LEFT JOIN review_items r ON r.user_name = %(user_name)s AND r.question_id = q.id
+    ORDER BY p.due_at NULLS LAST, q.id
+"""
+
+_RANDOM_SORT_KEY = "random()"
+_SEEDED_SORT_KEY = "md5(%(seed)s || ':' || id) COLLATE \"C\""
+
+
+def seeded_sort_key(seed, question_id):
+    """Python equivalent of _SEEDED_SORT_KEY, for sampling cached id lists."""
+    return hashlib.md5(f"{seed}:{question_id}".encode()).hexdigest()
+
+
+def to_quiz_dict(row):
+    """Convert a hydrated question row into the quiz (JSON) format."""
+    return {
+        "id": row['id'],
+        "question": row['question_text'],
+        "type": row['question_type'],
+        "options": row['options'],
+        "correct_answer": row['correct_answers']
+    }
+
 
 class QuizDatabase:
-    """Handle all database operations for the quiz application."""
+    """
+    Handle all database operations for the quiz application.
+    
+    Connections come from a thread-safe pool. Every operation borrows one
+    connection, runs in its own transaction and hands the connection back, so
+    the main window, the admin dialogs and background loaders can share one
+    instance without serializing on a single socket.
+    """
+    
+    # Connections idle for longer than this (seconds) are pinged before reuse,
+    # as are connections the server has already written to or dropped
+    HEALTH_CHECK_INTERVAL = 30
+    # Attempts to obtain a live connection before an operation fails
+    CONNECT_ATTEMPTS = 3
+    # Delay (seconds) before the second attempt; doubled for each further one
+    RETRY_DELAY = 0.2
     
     def __init__(self, host="localhost", port=5432, database="quiz_db", 
-                 user="quiz_user", password="quiz_password"):
-        """Initialize database connection parameters."""
+                 user="quiz_user", password="quiz_password",
+                 min_connections=None, max_connections=None, connect_timeout=None):
+        """Initialize database connection and pool parameters."""
+        if connect_timeout is None:
+            connect_timeout = _config.getint('database', 'connect_timeout', fallback=10)
         self.connection_params = {
             "host": host,
             "port": port,
             "database": database,
             "user": user,
-            "password": password
+            "password": password,
+            "connect_timeout": connect_timeout
         }
-        self.conn = None
+        if min_connections is None:
+            min_connections = _config.getint('database', 'min_connections', fallback=1)
+        if max_connections is None:
+            max_connections = _config.getint('database', 'max_connections', fallback=5)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        self._available = threading.BoundedSemaphore(max_connections)
+        self._last_used = {}
     
     def connect(self):
-        """Establish connection to the database."""
-        try:
-            self.conn = psycopg2.connect(**self.connection_params)
+        """Create the connection pool if it does not exist yet."""
+        if self.pool:
             return True
+        # Connect without holding the lock, so close() never waits on a slow server
+        try:
+            db_pool = ThreadedConnectionPool(self.min_connections,
+                                             self.max_connections,
+                                             **self.connection_params)
         except psycopg2.Error as e:
             print(f"Database connection error: {e}")
             return False
+        with self._pool_lock:
+            if self.pool is None:
+                self.pool = db_pool
+                return True
+        # Another thread connected first
+        db_pool.closeall()
+        return True
     
     def close(self):
-        """Close database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """Close all pooled database connections."""
+        with self._pool_lock:
+            if self.pool:
+                self.pool.closeall()
+                self.pool = None
+                self._last_used.clear()
+    
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a healthy pooled connection for one unit of work.
+        
+        The transaction is committed when the block succeeds and rolled back
+        otherwise, so an error never leaves a pooled connection aborted.
+        Blocks while all max_connections connections are in use.
+        
+        Raises:
+            psycopg2.Error: If no live connection could be obtained
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            self._release(conn)
+    
+    @contextmanager
+    def _cursor(self, cursor_factory=None):
+        """Open a cursor on a pooled connection for one operation."""
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=cursor_factory) as cursor:
+                yield cursor
+    
+    def _acquire(self):
+        """Take a live connection from the pool, replacing dropped ones."""
+        self._available.acquire()
+        try:
+            for attempt in range(self.CONNECT_ATTEMPTS):
+                if attempt:
+                    time.sleep(self.RETRY_DELAY * 2 ** (attempt - 1))
+                if not self.pool and not self.connect():
+                    continue
+                conn = self._take_live(self.pool)
+                if conn is not None:
+                    return conn
+            raise psycopg2.OperationalError("No database connection available")
+        except BaseException:
+            self._available.release()
+            raise
+    
+    def _take_live(self, db_pool):
+        """
+        Take a healthy connection from the pool without waiting.
+        
+        Dropped connections are discarded and the next one tried straight away;
+        after a database restart every idle connection in the pool is dead, and
+        once they are gone the pool opens a fresh one.
+        
+        Returns:
+            A live connection, or None if a new connection could not be opened
+        """
+        for _ in range(db_pool.maxconn + 1):
+            try:
+                conn = db_pool.getconn()
+            except psycopg2.OperationalError as e:
+                print(f"Database connection error: {e}")
+                return None
+            if self._is_healthy(conn):
+                return conn
+            self._last_used.pop(conn, None)
+            db_pool.putconn(conn, close=True)
+        return None
+    
+    def _release(self, conn):
+        """Return a connection to the pool, discarding it if it was dropped."""
+        try:
+            db_pool = self.pool
+            if conn.closed:
+                self._last_used.pop(conn, None)
+            else:
+                self._last_used[conn] = time.monotonic()
+            if db_pool is None or db_pool.closed:
+                conn.close()
+            else:
+                db_pool.putconn(conn, close=bool(conn.closed))
+        finally:
+            self._available.release()
+    
+    def _is_healthy(self, conn):
+        """Check a connection, pinging it if it looks suspect or has been idle for a while.
+        
+        A pooled connection should be idle with nothing to read. When the server
+        drops it (e.g. on a restart) it queues an error or EOF on the socket, which
+        a zero-timeout select() sees without a round trip.
+        """
+        if conn.closed:
+            return False
+        suspect = (conn.info.transaction_status != TRANSACTION_STATUS_IDLE
+                   or self._has_pending_input(conn))
+        last_used = self._last_used.get(conn)
+        if not suspect and (last_used is None
+                            or time.monotonic() - last_used < self.HEALTH_CHECK_INTERVAL):
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    @staticmethod
+    def _has_pending_input(conn):
+        """Whether the server has sent anything on an idle connection's socket."""
+        try:
+            readable, _, _ = select.select([conn], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
     
-    def get_all_subjects(self):
+    def get_all_subjects(self, strict=False):
         """
         Retrieve all subjects from the database.
         
+        Args:
+            strict: Raise on a database error instead of returning an empty list
+        
         Returns:
             List of subject dictionaries with id, name, and description
-        """
-        if not self.conn:
-            if not self.connect():
-                return []
         
+        Raises:
+            psycopg2.Error: If strict and the subjects cannot be read
+        """
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT id, name, description
-                FROM subjects
-                ORDER BY name
-            """)
-            
-            subjects = cursor.fetchall()
-            cursor.close()
-            return [dict(s) for s in subjects]
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT id, name, description
+                    FROM subjects
+                    ORDER BY name
+                """)
+                
+                return [dict(s) for s in cursor.fetchall()]
             
         except psycopg2.Error as e:
+            if strict:
+                raise
             print(f"Database query error: {e}")
             return []
     
-    def get_questions_by_subject(self, subject_id, shuffle=True):
+    def get_questions_by_subject(self, subject_id, shuffle=True, seed=None, limit=None):
         """
         Retrieve quiz questions for a specific subject.
         
+        When shuffling, the questions are sampled inside PostgreSQL and only
+        the sampled questions are loaded with their options and answers.
+        
         Args:
             subject_id: The ID of the subject to filter by
-            shuffle: Whether to randomize the order of questions
+            shuffle: Whether to randomly sample and order the questions
+            seed: Optional seed; the same seed yields the same quiz for an
+                unchanged question bank
+            limit: Maximum number of questions (defaults to max_questions
+                from config.ini)
         
         Returns:
             List of question dictionaries in the same format as JSON
         """
-        if not self.conn:
-            if not self.connect():
-                return []
+        if limit is None:
+            limit = _config.getint('quiz', 'max_questions', fallback=70)
         
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Get questions for the specific subject
-            cursor.execute("""
-                SELECT id, question_text, question_type
-                FROM questions
-                WHERE subject_id = %s
-                ORDER BY id
-            """, (subject_id,))
-            
-            questions = cursor.fetchall()
-            quiz_data = []
-            
-            for question in questions:
-                question_id = question['id']
-                
-                # Get options for this question
-                cursor.execute("""
-                    SELECT option_key, option_text
-                    FROM options
-                    WHERE question_id = %s
-                    ORDER BY option_key
-                """, (question_id,))
+            with self._cursor(RealDictCursor) as cursor:
+                if shuffle:
+                    sort_key = _RANDOM_SORT_KEY if seed is None else _SEEDED_SORT_KEY
+                    cursor.execute(_SAMPLED_QUESTIONS_SQL.format(sort_key=sort_key), {
+                        "subject_id": subject_id,
+                        "limit": limit,
+                        "seed": str(seed)
+                    })
+                else:
+                    cursor.execute(_HYDRATED_QUESTIONS_SQL.format(where="q.subject_id = %s")
+                                   + " LIMIT %s", (subject_id, limit))
                 
-                options = {row['option_key']: row['option_text'] 
-                          for row in cursor.fetchall()}
+                return [to_quiz_dict(row) for row in cursor.fetchall()]
+            
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+    
+    def get_due_questions(self, user_name, subject_id, limit=None, now=None):
+        """
+        Retrieve a spaced repetition quiz for a user.
+        
+        The user's questions of the subject that are due are picked most
+        overdue first; if fewer than limit are due, questions the user has
+        never reviewed fill the rest. Questions reviewed but not yet due are
+        left out, so the quiz may be short or empty.
+        
+        Args:
+            user_name: The user whose schedule to follow
+            subject_id: The ID of the subject to pick questions from
+            limit: Maximum number of questions (defaults to max_questions
+                from config.ini)
+            now: Questions due at or before this time are due (default: now)
+        
+        Returns:
+            List of question dictionaries in the same format as JSON, each
+            with the review state ease, interval_days, repetitions and
+            due_at (all None for questions never reviewed)
+        """
+        if limit is None:
+            limit = _config.getint('quiz', 'max_questions', fallback=70)
+        
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(_DUE_QUESTIONS_SQL, {
+                    "user_name": user_name,
+                    "subject_id": subject_id,
+                    "limit": limit,
+                    "now": now or datetime.now()
+                })
                 
-                # Get correct answers for this question
+                return [dict(to_quiz_dict(row), ease=row['ease'],
+                             interval_days=row['interval_days'],
+                             repetitions=row['repetitions'], due_at=row['due_at'])
+                        for row in cursor.fetchall()]
+            
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+    
+    def get_question_ids_by_subject(self, subject_id, strict=False):
+        """
+        Retrieve the ids of all questions in a subject.
+        
+        Args:
+            subject_id: The ID of the subject
+            strict: Raise on a database error instead of returning an empty list
+        
+        Returns:
+            List of question ids in ascending order
+        
+        Raises:
+            psycopg2.Error: If strict and the ids cannot be read
+        """
+        try:
+            with self._cursor() as cursor:
                 cursor.execute("""
-                    SELECT answer_key
-                    FROM correct_answers
-                    WHERE question_id = %s
-                    ORDER BY answer_key
-                """, (question_id,))
-                
-                correct_answers = [row['answer_key'] for row in cursor.fetchall()]
+                    SELECT id
+                    FROM questions
+                    WHERE subject_id = %s
+                    ORDER BY id
+                """, (subject_id,))
                 
-                # Build question dict in same format as JSON
-                quiz_data.append({
-                    "question": question['question_text'],
-                    "type": question['question_type'],
-                    "options": options,
-                    "correct_answer": correct_answers
-                })
+                return [row[0] for row in cursor.fetchall()]
             
-            cursor.close()
+        except psycopg2.Error as e:
+            if strict:
+                raise
+            print(f"Database query error: {e}")
+            return []
+    
+    def get_questions_by_ids(self, question_ids, strict=False):
+        """
+        Retrieve several questions with all their details in one query.
+        
+        Args:
+            question_ids: IDs of the questions to retrieve
+            strict: Raise on a database error instead of returning an empty
+                list, for callers that must not mistake it for deleted questions
+        
+        Returns:
+            List of question dictionaries (as returned by get_question_by_id)
+            in the order of question_ids; unknown ids are skipped
+        
+        Raises:
+            psycopg2.Error: If strict and the questions cannot be read
+        """
+        if not question_ids:
+            return []
+        
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(_HYDRATED_QUESTIONS_SQL.format(where="q.id = ANY(%s)"),
+                               (list(question_ids),))
+                
+                by_id = {row['id']: dict(row) for row in cursor.fetchall()}
             
-            # Shuffle if requested
-            if shuffle:
-                random.shuffle(quiz_data)
-
-            max_questions = _config.getint('quiz', 'max_questions', fallback=70)
-            return quiz_data[:max_questions]
+            return [by_id[qid] for qid in question_ids if qid in by_id]
             
         except psycopg2.Error as e:
+            if strict:
+                raise
             print(f"Database query error: {e}")
             return []
     
     def get_question_count(self):
         """Get the total number of questions in the database."""
-        if not self.conn:
-            if not self.connect():
-                return 0
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM questions")
-            count = cursor.fetchone()[0]
-            cursor.close()
-            return count
+            with self._cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM questions")
+                return cursor.fetchone()[0]
         except psycopg2.Error as e:
             print(f"Database query error: {e}")
             return 0
@@ -173,61 +530,43 @@ class QuizDatabase:
         Returns:
             question_id if successful, None otherwise
         """
-        if not self.conn:
-            if not self.connect():
-                return None
-        
         try:
-            cursor = self.conn.cursor()
-            
-            # Insert question
-            cursor.execute("""
-                INSERT INTO questions (subject_id, question_text, question_type)
-                VALUES (%s, %s, %s)
-                RETURNING id
-            """, (subject_id, question_text, question_type))
-            
-            question_id = cursor.fetchone()[0]
-            
-            # Insert options
-            for key, text in options.items():
+            with self._cursor() as cursor:
+                # Insert question
                 cursor.execute("""
-                    INSERT INTO options (question_id, option_key, option_text)
+                    INSERT INTO questions (subject_id, question_text, question_type)
                     VALUES (%s, %s, %s)
-                """, (question_id, key, text))
-            
-            # Insert correct answers
-            for answer in correct_answers:
-                cursor.execute("""
+                    RETURNING id
+                """, (subject_id, question_text, question_type))
+                
+                question_id = cursor.fetchone()[0]
+                
+                # Insert options
+                execute_values(cursor, """
+                    INSERT INTO options (question_id, option_key, option_text)
+                    VALUES %s
+                """, [(question_id, key, text) for key, text in options.items()])
+                
+                # Insert correct answers
+                execute_values(cursor, """
                     INSERT INTO correct_answers (question_id, answer_key)
-                    VALUES (%s, %s)
-                """, (question_id, answer))
-            
-            self.conn.commit()
-            cursor.close()
+                    VALUES %s
+                """, [(question_id, answer) for answer in correct_answers])
             
             return question_id
             
         except psycopg2.Error as e:
             print(f"Database insert error: {e}")
-            self.conn.rollback()
             return None
     
     def delete_question(self, question_id):
         """Delete a question and its related data from the database."""
-        if not self.conn:
-            if not self.connect():
-                return False
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM questions WHERE id = %s", (question_id,))
-            self.conn.commit()
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute("DELETE FROM questions WHERE id = %s", (question_id,))
             return True
         except psycopg2.Error as e:
             print(f"Database delete error: {e}")
-            self.conn.rollback()
             return False
     
     def add_subject(self, name, description=""):
@@ -241,27 +580,20 @@ class QuizDatabase:
         Returns:
             subject_id if successful, None otherwise
         """
-        if not self.conn:
-            if not self.connect():
-                return None
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO subjects (name, description)
-                VALUES (%s, %s)
-                RETURNING id
-            """, (name, description))
-            
-            subject_id = cursor.fetchone()[0]
-            self.conn.commit()
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO subjects (name, description)
+                    VALUES (%s, %s)
+                    RETURNING id
+                """, (name, description))
+                
+                subject_id = cursor.fetchone()[0]
             
             return subject_id
             
         except psycopg2.Error as e:
             print(f"Database insert error: {e}")
-            self.conn.rollback()
             return None
     
     def update_subject(self, subject_id, name, description=""):
@@ -276,25 +608,18 @@ class QuizDatabase:
         Returns:
             True if successful, False otherwise
         """
-        if not self.conn:
-            if not self.connect():
-                return False
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("""
-                UPDATE subjects
-                SET name = %s, description = %s
-                WHERE id = %s
-            """, (name, description, subject_id))
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    UPDATE subjects
+                    SET name = %s, description = %s
+                    WHERE id = %s
+                """, (name, description, subject_id))
             
-            self.conn.commit()
-            cursor.close()
             return True
             
         except psycopg2.Error as e:
             print(f"Database update error: {e}")
-            self.conn.rollback()
             return False
     
     def delete_subject(self, subject_id):
@@ -307,19 +632,12 @@ class QuizDatabase:
         Returns:
             True if successful, False otherwise
         """
-        if not self.conn:
-            if not self.connect():
-                return False
-        
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("DELETE FROM subjects WHERE id = %s", (subject_id,))
-            self.conn.commit()
-            cursor.close()
+            with self._cursor() as cursor:
+                cursor.execute("DELETE FROM subjects WHERE id = %s", (subject_id,))
             return True
         except psycopg2.Error as e:
             print(f"Database delete error: {e}")
-            self.conn.rollback()
             return False
     
     def get_question_by_id(self, question_id):
@@ -332,50 +650,14 @@ class QuizDatabase:
         Returns:
             Dictionary with question details or None if not found
         """
-        if not self.conn:
-            if not self.connect():
-                return None
-        
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            
-            # Get question details
-            cursor.execute("""
-                SELECT id, subject_id, question_text, question_type
-                FROM questions
-                WHERE id = %s
-            """, (question_id,))
-            
-            question = cursor.fetchone()
-            if not question:
-                cursor.close()
-                return None
-            
-            question = dict(question)
-            
-            # Get options
-            cursor.execute("""
-                SELECT option_key, option_text
-                FROM options
-                WHERE question_id = %s
-                ORDER BY option_key
-            """, (question_id,))
-            
-            question['options'] = {row['option_key']: row['option_text'] 
-                                  for row in cursor.fetchall()}
-            
-            # Get correct answers
-            cursor.execute("""
-                SELECT answer_key
-                FROM correct_answers
-                WHERE question_id = %s
-                ORDER BY answer_key
-            """, (question_id,))
-            
-            question['correct_answers'] = [row['answer_key'] for row in cursor.fetchall()]
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(_HYDRATED_QUESTIONS_SQL.format(where="q.id = %s"),
+                               (question_id,))
+                
+                question = cursor.fetchone()
             
-            cursor.close()
-            return question
+            return dict(question) if question else None
             
         except psycopg2.Error as e:
             print(f"Database query error: {e}")
@@ -396,48 +678,222 @@ class QuizDatabase:
         Returns:
             True if successful, False otherwise
         """
-        if not self.conn:
-            if not self.connect():
-                return False
-        
         try:
-            cursor = self.conn.cursor()
-            
-            # Update question
-            cursor.execute("""
-                UPDATE questions
-                SET subject_id = %s, question_text = %s, question_type = %s
-                WHERE id = %s
-            """, (subject_id, question_text, question_type, question_id))
-            
-            # Delete existing options and answers
-            cursor.execute("DELETE FROM options WHERE question_id = %s", (question_id,))
-            cursor.execute("DELETE FROM correct_answers WHERE question_id = %s", (question_id,))
-            
-            # Insert new options
-            for key, text in options.items():
+            with self._cursor() as cursor:
+                # Update question
                 cursor.execute("""
+                    UPDATE questions
+                    SET subject_id = %s, question_text = %s, question_type = %s
+                    WHERE id = %s
+                """, (subject_id, question_text, question_type, question_id))
+                
+                # Delete existing options and answers
+                cursor.execute("DELETE FROM options WHERE question_id = %s", (question_id,))
+                cursor.execute("DELETE FROM correct_answers WHERE question_id = %s", (question_id,))
+                
+                # Insert new options
+                execute_values(cursor, """
                     INSERT INTO options (question_id, option_key, option_text)
-                    VALUES (%s, %s, %s)
-                """, (question_id, key, text))
-            
-            # Insert new correct answers
-            for answer in correct_answers:
-                cursor.execute("""
+                    VALUES %s
+                """, [(question_id, key, text) for key, text in options.items()])
+                
+                # Insert new correct answers
+                execute_values(cursor, """
                     INSERT INTO correct_answers (question_id, answer_key)
-                    VALUES (%s, %s)
-                """, (question_id, answer))
-            
-            self.conn.commit()
-            cursor.close()
+                    VALUES %s
+                """, [(question_id, answer) for answer in correct_answers])
             
             return True
             
         except psycopg2.Error as e:
             print(f"Database update error: {e}")
-            self.conn.rollback()
             return False
     
+    def iter_bank(self, itersize=2000):
+        """
+        Stream every subject and question from one consistent snapshot.
+        
+        Questions are read through a server-side (named) cursor, so only
+        itersize of them are held in memory at a time, unlike
+        get_all_questions. The pooled connection is held until the generator
+        is exhausted or closed.
+        
+        Args:
+            itersize: Number of questions fetched per round trip
+        
+        Yields:
+            ('subject', dict) with id, name and description for every
+            subject, then ('question', dict) as returned by get_question_by_id
+            plus subject_name, in id order
+        
+        Raises:
+            psycopg2.Error: If the export cannot be read
+        """
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # Subjects and questions must come from the same snapshot
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                cursor.execute("""
+                    SELECT id, name, description
+                    FROM subjects
+                    ORDER BY id
+                """)
+                for subject in cursor.fetchall():
+                    yield 'subject', dict(subject)
+            
+            with conn.cursor(name='iter_bank', cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = itersize
+                cursor.execute("""
+                    SELECT s.name AS subject_name, """ + _HYDRATED_COLUMNS + """
+                    FROM questions q
+                    JOIN subjects s ON s.id = q.subject_id
+                    ORDER BY q.id
+                """)
+                for question in cursor:
+                    yield 'question', dict(question)
+    
+    def iter_bank_changes(self, since=None, itersize=2000):
+        """
+        Stream the subjects and questions changed since a version.
+        
+        Rows carry the id of the transaction that last changed them (see
+        touch_bank_row in db/init.sql). The version yielded first is the
+        oldest transaction still running when the changes were read, so
+        passing it as `since` next time never misses a change committed in
+        the meantime; a few rows may be sent twice.
+        
+        Args:
+            since: Version from a previous call (None for the whole bank)
+            itersize: Number of questions fetched per round trip
+        
+        Yields:
+            ('version', int) first, then ('deleted_subject', id) and
+            ('deleted_question', id) for rows deleted since (not for the
+            whole bank), then ('subject', dict) with id, name and
+            description and ('question', dict) as returned by
+            get_question_by_id for every row changed since, in id order.
+            Apply deletions before the rows, as a deleted id may have been
+            inserted again.
+        
+        Raises:
+            psycopg2.Error: If the changes cannot be read
+        """
+        since_clause = "" if since is None else "WHERE version >= %(since)s"
+        with self.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                # The version and all changes must come from the same snapshot
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                cursor.execute("""
+                    SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS version
+                """)
+                yield 'version', cursor.fetchone()['version']
+                
+                if since is not None:
+                    cursor.execute("""
+                        SELECT table_name, row_id
+                        FROM bank_tombstones
+                        WHERE version >= %(since)s
+                        ORDER BY table_name, row_id
+                    """, {"since": since})
+                    for row in cursor.fetchall():
+                        kind = 'deleted_subject' if row['table_name'] == 'subjects' else 'deleted_question'
+                        yield kind, row['row_id']
+                
+                cursor.execute("""
+                    SELECT id, name, description
+                    FROM subjects
+                    """ + since_clause + """
+                    ORDER BY id
+                """, {"since": since})
+                for subject in cursor.fetchall():
+                    yield 'subject', dict(subject)
+            
+            with conn.cursor(name='iter_bank_changes', cursor_factory=RealDictCursor) as cursor:
+                cursor.itersize = itersize
+                cursor.execute("""
+                    SELECT """ + _HYDRATED_COLUMNS + """
+                    FROM questions q
+                    """ + since_clause.replace("version", "q.version") + """
+                    ORDER BY q.id
+                """, {"since": since})
+                for question in cursor:
+                    yield 'question', dict(question)
+    
+    def get_questions_page(self, subject_id=None, after=None, limit=200):
+        """
+        Retrieve one page of question summaries using keyset pagination.
+        
+        Questions are ordered by (subject_id, id) and each page starts right
+        after the key of the previous one, so every page costs the same
+        index range scan however deep into the bank it is.
+        
+        Args:
+            subject_id: Only return questions of this subject (None for all)
+            after: (subject_id, id) key of the last row of the previous
+                page, or None for the first page
+            limit: Maximum number of questions in the page
+        
+        Returns:
+            List of question dictionaries with id, subject_id, subject_name,
+            question_text and question_type
+        """
+        conditions = []
+        params = []
+        if subject_id is not None:
+            conditions.append("q.subject_id = %s")
+            params.append(subject_id)
+        if after is not None:
+            conditions.append("(q.subject_id, q.id) > (%s, %s)")
+            params.extend(after)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT q.id, q.subject_id, s.name as subject_name,
+                           q.question_text, q.question_type
+                    FROM questions q
+                    JOIN subjects s ON q.subject_id = s.id
+                    {where}
+                    ORDER BY q.subject_id, q.id
+                    LIMIT %s
+                """, params + [limit])
+                
+                return [dict(q) for q in cursor.fetchall()]
+            
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+    
+    def search_questions(self, text, subject_id=None, limit=200, offset=0):
+        """
+        Search question and option text, best matches first.
+        
+        Args:
+            text: Search terms; supports "quoted phrases", OR and -exclusions
+            subject_id: Only search questions of this subject (None for all)
+            limit: Maximum number of results in the page
+            offset: Number of results to skip (for paging)
+        
+        Returns:
+            List of question dictionaries with id, subject_id, subject_name,
+            question_text, question_type and rank
+        """
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(_SEARCH_QUESTIONS_SQL, {
+                    "text": text,
+                    "subject_id": subject_id,
+                    "limit": limit,
+                    "offset": offset
+                })
+                
+                return [dict(q) for q in cursor.fetchall()]
+        
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+    
     def get_all_questions(self):
         """
         Retrieve all questions with their subject information.
@@ -445,24 +901,386 @@ class QuizDatabase:
         Returns:
             List of question dictionaries with subject details
         """
-        if not self.conn:
-            if not self.connect():
-                return []
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT q.id, q.subject_id, s.name as subject_name, 
+                           q.question_text, q.question_type
+                    FROM questions q
+                    JOIN subjects s ON q.subject_id = s.id
+                    ORDER BY s.name, q.id
+                """)
+                
+                return [dict(q) for q in cursor.fetchall()]
+            
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+
+    def add_attempts(self, attempts):
+        """
+        Store finished quiz attempts and their responses in one transaction.
+        
+        Attempt ids are reserved from the sequence up front so that all
+        attempts and all responses are written with one multi-row INSERT
+        each, however many attempts are in the batch. Attempts of subjects
+        deleted in the meantime are skipped and responses to deleted
+        questions are stored without a question, as if the deletes had
+        happened afterwards.
+        
+        The new spaced repetition states of review quizzes are stored in
+        the same transaction, so a review is never half recorded.
+        
+        Args:
+            attempts: List of attempt dictionaries with subject_id,
+                user_name, total_questions, correct_answers, percentage,
+                completed_at, responses, a list of (question_id, answer keys
+                or None, is_correct) tuples in quiz order, and reviews, a list
+                of (question_id, ease, interval_days, repetitions, due_at)
+                tuples (empty unless the attempt was a review quiz)
+        
+        Returns:
+            True if successful, False if the database could not be reached
+            (worth retrying), None if it rejected the attempts
+        """
+        if not attempts:
+            return True
+        
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT id FROM subjects WHERE id = ANY(%s)",
+                               ([a['subject_id'] for a in attempts],))
+                subject_ids = {row[0] for row in cursor.fetchall()}
+                attempts = [a for a in attempts if a['subject_id'] in subject_ids]
+                if not attempts:
+                    return True
+                
+                cursor.execute("SELECT id FROM questions WHERE id = ANY(%s)",
+                               (list({question_id for a in attempts
+                                      for question_id, _, _ in a['responses']}),))
+                question_ids = {row[0] for row in cursor.fetchall()}
+                
+                cursor.execute("""
+                    SELECT nextval(pg_get_serial_sequence('attempts', 'id'))
+                    FROM generate_series(1, %s)
+                """, (len(attempts),))
+                attempt_ids = [row[0] for row in cursor.fetchall()]
+                
+                execute_values(cursor, """
+                    INSERT INTO attempts (id, subject_id, user_name, total_questions,
+                                          correct_answers, percentage, completed_at)
+                    VALUES %s
+                """, [(attempt_id, a['subject_id'], a.get('user_name'), a['total_questions'],
+                       a['correct_answers'], a['percentage'], a['completed_at'])
+                      for attempt_id, a in zip(attempt_ids, attempts)], page_size=1000)
+                
+                execute_values(cursor, """
+                    INSERT INTO responses (attempt_id, position, question_id, answer, is_correct)
+                    VALUES %s
+                """, [(attempt_id, position,
+                       question_id if question_id in question_ids else None,
+                       answer, is_correct)
+                      for attempt_id, a in zip(attempt_ids, attempts)
+                      for position, (question_id, answer, is_correct)
+                      in enumerate(a['responses'], start=1)], page_size=1000)
+                
+                # One row per user and question (the latest review wins), in
+                # key order so concurrent batches lock rows in the same order
+                reviews = {}
+                for a in attempts:
+                    for question_id, ease, interval_days, repetitions, due_at in a.get('reviews', ()):
+                        if question_id in question_ids:
+                            reviews[(a['user_name'], question_id)] = (
+                                a['subject_id'], ease, interval_days, repetitions, due_at,
+                                a['completed_at'])
+                if reviews:
+                    execute_values(cursor, """
+                        INSERT INTO review_items (user_name, question_id, subject_id, ease,
+                                                  interval_days, repetitions, due_at,
+                                                  reviewed_at)
+                        VALUES %s
+                        ON CONFLICT (user_name, question_id) DO UPDATE
+                        SET subject_id = EXCLUDED.subject_id,
+                            ease = EXCLUDED.ease,
+                            interval_days = EXCLUDED.interval_days,
+                            repetitions = EXCLUDED.repetitions,
+                            due_at = EXCLUDED.due_at,
+                            reviewed_at = EXCLUDED.reviewed_at
+                    """, [key + row for key, row in sorted(reviews.items())], page_size=1000)
+            
+            return True
+            
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            print(f"Database insert error: {e}")
+            return False
+        except psycopg2.Error as e:
+            print(f"Database insert error: {e}")
+            return None
+    
+    def get_question_stats(self, question_ids):
+        """
+        Get the answer statistics of questions.
+        
+        Statistics are kept up to date by triggers on responses (see
+        update_question_stats in db/init.sql), so this reads one row per
+        question plus its option counts, however long the history is.
+        
+        Args:
+            question_ids: IDs of the questions
+        
+        Returns:
+            Dictionary mapping question id to a dictionary with attempts,
+            correct, skipped, accuracy (fraction of attempts answered
+            correctly) and selections (option key to the number of times it
+            was chosen); questions never attempted are left out
+        """
+        if not question_ids:
+            return {}
+        
+        try:
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT s.question_id, s.attempts, s.correct, s.skipped,
+                           COALESCE((SELECT json_object_agg(o.option_key, o.selections
+                                                            ORDER BY o.option_key)
+                                     FROM option_stats o
+                                     WHERE o.question_id = s.question_id
+                                       AND o.selections > 0), json_build_object()) AS selections
+                    FROM question_stats s
+                    WHERE s.question_id = ANY(%s) AND s.attempts > 0
+                """, (list(question_ids),))
+                
+                stats = {}
+                for row in cursor.fetchall():
+                    row = dict(row)
+                    row['accuracy'] = row['correct'] / row['attempts']
+                    stats[row.pop('question_id')] = row
+                return stats
+            
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return {}
+    
+    def get_questions_by_accuracy(self, subject_id=None, min_attempts=20, hardest=True, limit=50):
+        """
+        List the questions answered correctly least (or most) often.
+        
+        Questions almost nobody gets right may have a wrong answer key, and
+        questions everybody gets right may be too easy. Only the statistics
+        table is read, not the response history.
+        
+        Args:
+            subject_id: Only list questions of this subject (None for all)
+            min_attempts: Leave out questions attempted fewer times than this
+            hardest: True for the lowest accuracy first, False for the highest
+            limit: Maximum number of questions
         
+        Returns:
+            List of question dictionaries with id, subject_id, subject_name,
+            question_text, question_type, attempts, correct, skipped and
+            accuracy
+        """
+        order = "ASC" if hardest else "DESC"
         try:
-            cursor = self.conn.cursor(cursor_factory=RealDictCursor)
-            cursor.execute("""
-                SELECT q.id, q.subject_id, s.name as subject_name, 
-                       q.question_text, q.question_type
-                FROM questions q
-                JOIN subjects s ON q.subject_id = s.id
-                ORDER BY s.name, q.id
-            """)
+            with self._cursor(RealDictCursor) as cursor:
+                cursor.execute(f"""
+                    SELECT q.id, q.subject_id, s.name as subject_name,
+                           q.question_text, q.question_type,
+                           qs.attempts, qs.correct, qs.skipped,
+                           qs.correct::float / qs.attempts AS accuracy
+                    FROM question_stats qs
+                    JOIN questions q ON q.id = qs.question_id
+                    JOIN subjects s ON s.id = q.subject_id
+                    WHERE qs.attempts >= GREATEST(%(min_attempts)s, 1)
+                      AND (%(subject_id)s::integer IS NULL OR q.subject_id = %(subject_id)s)
+                    ORDER BY accuracy {order}, qs.attempts DESC, q.id
+                    LIMIT %(limit)s
+                """, {"subject_id": subject_id, "min_attempts": min_attempts, "limit": limit})
+                
+                return [dict(q) for q in cursor.fetchall()]
             
-            questions = cursor.fetchall()
-            cursor.close()
-            return [dict(q) for q in questions]
+        except psycopg2.Error as e:
+            print(f"Database query error: {e}")
+            return []
+    
+    def get_item_parameters(self, subject_id, strict=False):
+        """
+        Get the item response theory parameters of a subject's questions.
+        
+        Args:
+            subject_id: The ID of the subject
+            strict: Raise on a database error instead of returning an empty list
+        
+        Returns:
+            List of (question_id, discrimination, difficulty) tuples in id
+            order; both parameters are None for questions not calibrated yet
+        
+        Raises:
+            psycopg2.Error: If strict and the parameters cannot be read
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    SELECT q.id, p.discrimination, p.difficulty
+                    FROM questions q
+                    LEFT JOIN item_parameters p ON p.question_id = q.id
+                    WHERE q.subject_id = %s
+                    ORDER BY q.id
+                """, (subject_id,))
+                
+                return cursor.fetchall()
             
         except psycopg2.Error as e:
+            if strict:
+                raise
             print(f"Database query error: {e}")
             return []
+    
+    def iter_responses(self, subject_id=None, itersize=10000):
+        """
+        Stream the answered responses of the attempt history.
+        
+        Responses are read through a server-side (named) cursor, so only
+        itersize of them are held in memory at a time. Skipped questions and
+        responses to deleted questions are left out. The pooled connection
+        is held until the generator is exhausted or closed.
+        
+        Args:
+            subject_id: Only stream attempts of this subject (None for all)
+            itersize: Number of responses fetched per round trip
+        
+        Yields:
+            (attempt_id, question_id, is_correct) tuples in attempt order
+        
+        Raises:
+            psycopg2.Error: If the history cannot be read
+        """
+        with self.connection() as conn:
+            with conn.cursor(name='iter_responses') as cursor:
+                cursor.itersize = itersize
+                cursor.execute("""
+                    SELECT r.attempt_id, r.question_id, r.is_correct
+                    FROM responses r
+                    JOIN attempts a ON a.id = r.attempt_id
+                    WHERE r.question_id IS NOT NULL AND r.answer IS NOT NULL
+                      AND (%(subject_id)s::integer IS NULL OR a.subject_id = %(subject_id)s)
+                    ORDER BY r.attempt_id, r.position
+                """, {"subject_id": subject_id})
+                yield from cursor
+    
+    def save_item_parameters(self, parameters):
+        """
+        Store calibrated item response theory parameters.
+        
+        Args:
+            parameters: List of (question_id, discrimination, difficulty,
+                responses) tuples; existing parameters of these questions
+                are replaced and questions deleted in the meantime skipped
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not parameters:
+            return True
+        
+        try:
+            with self._cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO item_parameters (question_id, discrimination, difficulty,
+                                                 responses, calibrated_at)
+                    SELECT v.question_id, v.discrimination, v.difficulty, v.responses, now()
+                    FROM (VALUES %s) AS v (question_id, discrimination, difficulty, responses)
+                    JOIN questions q ON q.id = v.question_id
+                    ON CONFLICT (question_id) DO UPDATE
+                    SET discrimination = EXCLUDED.discrimination,
+                        difficulty = EXCLUDED.difficulty,
+                        responses = EXCLUDED.responses,
+                        calibrated_at = EXCLUDED.calibrated_at
+                """, sorted(parameters), page_size=1000)
+            
+            return True
+            
+        except psycopg2.Error as e:
+            print(f"Database insert error: {e}")
+            return False
+    
+    def save_served_sessions(self, states):
+        """
+        Store quiz service sessions moved out of memory.
+        
+        Args:
+            states: Dictionary mapping session id to the packed session;
+                older copies of these sessions are replaced
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        if not states:
+            return True
+        
+        try:
+            with self._cursor() as cursor:
+                execute_values(cursor, """
+                    INSERT INTO served_sessions (session_id, state, spilled_at)
+                    VALUES %s
+                    ON CONFLICT (session_id) DO UPDATE
+                    SET state = EXCLUDED.state,
+                        spilled_at = EXCLUDED.spilled_at
+                """, sorted(states.items()), template="(%s, %s, now())", page_size=1000)
+            
+            return True
+            
+        except psycopg2.Error as e:
+            print(f"Database insert error: {e}")
+            return False
+    
+    def take_served_session(self, session_id, strict=False):
+        """
+        Remove a stored quiz service session and return it.
+        
+        Args:
+            session_id: ID of the session
+            strict: Raise on a database error instead of returning None
+        
+        Returns:
+            The packed session, or None if it is not stored
+        
+        Raises:
+            psycopg2.Error: If strict and the session cannot be read
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM served_sessions
+                    WHERE session_id = %s
+                    RETURNING state
+                """, (session_id,))
+                
+                row = cursor.fetchone()
+                return row[0] if row else None
+            
+        except psycopg2.Error as e:
+            if strict:
+                raise
+            print(f"Database query error: {e}")
+            return None
+    
+    def expire_served_sessions(self, max_age):
+        """
+        Delete quiz service sessions stored longer than max_age seconds ago.
+        
+        Returns:
+            Number of sessions deleted
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM served_sessions
+                    WHERE spilled_at < now() - %s * interval '1 second'
+                """, (max_age,))
+                
+                return cursor.rowcount
+            
+        except psycopg2.Error as e:
+            print(f"Database update error: {e}")
+            return 0
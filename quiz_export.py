@@ -0,0 +1,104 @@
+"""
+Streaming export of the Quiz App question bank
+
+Writes every subject and question to JSON Lines, optionally gzip-compressed
+(when the output ends in .gz). Questions are streamed from a server-side
+cursor, so memory use stays constant regardless of the bank size. The output
+can be loaded into another database with quiz_import.py.
+
+Each subject is written as {"subject": ..., "description": ...} before any
+question, and each question as a quiz_import record with its id:
+    {"id": 17, "subject": "Security+", "question": "...", "type": "multiple_choice",
+     "options": {"A": "...", "B": "..."}, "correct_answer": ["A"]}
+
+The ids let quiz_grade.py use an export as an answer key snapshot; imports
+ignore them and assign new ids.
+
+Usage:
+    python quiz_export.py bank.jsonl.gz [--itersize 2000]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+
+import psycopg2
+
+from quiz_db import QuizDatabase
+
+
+def export_bank(db, stream, itersize=2000):
+    """
+    Write the whole question bank to a text stream as JSON Lines.
+    
+    Args:
+        db: QuizDatabase instance
+        stream: Writable text stream
+        itersize: Number of questions fetched per round trip
+    
+    Returns:
+        Dictionary with subjects, questions, seconds and rows_per_second
+    """
+    stats = {"subjects": 0, "questions": 0}
+    start = time.perf_counter()
+    
+    for kind, row in db.iter_bank(itersize=itersize):
+        if kind == 'subject':
+            record = {"subject": row['name'], "description": row['description'] or ""}
+            stats["subjects"] += 1
+        else:
+            record = {
+                "id": row['id'],
+                "subject": row['subject_name'],
+                "question": row['question_text'],
+                "type": row['question_type'],
+                "options": row['options'],
+                "correct_answer": row['correct_answers']
+            }
+            stats["questions"] += 1
+        stream.write(json.dumps(record, ensure_ascii=False))
+        stream.write("\n")
+    
+    stats["seconds"] = time.perf_counter() - start
+    rows = stats["subjects"] + stats["questions"]
+    stats["rows_per_second"] = rows / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def open_output(path):
+    """Open the export destination, compressing when the name ends in .gz."""
+    if path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the question bank as JSON Lines.")
+    parser.add_argument("path", help="output file, .gz to compress ('-' for stdout)")
+    parser.add_argument("--itersize", type=int, default=2000,
+                        help="questions fetched per round trip")
+    args = parser.parse_args()
+    
+    db = QuizDatabase()
+    stream = open_output(args.path)
+    try:
+        stats = export_bank(db, stream, itersize=args.itersize)
+    except psycopg2.Error as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        db.close()
+    
+    print(f"Exported {stats['subjects']} subjects and {stats['questions']} questions "
+          f"in {stats['seconds']:.2f}s, {stats['rows_per_second']:,.0f} records/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
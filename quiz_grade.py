@@ -0,0 +1,374 @@
+"""
+Parallel offline grading of Quiz App answer sheets
+
+Answer sheets are streamed from a JSON Lines file (optionally .gz), one sheet
+per line, and graded in chunks on a pool of worker processes. Each worker
+loads the answer keys of a subject the first time it grades that subject,
+either from the database or from a quiz_export.py snapshot, and grades every
+sheet with QuizEngine. At most a few chunks are in flight at a time, so
+memory use stays flat regardless of the number of sheets.
+
+Sheet format (question ids map to the selected keys, null if unanswered):
+    {"sheet_id": "a-001", "subject": "Security+", "answers": {"17": ["A"], "42": null}}
+
+One result per sheet is written to the output in input order:
+    {"sheet_id": "a-001", "subject": "Security+", "total_questions": 2,
+     "correct_answers": 1, "percentage": 50.0, "performance_rating": "...",
+     "questions": [{"question_id": 17, "answer": ["A"], "correct": true}, ...]}
+Sheets that cannot be graded produce {"sheet_id": ..., "error": "..."}.
+
+Aggregates (per subject and per question) are printed to stderr and can be
+written as JSON with --summary.
+
+Usage:
+    python quiz_grade.py sheets.jsonl.gz results.jsonl.gz [--workers 4]
+                         [--chunk-size 500] [--snapshot bank.jsonl.gz]
+                         [--summary summary.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import psycopg2
+
+from domain import Question, QuizEngine, QuizSession, Subject
+from quiz_db import QuizDatabase
+from quiz_export import open_output
+from quiz_import import InvalidRecord, iter_jsonl, open_input
+
+
+class AnswerKeyStore:
+    """
+    Answer keys of the subjects graded by one process, loaded on first use.
+    
+    Keys come from the database, or from a quiz_export.py snapshot when one
+    is given, and are kept for the life of the process.
+    """
+    
+    def __init__(self, snapshot=None):
+        """
+        Initialize an empty store.
+        
+        Args:
+            snapshot: Path of a quiz_export.py file to read keys from
+                instead of the database
+        """
+        self.snapshot = snapshot
+        self.db = None
+        self.subject_ids = None
+        self._subjects = {}
+    
+    def get(self, subject_name):
+        """
+        Get the answer keys of a subject.
+        
+        Args:
+            subject_name: Name of the subject
+        
+        Returns:
+            Tuple of (Subject, dictionary mapping question id to Question),
+            or None if the subject does not exist
+        """
+        if subject_name not in self._subjects:
+            if self.snapshot:
+                self._subjects[subject_name] = self._load_from_snapshot(subject_name)
+            else:
+                self._subjects[subject_name] = self._load_from_database(subject_name)
+        return self._subjects[subject_name]
+    
+    def _load_from_database(self, subject_name):
+        """
+        Read one subject's questions from the database.
+        
+        Raises:
+            psycopg2.Error: If the database cannot be read; nothing is cached,
+                so a failed read is never taken for an unknown subject
+        """
+        if self.db is None:
+            self.db = QuizDatabase(min_connections=1, max_connections=1)
+        if self.subject_ids is None:
+            self.subject_ids = {s['name']: s['id']
+                                for s in self.db.get_all_subjects(strict=True)}
+        
+        subject_id = self.subject_ids.get(subject_name)
+        if subject_id is None:
+            return None
+        
+        question_ids = self.db.get_question_ids_by_subject(subject_id, strict=True)
+        questions = {row['id']: Question.from_db_dict(row)
+                     for row in self.db.get_questions_by_ids(question_ids, strict=True)}
+        return Subject(name=subject_name, id=subject_id), questions
+    
+    def _load_from_snapshot(self, subject_name):
+        """Read one subject's questions from the snapshot file."""
+        found = False
+        questions = {}
+        with open_input(self.snapshot) as stream:
+            for record in iter_jsonl(stream):
+                if isinstance(record, InvalidRecord):
+                    raise ValueError(f"snapshot {self.snapshot}: {record.reason}")
+                if record.get("subject") != subject_name:
+                    continue
+                found = True
+                if "question" not in record:
+                    continue
+                if "id" not in record:
+                    raise ValueError(f"snapshot {self.snapshot} has no question ids; "
+                                     f"export it again with quiz_export.py")
+                questions[record["id"]] = Question(
+                    id=record["id"],
+                    subject_name=subject_name,
+                    question_text=record["question"],
+                    question_type=record["type"],
+                    options=record["options"],
+                    correct_answers=record["correct_answer"]
+                )
+        if not found:
+            return None
+        return Subject(name=subject_name), questions
+
+
+# Answer keys of the current worker process, set by _init_worker
+_answer_keys = None
+
+
+def _init_worker(snapshot):
+    """Create the answer key store of a worker process."""
+    global _answer_keys
+    _answer_keys = AnswerKeyStore(snapshot)
+
+
+def grade_sheet(sheet, answer_keys):
+    """
+    Grade one answer sheet.
+    
+    Args:
+        sheet: Sheet dictionary with sheet_id, subject and answers
+        answer_keys: AnswerKeyStore to read the subject's keys from
+    
+    Returns:
+        Tuple of (QuizResult, question ids in answer order)
+    
+    Raises:
+        ValueError: If the sheet is malformed or refers to unknown questions or option keys
+        psycopg2.Error: If the answer keys cannot be read from the database
+    """
+    if not isinstance(sheet, dict) or not isinstance(sheet.get("answers"), dict):
+        raise ValueError("sheet has no answers object")
+    if not isinstance(sheet.get("subject"), str):
+        raise ValueError("subject must be a string")
+    
+    keys = answer_keys.get(sheet["subject"])
+    if keys is None:
+        raise ValueError(f"unknown subject {sheet.get('subject')!r}")
+    subject, questions_by_id = keys
+    
+    try:
+        question_ids = [int(qid) for qid in sheet["answers"]]
+    except ValueError:
+        raise ValueError("question ids must be integers")
+    unknown = [qid for qid in question_ids if qid not in questions_by_id]
+    if unknown:
+        raise ValueError(f"unknown question ids {unknown[:5]}")
+    if any(answer is not None and (not isinstance(answer, list)
+                                   or not all(isinstance(key, str) for key in answer))
+           for answer in sheet["answers"].values()):
+        raise ValueError("answers must be lists of keys or null")
+    
+    engine = QuizEngine(None)
+    engine.session = QuizSession(
+        subject=subject,
+        questions=[questions_by_id[qid] for qid in question_ids],
+        user_answers=list(sheet["answers"].values())
+    )
+    return engine.calculate_results(), question_ids
+
+
+def _empty_stats():
+    return {"sheets": 0, "errors": 0, "subjects": {}, "questions": {}}
+
+
+def grade_chunk(lines):
+    """
+    Grade a chunk of sheet lines in a worker process.
+    
+    Args:
+        lines: JSON lines, one sheet each
+    
+    Returns:
+        Tuple of (result lines, aggregate statistics of the chunk)
+    
+    Raises:
+        psycopg2.Error: If the answer keys cannot be read from the database
+    """
+    output = []
+    stats = _empty_stats()
+    for line in lines:
+        sheet_id = None
+        try:
+            sheet = json.loads(line)
+            if isinstance(sheet, dict):
+                sheet_id = sheet.get("sheet_id")
+            result, question_ids = grade_sheet(sheet, _answer_keys)
+        except ValueError as e:
+            stats["errors"] += 1
+            output.append(json.dumps({"sheet_id": sheet_id, "error": str(e)}))
+            continue
+        
+        stats["sheets"] += 1
+        subject = stats["subjects"].setdefault(result.subject.name, [0, 0.0])
+        subject[0] += 1
+        subject[1] += result.percentage
+        for qid, (_, _, is_correct) in zip(question_ids, result.question_results):
+            counts = stats["questions"].setdefault(qid, [0, 0])
+            counts[0] += 1
+            counts[1] += is_correct
+        
+        output.append(json.dumps({
+            "sheet_id": sheet_id,
+            "subject": result.subject.name,
+            "total_questions": result.total_questions,
+            "correct_answers": result.correct_answers,
+            "percentage": result.percentage,
+            "performance_rating": result.performance_rating,
+            "questions": [{"question_id": qid, "answer": answer, "correct": is_correct}
+                          for qid, (_, answer, is_correct)
+                          in zip(question_ids, result.question_results)]
+        }, ensure_ascii=False))
+    return output, stats
+
+
+def _merge_stats(total, chunk):
+    """Add the statistics of one chunk to the running totals."""
+    total["sheets"] += chunk["sheets"]
+    total["errors"] += chunk["errors"]
+    for name, (sheets, percentage_sum) in chunk["subjects"].items():
+        subject = total["subjects"].setdefault(name, [0, 0.0])
+        subject[0] += sheets
+        subject[1] += percentage_sum
+    for qid, (attempts, correct) in chunk["questions"].items():
+        counts = total["questions"].setdefault(qid, [0, 0])
+        counts[0] += attempts
+        counts[1] += correct
+
+
+def _iter_chunks(stream, chunk_size):
+    """Yield lists of up to chunk_size non-empty lines."""
+    lines = (line for line in stream if line.strip())
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def grade_sheets(stream, out, workers=None, chunk_size=500, snapshot=None):
+    """
+    Grade every sheet of a stream on a process pool.
+    
+    Args:
+        stream: Readable text stream of JSON Lines sheets
+        out: Writable text stream for the per-sheet results
+        workers: Number of worker processes (default: CPU count)
+        chunk_size: Number of sheets sent to a worker at a time
+        snapshot: quiz_export.py file to read answer keys from instead of
+            the database
+    
+    Returns:
+        Dictionary with sheets, errors, seconds, sheets_per_second, subjects
+        (sheets and mean_percentage per subject) and questions (attempts,
+        correct and success_rate per question id)
+    
+    Raises:
+        psycopg2.Error: If the answer keys cannot be read from the database
+    """
+    workers = workers or os.cpu_count() or 1
+    totals = _empty_stats()
+    start = time.perf_counter()
+    
+    def write(future):
+        lines, stats = future.result()
+        for line in lines:
+            out.write(line)
+            out.write("\n")
+        _merge_stats(totals, stats)
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(snapshot,)) as pool:
+        # Keep a bounded window of chunks in flight, written in input order
+        pending = deque()
+        for chunk in _iter_chunks(stream, chunk_size):
+            pending.append(pool.submit(grade_chunk, chunk))
+            if len(pending) >= workers * 2:
+                write(pending.popleft())
+        while pending:
+            write(pending.popleft())
+    
+    seconds = time.perf_counter() - start
+    return {
+        "sheets": totals["sheets"],
+        "errors": totals["errors"],
+        "seconds": seconds,
+        "sheets_per_second": totals["sheets"] / seconds if seconds else 0.0,
+        "subjects": {name: {"sheets": sheets, "mean_percentage": percentage_sum / sheets}
+                     for name, (sheets, percentage_sum) in sorted(totals["subjects"].items())},
+        "questions": {qid: {"attempts": attempts, "correct": correct,
+                            "success_rate": correct / attempts}
+                      for qid, (attempts, correct) in sorted(totals["questions"].items())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grade answer sheets in parallel.")
+    parser.add_argument("sheets", help="JSONL answer sheets, optionally .gz ('-' for stdin)")
+    parser.add_argument("results", help="output file, .gz to compress ('-' for stdout)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500,
+                        help="sheets sent to a worker at a time")
+    parser.add_argument("--snapshot", help="quiz_export.py file to read answer keys from "
+                                           "instead of the database")
+    parser.add_argument("--summary", help="write the aggregates to this JSON file")
+    args = parser.parse_args()
+    
+    if not args.snapshot:
+        # Fail fast instead of reporting every sheet's subject as unknown
+        db = QuizDatabase(min_connections=1, max_connections=1)
+        if not db.connect():
+            sys.exit(1)
+        db.close()
+    
+    stream = open_input(args.sheets)
+    out = open_output(args.results)
+    try:
+        stats = grade_sheets(stream, out, workers=args.workers,
+                             chunk_size=args.chunk_size, snapshot=args.snapshot)
+    except psycopg2.Error as e:
+        # Every later sheet would fail the same way
+        print(f"Grading failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if out is not sys.stdout:
+            out.close()
+    
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as summary:
+            json.dump(stats, summary, indent=2, ensure_ascii=False)
+    
+    print(f"Graded {stats['sheets']} sheets ({stats['errors']} errors) "
+          f"in {stats['seconds']:.2f}s, {stats['sheets_per_second']:,.0f} sheets/s",
+          file=sys.stderr)
+    for name, subject in stats["subjects"].items():
+        print(f"  {name}: {subject['sheets']} sheets, "
+              f"mean {subject['mean_percentage']:.1f}%", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
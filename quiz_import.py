@@ -0,0 +1,446 @@
+"""
+Bulk import of question banks into the Quiz App database
+
+Records are streamed from JSON, JSONL or CSV files, validated, and loaded in
+batches: each batch is COPY'd into temporary staging tables and merged into
+subjects, questions, options and correct_answers with set-based statements.
+
+Record format (JSON/JSONL), matching QuizDatabase.get_questions_by_subject:
+    {"subject": "Security+", "question": "...", "type": "multiple_choice",
+     "options": {"A": "...", "B": "..."}, "correct_answer": ["A"]}
+
+Records without a question define a subject and its description, as written
+by quiz_export.py:
+    {"subject": "Security+", "description": "..."}
+
+Files ending in .gz are decompressed while reading.
+
+CSV files use the columns subject, question, type, correct_answer (keys
+separated by ';') and one option_<KEY> column per option, e.g. option_A.
+
+Usage:
+    python quiz_import.py bank.jsonl [--format jsonl] [--subject NAME]
+                          [--batch-size 5000]
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+
+import psycopg2
+
+from quiz_db import QuizDatabase
+
+QUESTION_TYPES = ('multiple_choice', 'multi_select')
+# Column limits from db/init.sql
+MAX_SUBJECT_NAME_LENGTH = 100
+MAX_KEY_LENGTH = 10
+
+_STAGING_TABLES_SQL = """
+    CREATE TEMP TABLE staging_subjects (
+        name TEXT PRIMARY KEY,
+        description TEXT NOT NULL
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE staging_questions (
+        seq INTEGER PRIMARY KEY,
+        subject_name TEXT NOT NULL,
+        question_text TEXT NOT NULL,
+        question_type TEXT NOT NULL,
+        question_id INTEGER
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE staging_options (
+        seq INTEGER NOT NULL,
+        option_key TEXT NOT NULL,
+        option_text TEXT NOT NULL
+    ) ON COMMIT DROP;
+    CREATE TEMP TABLE staging_answers (
+        seq INTEGER NOT NULL,
+        answer_key TEXT NOT NULL
+    ) ON COMMIT DROP;
+"""
+
+# Set-based merge of one staged batch. Questions that already exist in their
+# subject with the same text (or repeat within the batch) are skipped, so
+# re-running an import is idempotent. Ids are drawn from the questions
+# sequence up front, which maps staged options and answers to new questions
+# without per-row round trips.
+_MERGE_SQL = """
+    INSERT INTO subjects (name, description)
+    SELECT name, description FROM staging_subjects
+    ON CONFLICT (name) DO UPDATE SET description = EXCLUDED.description;
+    
+    INSERT INTO subjects (name)
+    SELECT DISTINCT subject_name FROM staging_questions
+    ON CONFLICT (name) DO NOTHING;
+    
+    DELETE FROM staging_questions sq
+    USING staging_questions earlier
+    WHERE earlier.subject_name = sq.subject_name
+      AND earlier.question_text = sq.question_text
+      AND earlier.seq < sq.seq;
+    
+    DELETE FROM staging_questions sq
+    USING subjects s, questions q
+    WHERE s.name = sq.subject_name
+      AND q.subject_id = s.id
+      AND q.question_text = sq.question_text;
+    
+    UPDATE staging_questions
+    SET question_id = nextval(pg_get_serial_sequence('questions', 'id'));
+    
+    INSERT INTO questions (id, subject_id, question_text, question_type)
+    SELECT sq.question_id, s.id, sq.question_text, sq.question_type
+    FROM staging_questions sq
+    JOIN subjects s ON s.name = sq.subject_name
+    ORDER BY sq.seq;
+    
+    INSERT INTO options (question_id, option_key, option_text)
+    SELECT sq.question_id, so.option_key, so.option_text
+    FROM staging_options so
+    JOIN staging_questions sq USING (seq);
+    
+    INSERT INTO correct_answers (question_id, answer_key)
+    SELECT sq.question_id, sa.answer_key
+    FROM staging_answers sa
+    JOIN staging_questions sq USING (seq);
+    
+    SELECT
+        (SELECT COUNT(*) FROM staging_subjects),
+        (SELECT COUNT(*) FROM staging_questions),
+        (SELECT COUNT(*) FROM staging_options so JOIN staging_questions sq USING (seq)),
+        (SELECT COUNT(*) FROM staging_answers sa JOIN staging_questions sq USING (seq));
+"""
+
+
+def iter_json_array(stream, chunk_size=65536):
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+    
+    while True:
+        buffer = buffer.lstrip(" \t\r\n,")
+        if not started and buffer:
+            if buffer[0] != "[":
+                raise ValueError("Expected a JSON array of question records")
+            buffer = buffer[1:].lstrip(" \t\r\n")
+            started = True
+        if started and buffer.startswith("]"):
+            return
+        
+        if buffer:
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except ValueError:
+                if eof:
+                    raise
+            else:
+                yield record
+                buffer = buffer[end:]
+                continue
+        
+        if eof:
+            if started or buffer:
+                raise ValueError("Unexpected end of JSON array")
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+class InvalidRecord:
+    """Placeholder a reader yields for input that is not a record, so it is skipped."""
+    
+    __slots__ = ("reason",)
+    
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def iter_jsonl(stream):
+    """Yield one record per non-empty line of a JSON Lines file."""
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = InvalidRecord(f"line {line_number} is not valid JSON ({e})")
+        yield record
+
+
+def iter_csv(stream):
+    """Yield records from a CSV file with option_<KEY> columns."""
+    for row in csv.DictReader(stream):
+        options = {column[len("option_"):]: text
+                   for column, text in row.items()
+                   if column and column.startswith("option_") and text}
+        answers = (row.get("correct_answer") or "").replace(",", ";")
+        yield {
+            "subject": row.get("subject"),
+            "question": row.get("question"),
+            "type": row.get("type"),
+            "options": options,
+            "correct_answer": [key.strip() for key in answers.split(";") if key.strip()]
+        }
+
+
+READERS = {
+    "json": iter_json_array,
+    "jsonl": iter_jsonl,
+    "csv": iter_csv
+}
+
+
+def _text_field(record, field, default=None):
+    """Get a text field of a record, stripped ("" if missing or empty)."""
+    value = record.get(field)
+    if value is None or value == "":
+        value = default or ""
+    if not isinstance(value, str):
+        raise ValueError(f"{field} must be a string")
+    return value.strip()
+
+
+def validate_subject_record(record):
+    """
+    Validate a subject definition record.
+    
+    Returns:
+        Tuple of (name, description)
+    
+    Raises:
+        ValueError: If the record would violate a constraint
+    """
+    name = _text_field(record, "subject")
+    if not name:
+        raise ValueError("missing subject")
+    if len(name) > MAX_SUBJECT_NAME_LENGTH:
+        raise ValueError(f"subject name longer than {MAX_SUBJECT_NAME_LENGTH} characters")
+    description = record.get("description")
+    if description is None:
+        description = ""
+    if not isinstance(description, str):
+        raise ValueError("description must be a string")
+    return name, description
+
+
+def validate_record(record, default_subject=None):
+    """
+    Validate a question record against the schema constraints.
+    
+    Args:
+        record: Question record dictionary
+        default_subject: Subject used when the record has none
+    
+    Returns:
+        Tuple of (subject, question_text, question_type, options, correct_answers)
+    
+    Raises:
+        ValueError: If the record would violate a constraint
+    """
+    if not isinstance(record, dict):
+        raise ValueError("record is not an object")
+    
+    subject = _text_field(record, "subject", default_subject)
+    if not subject:
+        raise ValueError("missing subject")
+    if len(subject) > MAX_SUBJECT_NAME_LENGTH:
+        raise ValueError(f"subject name longer than {MAX_SUBJECT_NAME_LENGTH} characters")
+    
+    question_text = _text_field(record, "question")
+    if not question_text:
+        raise ValueError("missing question text")
+    
+    question_type = record.get("type")
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f"invalid question type {question_type!r}")
+    
+    options = record.get("options")
+    if not isinstance(options, dict) or len(options) < 2:
+        raise ValueError("at least 2 options are required")
+    for key, text in options.items():
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"invalid option key {key!r}")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"option {key} has no text")
+    
+    correct_answers = record.get("correct_answer", record.get("correct_answers"))
+    if isinstance(correct_answers, str):
+        correct_answers = [correct_answers]
+    if not isinstance(correct_answers, list) or not all(
+            isinstance(key, str) for key in correct_answers):
+        raise ValueError("correct answer must be an option key or a list of them")
+    correct_answers = sorted(set(correct_answers))
+    if not correct_answers:
+        raise ValueError("at least 1 correct answer is required")
+    unknown = set(correct_answers) - set(options)
+    if unknown:
+        raise ValueError(f"correct answer(s) {sorted(unknown)} are not options")
+    if question_type == 'multiple_choice' and len(correct_answers) > 1:
+        raise ValueError("multiple_choice questions have exactly 1 correct answer")
+    
+    return subject, question_text, question_type, options, correct_answers
+
+
+def _copy_rows(cursor, table, rows):
+    """COPY rows (tuples of text) into a staging table."""
+    buffer = io.StringIO()
+    # Quoted fields are never NULL, whatever their text (even empty or \N)
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _load_batch(conn, subjects, batch):
+    """Stage and merge one batch of validated records in one transaction.
+    
+    Returns:
+        Tuple of (subjects, questions, options, answers) written
+    """
+    questions, options, answers = [], [], []
+    for seq, (subject, text, question_type, record_options, record_answers) in enumerate(batch):
+        questions.append((seq, subject, text, question_type))
+        options.extend((seq, key, value) for key, value in record_options.items())
+        answers.extend((seq, key) for key in record_answers)
+    
+    with conn.cursor() as cursor:
+        cursor.execute(_STAGING_TABLES_SQL)
+        # Later definitions of the same subject win
+        _copy_rows(cursor, "staging_subjects", dict(subjects).items())
+        _copy_rows(cursor, "staging_questions (seq, subject_name, question_text, question_type)",
+                   questions)
+        _copy_rows(cursor, "staging_options", options)
+        _copy_rows(cursor, "staging_answers", answers)
+        cursor.execute(_MERGE_SQL)
+        counts = cursor.fetchone()
+    conn.commit()
+    return counts
+
+
+def import_questions(db, records, batch_size=5000, default_subject=None, log=print):
+    """
+    Validate and bulk load a stream of question records.
+    
+    Args:
+        db: QuizDatabase instance
+        records: Iterable of question record dictionaries
+        batch_size: Number of records staged and merged per transaction
+        default_subject: Subject for records that do not name one
+        log: Callable receiving progress messages
+    
+    Returns:
+        Dictionary with subjects, questions, options, answers, rows,
+        invalid, duplicates, seconds and rows_per_second
+    """
+    stats = {"subjects": 0, "questions": 0, "options": 0, "answers": 0,
+             "invalid": 0, "duplicates": 0}
+    start = time.perf_counter()
+    
+    with db.connection() as conn:
+        subjects, batch = [], []
+        for number, record in enumerate(records, start=1):
+            try:
+                if isinstance(record, InvalidRecord):
+                    raise ValueError(record.reason)
+                if isinstance(record, dict) and "question" not in record:
+                    subjects.append(validate_subject_record(record))
+                else:
+                    batch.append(validate_record(record, default_subject))
+            except ValueError as e:
+                stats["invalid"] += 1
+                log(f"Record {number}: skipped, {e}")
+                continue
+            
+            if len(batch) >= batch_size:
+                _merge_counts(stats, batch, _load_batch(conn, subjects, batch))
+                subjects, batch = [], []
+                _log_progress(log, stats, start)
+        
+        if batch or subjects:
+            _merge_counts(stats, batch, _load_batch(conn, subjects, batch))
+    
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows"] = (stats["subjects"] + stats["questions"]
+                     + stats["options"] + stats["answers"])
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def _merge_counts(stats, batch, counts):
+    """Add the counts of one loaded batch to the running totals."""
+    subjects, questions, options, answers = counts
+    stats["subjects"] += subjects
+    stats["questions"] += questions
+    stats["options"] += options
+    stats["answers"] += answers
+    stats["duplicates"] += len(batch) - questions
+
+
+def _log_progress(log, stats, start):
+    """Report questions loaded so far and the current rate."""
+    elapsed = time.perf_counter() - start
+    rows = stats["questions"] + stats["options"] + stats["answers"]
+    log(f"{stats['questions']} questions loaded, {rows / elapsed:,.0f} rows/s")
+
+
+def detect_format(path):
+    """Guess the input format from the file extension."""
+    if path.lower().endswith(".gz"):
+        path = path[:-len(".gz")]
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "ndjson":
+        return "jsonl"
+    return extension if extension in READERS else None
+
+
+def open_input(path):
+    """Open an import source, decompressing when the name ends in .gz."""
+    if path == "-":
+        return sys.stdin
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return open(path, newline="", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import a question bank.")
+    parser.add_argument("path", help="JSON, JSONL or CSV file, optionally .gz ('-' for stdin)")
+    parser.add_argument("--format", choices=sorted(READERS),
+                        help="input format (default: from the file extension)")
+    parser.add_argument("--subject", help="subject for records without one")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    
+    input_format = args.format or detect_format(args.path)
+    if input_format is None:
+        parser.error("cannot detect the input format, use --format")
+    
+    db = QuizDatabase()
+    stream = open_input(args.path)
+    try:
+        stats = import_questions(db, READERS[input_format](stream),
+                                 batch_size=args.batch_size,
+                                 default_subject=args.subject)
+    except (psycopg2.Error, ValueError) as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        db.close()
+    
+    print(f"Imported {stats['subjects']} subjects and {stats['questions']} questions "
+          f"({stats['rows']} rows) in {stats['seconds']:.2f}s, "
+          f"{stats['rows_per_second']:,.0f} rows/s; "
+          f"skipped {stats['invalid']} invalid and {stats['duplicates']} duplicate records")
+
+
+if __name__ == "__main__":
+    main()
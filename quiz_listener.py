@@ -0,0 +1,121 @@
+"""
+Change notifications for the Quiz App - PostgreSQL LISTEN/NOTIFY
+"""
+
+import json
+import select
+import socket
+import threading
+
+import psycopg2
+import psycopg2.extensions
+
+
+class ChangeListener:
+    """
+    Receive question bank change notifications on a background thread.
+    
+    A dedicated autocommit connection LISTENs on CHANNEL and the thread blocks
+    in select() until PostgreSQL delivers a notification, so nothing is
+    polled. Each notification payload (see notify_quiz_change in
+    db/init.sql) is decoded and passed to on_change.
+    
+    Notifications sent while the connection is down are lost, so on_connect
+    is called after every (re)connect to let the consumer drop state that
+    may have gone stale.
+    """
+    
+    CHANNEL = "quiz_changes"
+    # Seconds to wait before reconnecting; doubled up to RECONNECT_MAX_DELAY
+    RECONNECT_DELAY = 1
+    RECONNECT_MAX_DELAY = 30
+    
+    def __init__(self, connection_params, on_change, on_connect=None):
+        """
+        Initialize the listener.
+        
+        Args:
+            connection_params: psycopg2 connection keyword arguments
+            on_change: Called with the decoded payload dict of each change
+            on_connect: Optional callable invoked after each (re)connect
+        """
+        self.connection_params = connection_params
+        self.on_change = on_change
+        self.on_connect = on_connect
+        self._thread = None
+        self._stopping = threading.Event()
+        self._wake_reader, self._wake_writer = socket.socketpair()
+    
+    def start(self):
+        """Start listening on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="quiz-change-listener",
+                                        daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout=5):
+        """Stop listening and wait for the thread to exit."""
+        self._stopping.set()
+        self._wake_writer.send(b"\0")
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self._drain_wakeups()
+    
+    def _run(self):
+        """Listen until stopped, reconnecting with backoff on errors."""
+        delay = self.RECONNECT_DELAY
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+                delay = self.RECONNECT_DELAY
+            except psycopg2.Error as e:
+                print(f"Change listener error: {e}")
+                # Sleep on the wake-up socket so stop() is not delayed
+                select.select([self._wake_reader], [], [], delay)
+                delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+    
+    def _listen(self):
+        """Hold one LISTEN connection and dispatch notifications until stopped."""
+        conn = psycopg2.connect(**self.connection_params)
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.CHANNEL}")
+            if self.on_connect:
+                self.on_connect()
+            
+            while not self._stopping.is_set():
+                readable, _, _ = select.select([conn, self._wake_reader], [], [])
+                if conn not in readable:
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._dispatch(conn.notifies.pop(0))
+        finally:
+            conn.close()
+    
+    def _dispatch(self, notify):
+        """Decode a notification payload and hand it to on_change."""
+        try:
+            change = json.loads(notify.payload)
+        except ValueError:
+            print(f"Ignoring malformed change notification: {notify.payload!r}")
+            return
+        try:
+            self.on_change(change)
+        except Exception as e:
+            print(f"Change handler error: {e}")
+    
+    def _drain_wakeups(self):
+        """Discard pending wake-up bytes so a restarted listener blocks again."""
+        self._wake_reader.setblocking(False)
+        try:
+            while self._wake_reader.recv(64):
+                pass
+        except BlockingIOError:
+            pass
+        finally:
+            self._wake_reader.setblocking(True)
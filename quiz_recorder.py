@@ -0,0 +1,209 @@
+"""
+Attempt history for the Quiz App - batched write-behind recording
+"""
+
+import queue
+import threading
+import time
+from datetime import datetime
+
+# Queued by close() to wake the writer thread
+_STOP = object()
+
+
+class AttemptRecorder:
+    """
+    Store finished quizzes in the database on a background thread.
+    
+    record() turns a QuizResult into plain rows and queues it without
+    touching the database, so submitting a quiz never waits on it. A writer
+    thread takes everything queued so far (up to BATCH_SIZE attempts) and
+    stores it in one transaction with multi-row inserts; attempts submitted
+    while a batch is being written go into the next one.
+    
+    A batch that fails to write because the database is unreachable is kept
+    and retried with backoff, so attempts submitted meanwhile are stored
+    once it is back. A batch the database rejects is written again one
+    attempt at a time, and the attempts it still rejects are reported and
+    dropped, so one bad attempt never holds back the others. flush() waits
+    until everything recorded so far is written and close() writes
+    everything still queued before it returns.
+    """
+    
+    # Maximum number of attempts written per transaction
+    BATCH_SIZE = 100
+    # Seconds to wait before retrying a failed batch; doubled up to RETRY_MAX_DELAY
+    RETRY_DELAY = 1
+    RETRY_MAX_DELAY = 30
+    # Seconds close() waits past its timeout for a write still in progress
+    CLOSE_GRACE = 5
+    
+    def __init__(self, db):
+        """
+        Initialize the recorder.
+        
+        Args:
+            db: QuizDatabase to write the attempts to
+        """
+        self.db = db
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stopping = threading.Event()
+        self._deadline = None
+        # Attempts recorded but not yet written (or given up on)
+        self._unwritten = 0
+        self._written = threading.Condition()
+    
+    def start(self):
+        """Start the writer thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="quiz-attempt-recorder",
+                                        daemon=True)
+        self._thread.start()
+    
+    def record(self, result, user_name=None, reviews=()):
+        """
+        Queue a finished quiz for writing.
+        
+        Args:
+            result: QuizResult returned by QuizEngine.calculate_results;
+                results without a subject id are not recorded
+            user_name: User who took the quiz
+            reviews: New spaced repetition states of the quiz's questions
+                (ReviewState objects from QuizEngine.get_review_updates)
+        """
+        if result is None or result.subject.id is None:
+            return
+        with self._written:
+            self._unwritten += 1
+        self._queue.put({
+            "subject_id": result.subject.id,
+            "user_name": user_name,
+            "total_questions": result.total_questions,
+            "correct_answers": result.correct_answers,
+            "percentage": result.percentage,
+            "completed_at": datetime.now(),
+            "responses": [(question.id, list(user_answer) or None, is_correct)
+                          for question, user_answer, is_correct in result.question_results],
+            "reviews": [(state.question_id, state.ease, state.interval_days,
+                         state.repetitions, state.due_at) for state in reviews]
+        })
+    
+    def flush(self, timeout=None):
+        """
+        Wait until every attempt recorded so far has been written.
+        
+        Args:
+            timeout: Maximum number of seconds to wait (None for no limit)
+        
+        Returns:
+            True if everything was written, False on timeout
+        """
+        with self._written:
+            return self._written.wait_for(lambda: self._unwritten == 0, timeout)
+    
+    def close(self, timeout=10):
+        """
+        Write all queued attempts and stop the writer thread.
+        
+        Args:
+            timeout: Seconds to keep retrying if the database is unreachable;
+                attempts still unwritten after that are reported and dropped.
+                A write still blocked (e.g. connecting) CLOSE_GRACE seconds
+                later is abandoned to the daemon writer thread.
+        """
+        if not self._thread:
+            return
+        self._deadline = time.monotonic() + timeout
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join(timeout + self.CLOSE_GRACE)
+        if self._thread.is_alive():
+            with self._written:
+                unwritten = self._unwritten
+            print(f"Gave up waiting to save {unwritten} quiz attempt(s) to the database")
+        self._thread = None
+    
+    def _run(self):
+        """Write queued attempts in batches until stopped and drained."""
+        batch = []
+        delay = self.RETRY_DELAY
+        while True:
+            self._fill(batch)
+            if not batch:
+                if self._stopping.is_set():
+                    return
+                continue
+            
+            batch = self._write(batch)
+            if not batch:
+                delay = self.RETRY_DELAY
+            elif not self._stopping.is_set():
+                # Sleep on the stop event so close() is not delayed
+                self._stopping.wait(delay)
+                delay = min(delay * 2, self.RETRY_MAX_DELAY)
+            elif time.monotonic() >= self._deadline:
+                lost = len(batch) + sum(1 for item in self._drain() if item is not _STOP)
+                print(f"Could not save {lost} quiz attempt(s) to the database")
+                self._done(lost)
+                return
+    
+    def _write(self, batch):
+        """
+        Write a batch of attempts.
+        
+        Returns:
+            List of the attempts to retry (empty unless the database could
+            not be reached)
+        """
+        result = self.db.add_attempts(batch)
+        if result:
+            self._done(len(batch))
+            return []
+        if result is False:
+            return batch
+        if len(batch) == 1:
+            self._reject(batch[0])
+            self._done(1)
+            return []
+        # Write the attempts one by one to drop only the rejected ones
+        for index, attempt in enumerate(batch):
+            result = self.db.add_attempts([attempt])
+            if result is False:
+                return batch[index:]
+            if result is None:
+                self._reject(attempt)
+            self._done(1)
+        return []
+    
+    def _reject(self, attempt):
+        """Report an attempt the database rejected."""
+        print(f"Dropped a quiz attempt the database rejected "
+              f"(subject {attempt['subject_id']}, completed at {attempt['completed_at']})")
+    
+    def _done(self, count):
+        """Count attempts as written and wake up flush()."""
+        with self._written:
+            self._unwritten -= count
+            self._written.notify_all()
+    
+    def _fill(self, batch):
+        """Move queued attempts into batch, blocking only while there is nothing to do."""
+        while len(batch) < self.BATCH_SIZE:
+            block = not batch and not self._stopping.is_set()
+            try:
+                item = self._queue.get(block=block)
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                batch.append(item)
+    
+    def _drain(self):
+        """Remove and yield everything left in the queue."""
+        while True:
+            try:
+                yield self._queue.get_nowait()
+            except queue.Empty:
+                return
@@ -0,0 +1,667 @@
+"""
+Headless HTTP/JSON quiz service for the Quiz App
+
+Serves the QuizEngine operations of the desktop app to many learners at once
+from one asyncio event loop. Every learner gets a session with its own
+QuizEngine, kept in memory under a random session id. Operations that only
+touch the session (answers, navigation, scoring) run on the event loop and
+take microseconds; those that may query the database (starting a quiz, the
+next question of an adaptive quiz) run on a thread pool with one thread per
+pooled connection, so a slow query never stalls other learners. Questions
+are served from a CachedQuizDatabase, and submitted attempts are written in
+the background by an AttemptRecorder, as in the desktop app.
+
+Sessions are held by a SessionStore (quiz_sessions.py): the most recently
+used are live, the rest are packed into a few hundred bytes each, and idle
+ones are moved to a spill directory or the served_sessions table (or
+dropped) after --session-ttl seconds. With --workers N, N processes share
+the port and each owns the sessions whose id hashes to it; a request that
+reaches another worker is forwarded to the owner over a local socket, so no
+session is ever held by two workers.
+
+Endpoints (request and response bodies are JSON):
+    GET    /subjects                   list the subjects
+    POST   /sessions                   start a quiz:
+                                       {"subject_id": 1, "mode": "random",
+                                        "user_name": "ann", "seed": 42}
+    GET    /sessions/<id>              the current question
+    PUT    /sessions/<id>/answer       answer the current question:
+                                       {"answer": ["A"]} (null to clear)
+    POST   /sessions/<id>/next         move to the next question
+    POST   /sessions/<id>/previous     move to the previous question
+    POST   /sessions/<id>/goto         move to a question: {"number": 3}
+    POST   /sessions/<id>/submit       score the quiz and record the attempt
+    DELETE /sessions/<id>              end the session
+
+Errors are answered with a 4xx/5xx status and {"error": "..."}.
+
+Usage:
+    python quiz_server.py [--host 127.0.0.1] [--port 8080] [--connections 10]
+                          [--workers 4] [--max-live 1000] [--max-sessions 100000]
+                          [--session-ttl 1800] [--spill-dir DIR | --spill-db]
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import sys
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+import psycopg2
+
+from domain import QuizEngine, QuizMode
+from quiz_cache import CachedQuizDatabase
+from quiz_recorder import AttemptRecorder
+from quiz_sessions import (DatabaseSessionSpill, DirectorySessionSpill, ServedSession,
+                           SessionStore, new_session_id, session_shard)
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024
+# Longest user name accepted (the size of attempts.user_name)
+MAX_USER_NAME = 100
+
+
+class HTTPError(Exception):
+    """Request error answered with an HTTP status and a JSON error message."""
+    
+    def __init__(self, status, message=None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+
+
+class QuizService:
+    """
+    Quiz operations of many concurrent learners, independent of HTTP.
+    
+    handle() takes a method, a path and a decoded JSON body and returns the
+    status and the JSON payload to answer with; serve() puts it behind an
+    HTTP/1.1 server. As one of several shards, the service owns the
+    sessions whose id hashes to its shard and forwards requests for the
+    others to their owners.
+    """
+    
+    def __init__(self, db, workers=None, store=None, shard=0, shards=1, peers=None):
+        """
+        Initialize the service.
+        
+        Args:
+            db: Connected QuizDatabase (or CachedQuizDatabase) to serve from
+            workers: Threads running database operations (default: one per
+                pooled connection)
+            store: SessionStore to keep the sessions in (default: a store
+                that drops idle sessions)
+            shard: Index of this service among the shards
+            shards: Number of services sharing the sessions
+            peers: PeerClient of every shard, by index (needed if shards > 1)
+        """
+        self.db = db
+        self.recorder = AttemptRecorder(db)
+        self.executor = ThreadPoolExecutor(max_workers=workers or db.max_connections,
+                                           thread_name_prefix="quiz-service")
+        self.store = store if store is not None else SessionStore(db)
+        self.shard = shard
+        self.shards = shards
+        self.peers = peers
+        # Restores in progress by session id, shared by concurrent requests
+        self._restoring = {}
+        self._routes = [
+            (re.compile(r"/subjects"), {"GET": self.list_subjects}),
+            (re.compile(r"/sessions"), {"POST": self.create_session}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)"),
+             {"GET": self.get_question, "DELETE": self.delete_session}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)/answer"), {"PUT": self.save_answer}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)/next"), {"POST": self.next_question}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)/previous"),
+             {"POST": self.previous_question}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)/goto"), {"POST": self.go_to_question}),
+            (re.compile(r"/sessions/(?P<session_id>[\w-]+)/submit"), {"POST": self.submit}),
+        ]
+    
+    def start(self):
+        """Start recording submitted attempts."""
+        self.recorder.start()
+    
+    def close(self):
+        """Finish database operations, write submitted attempts and spill the sessions."""
+        self.executor.shutdown()
+        self.recorder.close()
+        self.store.close()
+    
+    async def maintain(self):
+        """Move idle sessions out of memory periodically; runs until cancelled."""
+        while True:
+            await asyncio.sleep(self.store.maintenance_interval)
+            try:
+                await self._run_blocking(self.store.spill_idle)
+            except Exception:
+                # Keep enforcing the session limits on the next run
+                print("Error moving idle sessions out of memory:", file=sys.stderr)
+                traceback.print_exc()
+    
+    async def handle(self, method, path, body, forwarded=False):
+        """
+        Run one request.
+        
+        Args:
+            method: HTTP method
+            path: Request path without the query string
+            body: Decoded JSON body (a dictionary; empty if there was none)
+            forwarded: True for requests forwarded by another shard, which
+                are never forwarded again
+        
+        Returns:
+            Tuple of (HTTP status, JSON-serializable payload)
+        """
+        try:
+            for pattern, handlers in self._routes:
+                match = pattern.fullmatch(path)
+                if match:
+                    if method not in handlers:
+                        raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED)
+                    session_id = match.groupdict().get("session_id")
+                    if session_id and self.shards > 1 and not forwarded:
+                        owner = session_shard(session_id, self.shards)
+                        if owner != self.shard:
+                            return await self.peers[owner].request(method, path, body)
+                    return await handlers[method](body, **match.groupdict())
+            raise HTTPError(HTTPStatus.NOT_FOUND)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except psycopg2.Error as e:
+            print(f"Database error: {e}", file=sys.stderr)
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Database unavailable"}
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"Could not forward to another worker: {e!r}", file=sys.stderr)
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Worker unavailable"}
+        except Exception:
+            print(f"Error handling {method} {path}:", file=sys.stderr)
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+    
+    async def _run_blocking(self, func, *args):
+        """Run a call that may query the database on the thread pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+    
+    async def _session(self, session_id):
+        """Get a session by id, unpacking it if it is not live, or fail with 404."""
+        session = self.store.get(session_id)
+        if session is None:
+            restoring = self._restoring.get(session_id)
+            if restoring is None:
+                restoring = asyncio.ensure_future(
+                    self._run_blocking(self.store.restore, session_id))
+                self._restoring[session_id] = restoring
+                restoring.add_done_callback(lambda _: self._restoring.pop(session_id, None))
+            session = await asyncio.shield(restoring)
+        if session is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown session")
+        return session
+    
+    async def list_subjects(self, body):
+        """GET /subjects"""
+        subjects = await self._run_blocking(self.db.get_all_subjects)
+        return HTTPStatus.OK, [{"id": s["id"], "name": s["name"],
+                                "description": s["description"]} for s in subjects]
+    
+    async def create_session(self, body):
+        """POST /sessions: start a quiz and return its first question."""
+        subject_id = body.get("subject_id")
+        user_name = body.get("user_name")
+        seed = body.get("seed")
+        if not _is_integer(subject_id):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "subject_id must be an integer")
+        if user_name is not None and not isinstance(user_name, str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "user_name must be a string")
+        if user_name is not None and len(user_name) > MAX_USER_NAME:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"user_name must be at most {MAX_USER_NAME} characters")
+        if seed is not None and not _is_integer(seed):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "seed must be an integer")
+        try:
+            mode = QuizMode(body.get("mode", QuizMode.RANDOM.value))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            f"mode must be one of {', '.join(m.value for m in QuizMode)}")
+        if mode == QuizMode.REVIEW and not user_name:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Review quizzes need a user_name")
+        
+        subjects = await self._run_blocking(self.db.get_all_subjects)
+        subject_name = next((s["name"] for s in subjects if s["id"] == subject_id), None)
+        if subject_name is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown subject")
+        
+        engine = QuizEngine(self.db)
+        started = await self._run_blocking(self._start_quiz, engine, subject_id,
+                                           subject_name, mode, user_name, seed)
+        if not started:
+            if mode == QuizMode.REVIEW:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "No questions are due for review")
+            raise HTTPError(HTTPStatus.NOT_FOUND, "The subject has no questions")
+        
+        session_id = new_session_id(self.shard, self.shards)
+        self.store.add(session_id, ServedSession(engine, user_name))
+        return HTTPStatus.CREATED, question_view(session_id, engine)
+    
+    def _start_quiz(self, engine, subject_id, subject_name, mode, user_name, seed):
+        """Fetch and start a quiz; runs on the thread pool."""
+        if mode == QuizMode.REVIEW:
+            # The learner's previous review quiz may still be on its way to
+            # the database; without it its questions would be asked again
+            self.recorder.flush(5)
+        questions = engine.fetch_questions(subject_id, mode, user_name, seed=seed)
+        return engine.start_quiz(subject_id, subject_name, questions,
+                                 mode=mode, user_name=user_name)
+    
+    async def get_question(self, body, session_id):
+        """GET /sessions/<id>"""
+        session = await self._session(session_id)
+        async with session.lock:
+            return HTTPStatus.OK, question_view(session_id, session.engine)
+    
+    async def delete_session(self, body, session_id):
+        """DELETE /sessions/<id>"""
+        if not await self._run_blocking(self.store.delete, session_id):
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Unknown session")
+        return HTTPStatus.OK, {"session_id": session_id}
+    
+    async def save_answer(self, body, session_id):
+        """PUT /sessions/<id>/answer"""
+        session = await self._session(session_id)
+        async with session.lock:
+            if session.result is not None:
+                raise HTTPError(HTTPStatus.CONFLICT, "The quiz has been submitted")
+            engine = session.engine
+            answer = body.get("answer")
+            question = engine.get_current_question()
+            if answer is not None:
+                if not isinstance(answer, list) or not all(isinstance(k, str) for k in answer):
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "answer must be a list of option keys")
+                unknown = [key for key in answer if key not in question.options]
+                if unknown:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unknown option keys {unknown}")
+                if len(set(answer)) > 1 and not question.is_multi_select():
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "The question takes one answer")
+            engine.save_answer(answer or [])
+            return HTTPStatus.OK, question_view(session_id, engine)
+    
+    async def next_question(self, body, session_id):
+        """POST /sessions/<id>/next"""
+        session = await self._session(session_id)
+        async with session.lock:
+            engine = session.engine
+            if engine.mode == QuizMode.ADAPTIVE:
+                # Asking the next adaptive question fetches it
+                moved = await self._run_blocking(engine.next_question)
+            else:
+                moved = engine.next_question()
+            if not moved:
+                raise HTTPError(HTTPStatus.CONFLICT, "Already at the last question")
+            return HTTPStatus.OK, question_view(session_id, engine)
+    
+    async def previous_question(self, body, session_id):
+        """POST /sessions/<id>/previous"""
+        session = await self._session(session_id)
+        async with session.lock:
+            if not session.engine.previous_question():
+                raise HTTPError(HTTPStatus.CONFLICT, "Already at the first question")
+            return HTTPStatus.OK, question_view(session_id, session.engine)
+    
+    async def go_to_question(self, body, session_id):
+        """POST /sessions/<id>/goto"""
+        session = await self._session(session_id)
+        number = body.get("number")
+        if not _is_integer(number):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "number must be an integer")
+        async with session.lock:
+            if not session.engine.go_to_question(number - 1):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "No such question")
+            return HTTPStatus.OK, question_view(session_id, session.engine)
+    
+    async def submit(self, body, session_id):
+        """POST /sessions/<id>/submit: score the quiz; submitting again returns the same result."""
+        session = await self._session(session_id)
+        async with session.lock:
+            engine = session.engine
+            if session.result is None:
+                session.result = engine.calculate_results()
+                self.recorder.record(session.result, session.user_name,
+                                     engine.get_review_updates())
+            return HTTPStatus.OK, result_view(session_id, engine, session.result)
+
+
+def _is_integer(value):
+    """Whether a decoded JSON value is an integer (true and false are not)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def question_view(session_id, engine):
+    """JSON payload of a session's current question (without its answer key)."""
+    question = engine.get_current_question()
+    number, total = engine.get_question_number()
+    return {
+        "session_id": session_id,
+        "number": number,
+        "total": total,
+        "answered": engine.get_answered_count(),
+        "is_last": engine.is_last_question(),
+        "question": {
+            "id": question.id,
+            "text": question.question_text,
+            "type": question.question_type.value,
+            "options": question.options
+        },
+        "answer": engine.get_current_answer()
+    }
+
+
+def result_view(session_id, engine, result):
+    """JSON payload of a submitted quiz."""
+    payload = {
+        "session_id": session_id,
+        "total_questions": result.total_questions,
+        "correct_answers": result.correct_answers,
+        "percentage": result.percentage,
+        "performance_rating": result.performance_rating,
+        "questions": [{"id": question.id, "answer": answer or None, "correct": is_correct,
+                       "correct_answers": question.correct_answers}
+                      for question, answer, is_correct in result.question_results]
+    }
+    if engine.mode == QuizMode.ADAPTIVE:
+        payload["ability"] = engine.ability
+        payload["ability_error"] = engine.ability_error
+    return payload
+
+
+async def _read_request(reader):
+    """
+    Read one HTTP/1.1 request.
+    
+    Returns:
+        Tuple of (method, path, body, keep_alive), or None once the client
+        has closed the connection
+    
+    Raises:
+        HTTPError: If the request is malformed
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, version = request_line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST)
+    
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST)
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+    body = await reader.readexactly(length) if length > 0 else b""
+    
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        keep_alive = connection == "keep-alive"
+    else:
+        keep_alive = connection != "close"
+    return method, urlsplit(target).path, body, keep_alive
+
+
+def _write_response(writer, status, payload, keep_alive):
+    """Write one HTTP response with a JSON body."""
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    status = HTTPStatus(status)
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"\r\n".encode("latin-1") + body
+    )
+
+
+async def _read_response(reader):
+    """Read one HTTP response with a JSON body; returns (status, payload)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed")
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+class PeerClient:
+    """
+    Forward requests to another worker over its local socket.
+    
+    Connections are kept open and reused, so forwarding costs one local
+    round trip.
+    """
+    
+    def __init__(self, socket_path):
+        """Forward to the worker listening on the Unix socket at socket_path."""
+        self.socket_path = socket_path
+        self._idle = []
+    
+    async def request(self, method, path, body):
+        """
+        Run a request on the other worker.
+        
+        Returns:
+            Tuple of (HTTP status, decoded JSON payload)
+        
+        Raises:
+            ConnectionError: If the worker cannot be reached
+        """
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            data = json.dumps(body).encode()
+            writer.write(f"{method} {path} HTTP/1.1\r\n"
+                         f"Content-Length: {len(data)}\r\n"
+                         f"\r\n".encode("latin-1") + data)
+            await writer.drain()
+            response = await _read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+        self._idle.append((reader, writer))
+        return response
+
+
+async def handle_connection(service, reader, writer, forwarded=False):
+    """Serve the requests of one (keep-alive) client connection."""
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                try:
+                    payload = json.loads(body) if body else {}
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON")
+                if not isinstance(payload, dict):
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+            except HTTPError as e:
+                _write_response(writer, e.status, {"error": str(e)}, False)
+                await writer.drain()
+                break
+            
+            status, response = await service.handle(method, path, payload, forwarded)
+            _write_response(writer, status, response, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except asyncio.CancelledError:
+        # Shutting down with the connection still open (e.g. another worker's)
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(service, host="127.0.0.1", port=8080, reuse_port=False, peer_socket=None):
+    """
+    Serve the quiz service over HTTP until SIGINT or SIGTERM.
+    
+    Args:
+        service: QuizService to serve
+        host: Address to listen on
+        port: Port to listen on
+        reuse_port: Share the port with other worker processes
+        peer_socket: Path of a Unix socket to accept requests forwarded by
+            other workers on
+    """
+    servers = [await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port,
+        backlog=1024, reuse_port=reuse_port)]
+    if peer_socket:
+        servers.append(await asyncio.start_unix_server(
+            lambda reader, writer: handle_connection(service, reader, writer, forwarded=True),
+            peer_socket))
+    maintenance = asyncio.create_task(service.maintain())
+    
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopping.set)
+        except NotImplementedError:  # Windows: Ctrl+C raises KeyboardInterrupt
+            pass
+    
+    worker = f" (worker {service.shard + 1} of {service.shards})" if service.shards > 1 else ""
+    print(f"Serving quizzes on http://{host}:{port}{worker}", file=sys.stderr)
+    try:
+        await stopping.wait()
+    finally:
+        maintenance.cancel()
+        for server in servers:
+            server.close()
+
+
+def _peer_socket(socket_dir, shard):
+    """Path of the Unix socket a worker accepts forwarded requests on."""
+    return os.path.join(socket_dir, f"worker-{shard}.sock")
+
+
+def run_worker(args, shard=0, socket_dir=None):
+    """
+    Run one service process until SIGINT or SIGTERM.
+    
+    Args:
+        args: Parsed command line arguments
+        shard: Index of this worker
+        socket_dir: Directory of the workers' Unix sockets (None when
+            running a single worker)
+    """
+    db = CachedQuizDatabase(min_connections=min(2, args.connections),
+                            max_connections=args.connections)
+    if not db.connect():
+        sys.exit(1)
+    db.start_listening()
+    
+    if args.spill_dir:
+        spill = DirectorySessionSpill(args.spill_dir)
+    elif args.spill_db:
+        spill = DatabaseSessionSpill(db)
+    else:
+        spill = None
+    store = SessionStore(db, max_live=args.max_live, max_sessions=args.max_sessions,
+                         ttl=args.session_ttl, spill=spill)
+    peers = None
+    if socket_dir:
+        peers = [PeerClient(_peer_socket(socket_dir, i)) for i in range(args.workers)]
+    
+    service = QuizService(db, store=store, shard=shard, shards=args.workers, peers=peers)
+    service.start()
+    try:
+        asyncio.run(serve(service, args.host, args.port, reuse_port=args.workers > 1,
+                          peer_socket=_peer_socket(socket_dir, shard) if socket_dir else None))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # A second signal must not cut the final writes short
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        service.close()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve quizzes over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--connections", type=int, default=10,
+                        help="pooled database connections (and database threads) per worker")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes sharing the port (Linux)")
+    parser.add_argument("--max-live", type=int, default=1000,
+                        help="sessions per worker kept live; older ones are packed")
+    parser.add_argument("--max-sessions", type=int, default=100000,
+                        help="sessions per worker kept in memory, live or packed")
+    parser.add_argument("--session-ttl", type=float, default=1800,
+                        help="seconds a session may be idle before it leaves memory")
+    spill = parser.add_mutually_exclusive_group()
+    spill.add_argument("--spill-dir", help="move idle sessions to this directory")
+    spill.add_argument("--spill-db", action="store_true",
+                       help="move idle sessions to the served_sessions table")
+    args = parser.parse_args()
+    
+    if args.workers <= 1:
+        args.workers = 1
+        run_worker(args)
+        return
+    
+    # Workers find each other through sockets in a private directory
+    socket_dir = tempfile.mkdtemp(prefix="quiz-server-")
+    workers = [multiprocessing.Process(target=run_worker, args=(args, shard, socket_dir),
+                                       name=f"quiz-server-{shard}")
+               for shard in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    
+    def stop(signum, frame):
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+    
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for worker in workers:
+            worker.join()
+    finally:
+        shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
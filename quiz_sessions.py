@@ -0,0 +1,382 @@
+"""
+Session store for the Quiz App HTTP service - bounded, spillable and sharded
+"""
+
+import asyncio
+import json
+import os
+import re
+import secrets
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from domain import QuizEngine
+
+# Session ids are URL-safe tokens; they are also used as spill file names
+_SESSION_ID = re.compile(r"[\w-]+")
+
+
+def session_shard(session_id, shards):
+    """Worker (0 to shards - 1) that owns a session, by a stable hash of its id."""
+    return zlib.crc32(session_id.encode()) % shards
+
+
+def new_session_id(shard=0, shards=1):
+    """Generate a random session id owned by the given shard."""
+    while True:
+        session_id = secrets.token_urlsafe(16)
+        if session_shard(session_id, shards) == shard:
+            return session_id
+
+
+class ServedSession:
+    """
+    One learner's quiz in the service.
+    
+    Attributes:
+        engine: QuizEngine running the quiz
+        user_name: Learner the attempt is recorded for
+        lock: Serializes the operations on this session
+        result: QuizResult once the quiz has been submitted
+        last_used: time.monotonic() of the last request
+    """
+    
+    __slots__ = ("engine", "user_name", "lock", "result", "last_used")
+    
+    def __init__(self, engine, user_name=None):
+        self.engine = engine
+        self.user_name = user_name
+        self.lock = asyncio.Lock()
+        self.result = None
+        self.last_used = time.monotonic()
+
+
+def pack_session(session):
+    """Compact JSON form of a session (see QuizEngine.get_state)."""
+    return json.dumps({
+        "quiz": session.engine.get_state(),
+        "user_name": session.user_name,
+        "submitted": session.result is not None
+    }, separators=(",", ":"))
+
+
+def unpack_session(data, db):
+    """
+    Rebuild a session from pack_session output.
+    
+    Args:
+        data: Packed session
+        db: QuizDatabase to fetch the questions from
+    
+    Returns:
+        ServedSession, or None if none of its questions exist any more
+    
+    Raises:
+        psycopg2.Error: If the questions cannot be read
+    """
+    state = json.loads(data)
+    engine = QuizEngine(db)
+    if not engine.restore_state(state["quiz"]):
+        return None
+    session = ServedSession(engine, state["user_name"])
+    if state["submitted"]:
+        # Same answers, same result; it has been recorded already
+        session.result = engine.calculate_results()
+    return session
+
+
+class SessionStore:
+    """
+    Bounded store of served quiz sessions.
+    
+    The most recently used sessions are kept live, as ServedSession objects
+    with their QuizEngine. Beyond max_live, the least recently used are
+    packed into their compact state (question ids and answer bitmasks, a few
+    hundred bytes) and kept in memory. spill_idle() moves sessions idle for
+    longer than ttl, and the oldest packed ones beyond max_sessions, to the
+    spill store (local disk or PostgreSQL), or drops them without one. A
+    packed or spilled session is unpacked again on its next use.
+    
+    Methods are thread-safe. restore(), delete(), spill_idle() and close()
+    may do I/O and should run off the event loop.
+    """
+    
+    # Seconds a spilled session is kept before it is deleted for good
+    SPILL_TTL = 7 * 24 * 3600
+    # Seconds between purges of expired spilled sessions
+    PURGE_INTERVAL = 3600
+    
+    def __init__(self, db, max_live=1000, max_sessions=100000, ttl=1800, spill=None):
+        """
+        Initialize an empty store.
+        
+        Args:
+            db: QuizDatabase to fetch the questions of unpacked sessions from
+            max_live: Maximum number of live sessions
+            max_sessions: Maximum number of sessions in memory, live or packed
+            ttl: Seconds a session may be idle before it leaves memory
+            spill: DirectorySessionSpill or DatabaseSessionSpill to move
+                idle sessions to (None to drop them)
+        """
+        self.db = db
+        self.max_live = max_live
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.spill = spill
+        self._live = OrderedDict()
+        # Packed sessions by id: (state, last_used), least recently used first
+        self._packed = OrderedDict()
+        # Sessions collected by spill_idle that are being written
+        self._spilling = {}
+        self._lock = threading.Lock()
+        self._last_purge = time.monotonic()
+        self.spilled = 0
+        self.dropped = 0
+        self.restored = 0
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._live) + len(self._packed)
+    
+    @property
+    def maintenance_interval(self):
+        """Seconds between spill_idle() runs."""
+        return max(1, min(60, self.ttl / 4))
+    
+    def add(self, session_id, session):
+        """Store a new (or restored) session as live."""
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._live[session_id] = session
+            self._live.move_to_end(session_id)
+            self._pack_overflow()
+    
+    def get(self, session_id):
+        """
+        Get a live session and mark it used.
+        
+        Returns:
+            ServedSession, or None if the session is packed, spilled or
+            unknown (see restore)
+        """
+        with self._lock:
+            session = self._live.get(session_id)
+            if session is not None:
+                self._live.move_to_end(session_id)
+                session.last_used = time.monotonic()
+            return session
+    
+    def restore(self, session_id):
+        """
+        Unpack a packed or spilled session and make it live again.
+        
+        Returns:
+            ServedSession, or None if the session is unknown (or none of its
+            questions exist any more)
+        
+        Raises:
+            psycopg2.Error: If the database is unavailable; the session is
+                kept packed, so that it can be restored once it is back
+        """
+        with self._lock:
+            session = self._live.get(session_id)
+            if session is not None:
+                return session
+            entry = self._packed.pop(session_id, None)
+            data = entry[0] if entry else self._spilling.pop(session_id, None)
+        if data is None and self.spill and _SESSION_ID.fullmatch(session_id):
+            data = self.spill.take(session_id)
+        if data is None:
+            return None
+        
+        try:
+            session = unpack_session(data, self.db)
+        except Exception:
+            with self._lock:
+                self._packed[session_id] = (data, time.monotonic())
+            raise
+        if session is None:
+            self.dropped += 1
+            return None
+        self.add(session_id, session)
+        self.restored += 1
+        return session
+    
+    def delete(self, session_id):
+        """
+        Remove a session wherever it is.
+        
+        Returns:
+            True if the session existed
+        """
+        with self._lock:
+            found = (self._live.pop(session_id, None) is not None
+                     or self._packed.pop(session_id, None) is not None
+                     or self._spilling.pop(session_id, None) is not None)
+        # A copy may have been spilled before the session was last restored
+        if self.spill and _SESSION_ID.fullmatch(session_id):
+            found = self.spill.take(session_id) is not None or found
+        return found
+    
+    def spill_idle(self, now=None):
+        """
+        Move idle sessions and those beyond max_sessions out of memory.
+        
+        Args:
+            now: time.monotonic() to measure idleness against (default: now)
+        
+        Returns:
+            Number of sessions moved out
+        """
+        if now is None:
+            now = time.monotonic()
+        states = {}
+        with self._lock:
+            while self._live:
+                session_id, session = next(iter(self._live.items()))
+                if now - session.last_used < self.ttl or session.lock.locked():
+                    break
+                del self._live[session_id]
+                states[session_id] = pack_session(session)
+            while self._packed:
+                session_id, (data, last_used) = next(iter(self._packed.items()))
+                if (now - last_used < self.ttl
+                        and len(self._live) + len(self._packed) <= self.max_sessions):
+                    break
+                del self._packed[session_id]
+                states[session_id] = data
+            self._spilling.update(states)
+        
+        self._write_spilled(states)
+        if self.spill and now - self._last_purge >= self.PURGE_INTERVAL:
+            self._last_purge = now
+            self.spill.expire(self.SPILL_TTL)
+        return len(states)
+    
+    def close(self):
+        """Spill every session in memory, so a restarted service can continue them."""
+        with self._lock:
+            states = {session_id: pack_session(session)
+                      for session_id, session in self._live.items()}
+            states.update((session_id, data) for session_id, (data, _) in self._packed.items())
+            self._live.clear()
+            self._packed.clear()
+            self._spilling.update(states)
+        self._write_spilled(states)
+    
+    def stats(self):
+        """Return the number of sessions in each tier and what has moved between them."""
+        with self._lock:
+            return {
+                "live": len(self._live),
+                "packed": len(self._packed),
+                "spilled": self.spilled,
+                "dropped": self.dropped,
+                "restored": self.restored
+            }
+    
+    def _write_spilled(self, states):
+        """Hand sessions collected for spilling to the spill store."""
+        if not states:
+            return
+        if self.spill and self.spill.save(states):
+            self.spilled += len(states)
+        else:
+            self.dropped += len(states)
+        with self._lock:
+            for session_id, data in states.items():
+                # Unless restored (or deleted) while being written
+                if self._spilling.get(session_id) is data:
+                    del self._spilling[session_id]
+    
+    def _pack_overflow(self):
+        """Pack the least recently used live sessions beyond max_live (lock held)."""
+        busy = 0
+        while len(self._live) - busy > self.max_live:
+            session_id, session = next(iter(self._live.items()))
+            if session.lock.locked():
+                # In use by a request; skip it this time
+                self._live.move_to_end(session_id)
+                busy += 1
+                continue
+            del self._live[session_id]
+            self._packed[session_id] = (pack_session(session), session.last_used)
+
+
+class DirectorySessionSpill:
+    """Spilled sessions as one file per session in a local directory."""
+    
+    def __init__(self, path):
+        """Use (and create) the directory at path."""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+    
+    def _file(self, session_id):
+        return os.path.join(self.path, session_id + ".json")
+    
+    def save(self, states):
+        """Write packed sessions by id, replacing older copies. Returns True on success."""
+        try:
+            for session_id, data in states.items():
+                temporary = self._file(session_id) + ".tmp"
+                with open(temporary, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(temporary, self._file(session_id))
+            return True
+        except OSError as e:
+            print(f"Could not spill sessions to {self.path}: {e}")
+            return False
+    
+    def take(self, session_id):
+        """Remove a spilled session and return it (None if there is none)."""
+        try:
+            with open(self._file(session_id), encoding="utf-8") as f:
+                data = f.read()
+            os.remove(self._file(session_id))
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Could not read spilled session {session_id}: {e}")
+            return None
+    
+    def expire(self, max_age):
+        """Delete sessions spilled more than max_age seconds ago."""
+        cutoff = time.time() - max_age
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                # A file may be taken by a restore while the directory is scanned
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class DatabaseSessionSpill:
+    """Spilled sessions in the served_sessions table."""
+    
+    def __init__(self, db):
+        """Use the given QuizDatabase."""
+        self.db = db
+    
+    def save(self, states):
+        """Write packed sessions by id, replacing older copies. Returns True on success."""
+        return self.db.save_served_sessions(states)
+    
+    def take(self, session_id):
+        """
+        Remove a spilled session and return it (None if there is none).
+        
+        Raises:
+            psycopg2.Error: If the database is unavailable
+        """
+        return self.db.take_served_session(session_id, strict=True)
+    
+    def expire(self, max_age):
+        """Delete sessions spilled more than max_age seconds ago."""
+        self.db.expire_served_sessions(max_age)
@@ -0,0 +1,298 @@
+"""
+Offline snapshot of the Quiz App question bank - local SQLite copy kept in sync
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import psycopg2
+
+from quiz_cache import CachedQuizDatabase
+from quiz_db import _config
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS subjects (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT
+    );
+    CREATE TABLE IF NOT EXISTS questions (
+        id INTEGER PRIMARY KEY,
+        subject_id INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_questions_subject ON questions (subject_id, id);
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+"""
+
+# Questions looked up per query (SQLite limits the number of parameters)
+_LOOKUP_CHUNK = 500
+
+
+class BankSnapshot:
+    """
+    Copy of the question bank in a local SQLite file.
+    
+    Questions are stored hydrated, as one JSON document each (the dictionary
+    get_question_by_id returns), so reading a quiz is one indexed lookup per
+    question. The file is in WAL mode and every thread has its own
+    connection, so quizzes keep reading the previous copy while apply()
+    writes the changes of a sync.
+    """
+    
+    def __init__(self, path):
+        """Open (or create) the snapshot file at path."""
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+    
+    def _connection(self):
+        """This thread's connection to the snapshot."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    def close(self):
+        """Close the connections of all threads."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+    
+    @property
+    def synced_at(self):
+        """Time (time.time()) the snapshot was last synced, or None if it never was."""
+        row = self._connection().execute(
+            "SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+        return float(row[0]) if row else None
+    
+    @property
+    def version(self):
+        """Bank version the snapshot was last synced to, or None if it never was."""
+        row = self._connection().execute(
+            "SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else None
+    
+    def get_all_subjects(self):
+        """All subjects (id, name, description), by name."""
+        rows = self._connection().execute(
+            "SELECT id, name, description FROM subjects ORDER BY name")
+        return [{"id": id, "name": name, "description": description}
+                for id, name, description in rows]
+    
+    def get_question_ids_by_subject(self, subject_id):
+        """Ids of a subject's questions in ascending order."""
+        rows = self._connection().execute(
+            "SELECT id FROM questions WHERE subject_id = ? ORDER BY id", (subject_id,))
+        return [row[0] for row in rows]
+    
+    def get_questions_by_ids(self, question_ids):
+        """Questions by id, in the order of question_ids; unknown ids are skipped."""
+        conn = self._connection()
+        by_id = {}
+        question_ids = list(question_ids)
+        for start in range(0, len(question_ids), _LOOKUP_CHUNK):
+            chunk = question_ids[start:start + _LOOKUP_CHUNK]
+            rows = conn.execute(
+                f"SELECT id, data FROM questions WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk)
+            by_id.update((question_id, data) for question_id, data in rows)
+        return [json.loads(by_id[qid]) for qid in question_ids if qid in by_id]
+    
+    def apply(self, changes, full=False):
+        """
+        Apply the changes of a sync to the snapshot, in one transaction.
+        
+        Args:
+            changes: Iterable of changes as yielded by
+                QuizDatabase.iter_bank_changes
+            full: Whether changes hold the whole bank, replacing the snapshot
+        
+        Returns:
+            Tuple of (subjects, questions) written or deleted
+        
+        Raises:
+            psycopg2.Error: If reading the changes fails; the snapshot is left
+                as it was
+        """
+        conn = self._connection()
+        subjects = questions = 0
+        with conn:
+            if full:
+                conn.execute("DELETE FROM subjects")
+                conn.execute("DELETE FROM questions")
+            for kind, row in changes:
+                if kind == 'version':
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                                 (str(row),))
+                elif kind == 'deleted_subject':
+                    conn.execute("DELETE FROM subjects WHERE id = ?", (row,))
+                    subjects += 1
+                elif kind == 'deleted_question':
+                    conn.execute("DELETE FROM questions WHERE id = ?", (row,))
+                    questions += 1
+                elif kind == 'subject':
+                    conn.execute("INSERT OR REPLACE INTO subjects (id, name, description) "
+                                 "VALUES (?, ?, ?)",
+                                 (row['id'], row['name'], row['description']))
+                    subjects += 1
+                else:
+                    row.pop('subject_name', None)
+                    conn.execute("INSERT OR REPLACE INTO questions (id, subject_id, data) "
+                                 "VALUES (?, ?, ?)",
+                                 (row['id'], row['subject_id'],
+                                  json.dumps(row, separators=(",", ":"))))
+                    questions += 1
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_at', ?)",
+                         (repr(time.time()),))
+        return subjects, questions
+
+
+class SnapshotQuizDatabase(CachedQuizDatabase):
+    """
+    CachedQuizDatabase that reads the question bank from a local snapshot.
+    
+    Once the snapshot has been synced, subjects and quiz questions are read
+    from the local SQLite file, so the app starts and opens quizzes without
+    waiting on PostgreSQL and keeps working while it is unreachable. Writes,
+    review and adaptive quizzes and statistics still go to PostgreSQL.
+    
+    start_sync() connects, listens for changes and syncs the snapshot on a
+    background thread, retrying with backoff until PostgreSQL is reachable.
+    The first sync copies the whole bank; later ones only fetch the rows
+    changed or deleted since the version the snapshot was synced to, so a
+    sync costs in proportion to the changes, not the bank. Every change
+    notification (and every reconnect of the listener, after which changes
+    may have been missed) syncs the snapshot again; changes arriving
+    together are synced once.
+    """
+    
+    # Seconds to wait after a change so a burst of changes is synced once
+    SYNC_DELAY = 1
+    # Seconds to wait before retrying a failed sync; doubled up to RETRY_MAX_DELAY
+    RETRY_DELAY = 1
+    RETRY_MAX_DELAY = 60
+    
+    def __init__(self, *args, snapshot_path=None, **kwargs):
+        """Initialize the database and open its snapshot (path from config.ini)."""
+        super().__init__(*args, **kwargs)
+        if snapshot_path is None:
+            snapshot_path = _config.get('snapshot', 'path', fallback='~/.quiz_app/bank.sqlite3')
+        self.snapshot = BankSnapshot(os.path.expanduser(snapshot_path))
+        self._ready = self.snapshot.synced_at is not None
+        self._sync_requested = threading.Event()
+        self._stopping = threading.Event()
+        self._sync_thread = None
+    
+    def has_snapshot(self):
+        """Whether the bank can be read from the snapshot."""
+        return self._ready
+    
+    def start_sync(self):
+        """Connect, listen for changes and keep the snapshot in sync on a background thread."""
+        if self._sync_thread and self._sync_thread.is_alive():
+            return
+        self._stopping.clear()
+        self._sync_thread = threading.Thread(target=self._run_sync, name="quiz-snapshot-sync",
+                                             daemon=True)
+        self._sync_thread.start()
+    
+    def sync_snapshot(self):
+        """
+        Sync the snapshot now: the whole bank the first time, then the changes.
+        
+        Returns:
+            True if the snapshot was synced
+        """
+        try:
+            since = self.snapshot.version
+            self.snapshot.apply(self.iter_bank_changes(since), full=since is None)
+        except (psycopg2.Error, sqlite3.Error) as e:
+            print(f"Could not sync the question bank snapshot: {e}")
+            return False
+        self._ready = True
+        return True
+    
+    def close(self, timeout=5):
+        """
+        Stop syncing, close the snapshot and all pooled database connections.
+        
+        Args:
+            timeout: Seconds to wait for a sync in progress; the thread is a
+                daemon, so one stuck connecting does not keep the app open
+        """
+        self._stopping.set()
+        self._sync_requested.set()
+        if self._sync_thread:
+            self._sync_thread.join(timeout)
+            self._sync_thread = None
+        self.snapshot.close()
+        super().close()
+    
+    def handle_change(self, change):
+        """Evict the cache entries affected by a change and sync the snapshot."""
+        super().handle_change(change)
+        self._sync_requested.set()
+    
+    def handle_reconnect(self):
+        """Clear the cache and sync the snapshot, as changes may have been missed."""
+        super().handle_reconnect()
+        self._sync_requested.set()
+    
+    def _run_sync(self):
+        """Sync on start and after every change until stopped."""
+        delay = self.RETRY_DELAY
+        self._sync_requested.set()
+        while not self._stopping.is_set():
+            self._sync_requested.wait()
+            # Let a burst of changes settle
+            if self._stopping.wait(self.SYNC_DELAY):
+                return
+            self._sync_requested.clear()
+            
+            if self.connect() and not self._stopping.is_set():
+                self.start_listening()
+                if self.sync_snapshot():
+                    delay = self.RETRY_DELAY
+                    continue
+            self._sync_requested.set()
+            # Sleep on the stop event so close() is not delayed
+            if self._stopping.wait(delay):
+                return
+            delay = min(delay * 2, self.RETRY_MAX_DELAY)
+    
+    def get_all_subjects(self, strict=False):
+        """Retrieve all subjects, from the snapshot once it has been synced."""
+        if self._ready:
+            return self.snapshot.get_all_subjects()
+        return super().get_all_subjects(strict)
+    
+    def get_question_ids_by_subject(self, subject_id, strict=False):
+        """Retrieve a subject's question ids, from the snapshot once it has been synced."""
+        if self._ready:
+            return self.snapshot.get_question_ids_by_subject(subject_id)
+        return super().get_question_ids_by_subject(subject_id, strict)
+    
+    def get_questions_by_ids(self, question_ids, strict=False):
+        """Retrieve questions, from the snapshot once it has been synced."""
+        if self._ready:
+            return self.snapshot.get_questions_by_ids(question_ids)
+        return super().get_questions_by_ids(question_ids, strict)
@@ -1,10 +1,11 @@
 """Question-related UI components for the Quiz Application."""
 
 from PyQt6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
-                             QPushButton, QMessageBox, QTableWidget, QTableWidgetItem, 
+                             QPushButton, QMessageBox, QTableView, 
                              QLineEdit, QTextEdit, QDialogButtonBox, QComboBox,
                              QHeaderView, QAbstractItemView, QCheckBox)
 from PyQt6.QtGui import QFont
+from ui.question_model import QuestionTableModel
 
 
 class QuestionManagementDialog(QDialog):
@@ -43,10 +44,6 @@ class QuestionManagementDialog(QDialog):
 class QuestionsView(QWidget):
     """Widget for managing questions."""
     
-    # Constants for question text display
-    MAX_QUESTION_LENGTH = 100
-    TRUNCATE_LENGTH = 97
-    
     def __init__(self, db, parent=None):
         super().__init__(parent)
         self.db = db
@@ -73,7 +70,14 @@ class QuestionsView(QWidget):
         
         self.subject_filter.currentIndexChanged.connect(self.load_questions)
         filter_layout.addWidget(self.subject_filter)
-        filter_layout.addStretch()
+        
+        # Full-text search over question and option text
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search questions and options...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.returnPressed.connect(self.load_questions)
+        self.search_input.textChanged.connect(self.on_search_text_changed)
+        filter_layout.addWidget(self.search_input, 1)
         
         layout.addLayout(filter_layout)
         
@@ -95,10 +99,11 @@ class QuestionsView(QWidget):
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
-        # Questions table
-        self.table = QTableWidget()
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["ID", "Subject", "Question", "Type"])
+        # Questions table, loaded page by page as it is scrolled
+        self.model = QuestionTableModel(self.db, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
@@ -109,33 +114,18 @@ class QuestionsView(QWidget):
         header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.ResizeToContents)
         
         layout.addWidget(self.table)
         
     def load_questions(self):
-        """Load questions from the database."""
-        questions = self.db.get_all_questions()
-        
-        # Filter by selected subject
-        selected_subject_id = self.subject_filter.currentData()
-        if selected_subject_id is not None:
-            questions = [q for q in questions if q['subject_id'] == selected_subject_id]
-        
-        self.table.setRowCount(0)
-        for question in questions:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            
-            self.table.setItem(row, 0, QTableWidgetItem(str(question['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(question['subject_name']))
-            
-            # Truncate question text if too long
-            question_text = question['question_text']
-            if len(question_text) > self.MAX_QUESTION_LENGTH:
-                question_text = question_text[:self.TRUNCATE_LENGTH] + "..."
-            self.table.setItem(row, 2, QTableWidgetItem(question_text))
-            
-            self.table.setItem(row, 3, QTableWidgetItem(question['question_type']))
+        """Load the first page of questions for the selected subject and search."""
+        self.model.set_filter(self.subject_filter.currentData(), self.search_input.text())
+    
+    def on_search_text_changed(self, text):
+        """Go back to the full listing once the search box is cleared."""
+        if not text.strip() and self.model.search_text:
+            self.load_questions()
             
     def add_question(self):
         """Add a new question."""
@@ -150,8 +140,8 @@ class QuestionsView(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select a question to edit.")
             return
             
-        row = selected_rows[0].row()
-        question_id = int(self.table.item(row, 0).text())
+        question = self.model.question_at(selected_rows[0].row())
+        question_id = question['id']
         
         dialog = QuestionDialog(self.db, self, question_id)
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -165,8 +155,8 @@ class QuestionsView(QWidget):
             return
             
         row = selected_rows[0].row()
-        question_id = int(self.table.item(row, 0).text())
-        question_text = self.table.item(row, 2).text()
+        question_id = self.model.question_at(row)['id']
+        question_text = self.model.index(row, 2).data()
         
         # Confirm deletion
         msg = QMessageBox()
@@ -0,0 +1,134 @@
+"""Reusable option rows for displaying quiz questions."""
+
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                             QRadioButton, QCheckBox, QButtonGroup)
+from PyQt6.QtGui import QFont
+
+
+class OptionRow(QWidget):
+    """One answer option: a radio button or checkbox and its wrapped text.
+    
+    A row owns both kinds of button and shows the one the current question
+    needs, so the same row serves single- and multi-select questions.
+    Clicking the text selects the option like clicking the button does.
+    """
+    
+    def __init__(self, font, parent=None):
+        super().__init__(parent)
+        self.key = None
+        self.multi_select = False
+        
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.radio = QRadioButton()
+        self.checkbox = QCheckBox()
+        self.label = QLabel()
+        self.label.setWordWrap(True)
+        self.label.setFont(font)
+        
+        layout.addWidget(self.radio)
+        layout.addWidget(self.checkbox)
+        layout.addWidget(self.label, 1)  # Stretch factor 1 to take remaining space
+    
+    def button(self):
+        """The button shown for the current question."""
+        return self.checkbox if self.multi_select else self.radio
+    
+    def bind(self, key, text, multi_select, checked, enabled):
+        """Show an option, replacing whatever the row displayed before."""
+        self.key = key
+        self.multi_select = multi_select
+        
+        for button, shown in ((self.radio, not multi_select), (self.checkbox, multi_select)):
+            button.setText(f"{key}.")
+            button.setChecked(shown and checked)
+            button.setEnabled(enabled)
+            button.setVisible(shown)
+        
+        self.label.setText(text)
+        self.label.setStyleSheet("")
+    
+    def mousePressEvent(self, event):
+        """Select the option when its text is clicked."""
+        button = self.button()
+        if not button.isEnabled():
+            return
+        if self.multi_select:
+            button.setChecked(not button.isChecked())
+        else:
+            button.setChecked(True)
+
+
+class OptionPanel(QWidget):
+    """The options of the displayed question, drawn with pooled rows.
+    
+    Rows are created the first time a question needs that many options and
+    are then rebound to each new question's text and selection state, and
+    rows beyond the current option count are hidden. Navigating between
+    questions therefore allocates no widgets once the pool has grown to the
+    largest question seen.
+    """
+    
+    OPTION_FONT = ("Arial", 16)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.visible_count = 0
+        self.option_font = QFont(*self.OPTION_FONT)
+        
+        self.rows_layout = QVBoxLayout(self)
+        self.rows_layout.setContentsMargins(0, 0, 0, 0)
+        self.rows_layout.setSpacing(10)
+        
+        # Button group for radio buttons (single choice)
+        self.radio_group = QButtonGroup(self)
+    
+    def show_options(self, options, multi_select, selected=None, enabled=True):
+        """
+        Display a question's options.
+        
+        Args:
+            options: Dictionary mapping option keys to option text
+            multi_select: Show checkboxes instead of radio buttons
+            selected: Keys to show as selected (None for none)
+            enabled: Whether the options can be changed
+        """
+        selected = selected or []
+        keys = sorted(options.keys())
+        while len(self.rows) < len(keys):
+            row = OptionRow(self.option_font, self)
+            self.radio_group.addButton(row.radio)
+            self.rows_layout.addWidget(row)
+            self.rows.append(row)
+        
+        # An exclusive group never lets its checked radio button be unchecked
+        self.radio_group.setExclusive(False)
+        for row, key in zip(self.rows, keys):
+            row.bind(key, options[key], multi_select, key in selected, enabled)
+            row.setVisible(True)
+        for row in self.rows[len(keys):]:
+            row.radio.setChecked(False)
+            row.setVisible(False)
+        self.radio_group.setExclusive(True)
+        self.visible_count = len(keys)
+    
+    def highlight(self, correct_answer, user_answer):
+        """Mark correct options in green and wrongly chosen ones in red."""
+        for row in self.rows[:self.visible_count]:
+            if row.key in correct_answer:
+                row.label.setStyleSheet("color: green; font-weight: bold;")
+            elif row.key in user_answer:
+                row.label.setStyleSheet("color: red;")
+    
+    def selected_keys(self):
+        """Sorted keys of the selected options."""
+        return sorted(row.key for row in self.rows[:self.visible_count]
+                      if row.button().isChecked())
+    
+    def clear(self):
+        """Hide all options; the rows are kept for the next question."""
+        for row in self.rows[:self.visible_count]:
+            row.setVisible(False)
+        self.visible_count = 0
@@ -0,0 +1,140 @@
+"""Lazily paged table model of questions for the Quiz Application."""
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class QuestionTableModel(QAbstractTableModel):
+    """Table model that fetches questions from the database page by page.
+    
+    Only the rows scrolled into view are loaded: the view asks for more rows
+    through canFetchMore()/fetchMore(), and each page is read with keyset
+    pagination (QuizDatabase.get_questions_page), with the subject filter
+    applied in SQL. Opening the table costs one page whatever the bank size.
+    
+    With search text set, rows are full-text matches ranked best first
+    (QuizDatabase.search_questions), paged by offset instead.
+    
+    The Accuracy column shows how often each question was answered
+    correctly, read per page from the maintained statistics
+    (QuizDatabase.get_question_stats).
+    """
+    
+    HEADERS = ["ID", "Subject", "Question", "Type", "Accuracy"]
+    PAGE_SIZE = 200
+    
+    # Constants for question text display
+    MAX_QUESTION_LENGTH = 100
+    TRUNCATE_LENGTH = 97
+    
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.subject_id = None
+        self.search_text = ""
+        self.questions = []
+        self.stats = {}
+        self.exhausted = False
+    
+    def set_filter(self, subject_id, search_text=""):
+        """Show the questions of one subject (None for all) from the start.
+        
+        When search_text is not blank only the questions matching it are
+        shown, best matches first.
+        """
+        self.subject_id = subject_id
+        self.search_text = search_text.strip()
+        self.refresh()
+    
+    def refresh(self):
+        """Drop the loaded rows and load the first page again."""
+        self.beginResetModel()
+        self.questions = []
+        self.stats = {}
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+    
+    def question_at(self, row):
+        """Get the question summary shown in a row."""
+        return self.questions[row]
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.questions)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        question = self.questions[index.row()]
+        column = index.column()
+        if column == 4 and role == Qt.ItemDataRole.ToolTipRole:
+            return self.stats_tooltip(question['id'])
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        
+        if column == 0:
+            return str(question['id'])
+        if column == 1:
+            return question['subject_name']
+        if column == 2:
+            # Truncate question text if too long
+            question_text = question['question_text']
+            if len(question_text) > self.MAX_QUESTION_LENGTH:
+                question_text = question_text[:self.TRUNCATE_LENGTH] + "..."
+            return question_text
+        if column == 3:
+            return question['question_type']
+        
+        stats = self.stats.get(question['id'])
+        if not stats:
+            return ""
+        return f"{stats['accuracy']:.0%} of {stats['attempts']}"
+    
+    def stats_tooltip(self, question_id):
+        """Describe the answers given to a question, or None if never attempted."""
+        stats = self.stats.get(question_id)
+        if not stats:
+            return None
+        lines = [f"Correct: {stats['correct']} of {stats['attempts']} attempts",
+                 f"Skipped: {stats['skipped']}"]
+        for key, count in stats['selections'].items():
+            lines.append(f"{key}: chosen {count} times")
+        return "\n".join(lines)
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """Load the page that follows the last loaded row."""
+        if parent.isValid() or self.exhausted:
+            return
+        
+        if self.search_text:
+            page = self.db.search_questions(self.search_text, self.subject_id,
+                                            self.PAGE_SIZE, len(self.questions))
+        else:
+            after = None
+            if self.questions:
+                last = self.questions[-1]
+                after = (last['subject_id'], last['id'])
+            page = self.db.get_questions_page(self.subject_id, after, self.PAGE_SIZE)
+        
+        if len(page) < self.PAGE_SIZE:
+            self.exhausted = True
+        if not page:
+            return
+        
+        self.stats.update(self.db.get_question_stats([q['id'] for q in page]))
+        
+        first = len(self.questions)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self.questions.extend(page)
+        self.endInsertRows()
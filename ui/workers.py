@@ -0,0 +1,51 @@
+"""Background workers for running database calls off the GUI thread."""
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a DatabaseWorker."""
+    
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class DatabaseWorker(QRunnable):
+    """Run a single database call on a QThreadPool thread.
+    
+    The return value is delivered through `signals.finished` and any exception
+    message through `signals.failed`; both are queued to the GUI thread. After
+    cancel() neither signal is emitted, so the result of a superseded load
+    never reaches the window.
+    """
+    
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+    
+    def cancel(self):
+        """Drop the result of this worker."""
+        self._cancelled = True
+    
+    def is_cancelled(self):
+        """Check whether this worker has been cancelled."""
+        return self._cancelled
+    
+    def run(self):
+        """Execute the call and report its outcome unless cancelled."""
+        if self._cancelled:
+            return
+        
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self._cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        
+        if not self._cancelled:
+            self.signals.finished.emit(result)